@@ -0,0 +1,217 @@
+# -*- coding:utf-8 -*-
+# !/usr/bin/env python
+#---------------------------------------------------------------------------------
+# Author: Zhang
+#
+# Create Date: 2026/10/18
+# Last Update on: 2026/10/18
+#
+# FILE: analysisBench.py
+# Description: per-stage throughput and peak memory of LogAnalyst against baselines
+#---------------------------------------------------------------------------------
+
+#---------------------------------------------------------------------------------
+# IMPORT REQUIRED PACKAGES HERE
+
+import os
+import sys
+import re
+import json
+import time
+import argparse
+import platform
+import statistics
+import tempfile
+import tracemalloc
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+import benchmarks.logGenerator as logGenerator
+import utils.logFormat as logFormat
+from utils.logAnalyst import LogAnalyst
+
+# END OF PACKAGE IMPORT
+#---------------------------------------------------------------------------------
+
+#---------------------------------------------------------------------------------
+# DEFINE FUNCTIONS HERE
+
+BASELINE_FILE = os.path.join(os.path.dirname(__file__), 'baselines.json')
+DATA_DIR = os.path.join(tempfile.gettempdir(), 'logmanager-bench')  # generated logs are kept here
+
+DEFAULT_SCALES = ('1k', '100k')
+TIME_TOLERANCE = 0.75    # a stage may be 75% slower than its baseline, timings swing that much on shared machines
+REPEAT = 9               # runs per benchmark, their median time is compared
+MEMORY_TOLERANCE = 0.2   # and use 20% more peak memory
+MIN_SECONDS = 0.005      # stages faster than this are too noisy to compare
+EXTRACT_SAMPLES = 100_000  # gui lines timed by check_extract_speed
+
+# stream_log_file and scan_log_file replace read_log_file + extract_distance
+STAGES = ('read_log_file', 'extract_distance', 'stream_log_file', 'scan_log_file', 'analysis', 'save_result')
+
+
+def run_stages(log_file_path: str, samples: int, save_file_path: str, output_format: str) -> dict:
+    """ run every stage once, return {stage: (seconds, peak bytes or None)} """
+    tracing = tracemalloc.is_tracing()
+    results = {}
+
+    def timed(stage, func, *args):
+        if tracing:
+            tracemalloc.reset_peak()
+        start = time.perf_counter()
+        value = func(*args)
+        seconds = time.perf_counter() - start
+        results[stage] = (seconds, tracemalloc.get_traced_memory()[1] if tracing else None)
+        return value
+
+    # every sample is analysed, the window covers the whole file
+    analyst = LogAnalyst(warmup_samples=0, analysis_samples=samples * 2)
+    log_file_type = timed('read_log_file', analyst.read_log_file, log_file_path)
+    timed('extract_distance', analyst.extract_distance, log_file_type)
+    analyst._content = None  # release the text before measuring the other readers
+
+    for reader in ('stream_log_file', 'scan_log_file'):
+        other = LogAnalyst(warmup_samples=0, analysis_samples=samples * 2)
+        timed(reader, getattr(other, reader), log_file_path)
+
+    timed('analysis', analyst.analysis, 300.0)
+    timed('save_result', analyst.save_result, save_file_path, output_format)
+    return results
+
+
+def bench(log_format: str, samples: int, repeat: int, output_format: str, memory=True) -> dict:
+    log_file_path = logGenerator.cached_log(DATA_DIR, log_format, samples)
+    size = os.path.getsize(log_file_path)
+    save_file_path = os.path.join(DATA_DIR, f"bench_result.{output_format}")
+
+    # median of 'repeat' runs for time, a lucky fastest run made a baseline the next runs could not meet,
+    # one traced run for memory (tracing slows everything down)
+    runs = {}
+    for _ in range(repeat):
+        for stage, (seconds, _) in run_stages(log_file_path, samples, save_file_path, output_format).items():
+            runs.setdefault(stage, []).append(seconds)
+    timings = {stage: statistics.median(seconds) for stage, seconds in runs.items()}
+
+    peaks = {}
+    if memory:
+        tracemalloc.start()
+        try:
+            peaks = {stage: peak for stage, (_, peak) in run_stages(log_file_path, samples, save_file_path, output_format).items()}
+        finally:
+            tracemalloc.stop()
+
+    return {
+        stage: {
+            'seconds': round(timings[stage], 6),
+            'samples/s': round(samples / timings[stage]) if timings[stage] else None,
+            'MB/s': round(size / 1e6 / timings[stage], 1) if timings[stage] else None,
+            'peak bytes': peaks.get(stage),
+        }
+        for stage in STAGES
+    }
+
+
+def compare(key: str, current: dict, baseline: dict, time_tolerance: float, memory_tolerance: float) -> list:
+    """ list of regression messages of one stage, empty if within tolerance """
+    failures = []
+    base_seconds = baseline.get('seconds')
+    if base_seconds and base_seconds >= MIN_SECONDS and current['seconds'] > base_seconds * (1 + time_tolerance):
+        failures.append(f"{key}: {current['seconds']:.4f} s against baseline {base_seconds:.4f} s")
+
+    base_peak = baseline.get('peak bytes')
+    if base_peak and current['peak bytes'] and current['peak bytes'] > base_peak * (1 + memory_tolerance):
+        failures.append(f"{key}: peak {current['peak bytes'] / 1e6:.1f} MB against baseline {base_peak / 1e6:.1f} MB")
+    return failures
+
+
+def _former_extract_gui(line: str):
+    # the re.search + split path the compiled extractors replaced, reference of check_extract_speed
+    match = re.search(r"Distance\s*:\s*(\d+)", line)
+    if match is None:
+        return None
+    return re.search(r"PORT\s*(\d+)", line).group(1), int(line.split(',')[9]), match.group(1)
+
+
+def check_extract_speed(samples: int, repeat: int) -> tuple:
+    """ (lines/s of extract_gui, lines/s of the former path), best of 'repeat' interleaved runs """
+    log_file_path = logGenerator.cached_log(DATA_DIR, 'gui', samples)
+    with open(log_file_path, 'r', encoding='utf-8') as f:
+        lines = [line for line in map(str.strip, f) if line]
+
+    # interleaved in one process, so a busy machine slows both alike and the ratio holds
+    best = {logFormat.extract_gui: float('inf'), _former_extract_gui: float('inf')}
+    for _ in range(repeat):
+        for extract in best:
+            start = time.perf_counter()
+            for line in lines:
+                extract(line)
+            best[extract] = min(best[extract], time.perf_counter() - start)
+    return len(lines) / best[logFormat.extract_gui], len(lines) / best[_former_extract_gui]
+
+
+def machine_info() -> str:
+    return f"{platform.python_implementation()} {platform.python_version()} {platform.machine()} {platform.processor() or platform.system()}"
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark LogAnalyst stages on synthetic logs.')
+    parser.add_argument('-s', '--scales', type=str, nargs='+', default=list(DEFAULT_SCALES))  # e.g. 1k 10M 100M
+    parser.add_argument('-f', '--formats', type=str, nargs='+', default=list(logGenerator.FORMATS),
+                        choices=logGenerator.FORMATS)
+    parser.add_argument('-r', '--repeat', type=int, default=REPEAT)
+    parser.add_argument('-o', '--output', type=str, default='csv', choices=['xlsx', 'csv', 'parquet', 'jsonl'])
+    parser.add_argument('--no-memory', action='store_true')  # skip the traced run, much faster at large scales
+    parser.add_argument('--tolerance', type=float, default=TIME_TOLERANCE)
+    parser.add_argument('--update', action='store_true')  # store the results as new baselines
+    args = parser.parse_args()
+
+    baselines = {}
+    if os.path.exists(BASELINE_FILE):
+        with open(BASELINE_FILE, 'r', encoding='utf-8') as f:
+            baselines = json.load(f)
+    if baselines.get('machine') not in (None, machine_info()) and not args.update:
+        print(f"Note: baselines were recorded on '{baselines['machine']}', timings may not compare.")
+
+    print(f"{'benchmark':<36}{'seconds':>10}{'samples/s':>13}{'MB/s':>9}{'peak MB':>10}")
+    print('-' * 78)
+    results, failures = {}, []
+    for log_format in args.formats:
+        for scale in args.scales:
+            samples = logGenerator.parse_scale(scale)
+            stages = bench(log_format, samples, args.repeat, args.output, memory=not args.no_memory)
+            for stage, current in stages.items():
+                key = f"{log_format}/{scale.lower()}/{stage}"
+                results[key] = current
+                peak = f"{current['peak bytes'] / 1e6:.1f}" if current['peak bytes'] is not None else '-'
+                print(f"{key:<36}{current['seconds']:>10.4f}{current['samples/s'] or 0:>13}"
+                      f"{current['MB/s'] or 0:>9}{peak:>10}")
+                if key in baselines.get('stages', {}):
+                    failures += compare(key, current, baselines['stages'][key], args.tolerance, MEMORY_TOLERANCE)
+
+    # machine independent: the extractor against the former path, see logFormat
+    fast, former = check_extract_speed(EXTRACT_SAMPLES, max(args.repeat, 5))
+    print(f"\nextract_gui {fast / 1e3:.0f}k lines/s, former re.search + split path {former / 1e3:.0f}k lines/s "
+          f"({fast / former:.2f}x, target {logFormat.EXTRACT_MIN_SPEEDUP}x)")
+    if fast < former * logFormat.EXTRACT_MIN_SPEEDUP:
+        failures.append(f"extract_gui: {fast / former:.2f}x the former path, "
+                        f"below the {logFormat.EXTRACT_MIN_SPEEDUP}x target")
+
+    if args.update:
+        baselines = {'machine': machine_info(), 'stages': {**baselines.get('stages', {}), **results}}
+        with open(BASELINE_FILE, 'w', encoding='utf-8') as f:
+            json.dump(baselines, f, indent=2, sort_keys=True)
+        print(f"Baselines written to {BASELINE_FILE}")
+        return
+
+    if failures:
+        print('\nREGRESSION')
+        for failure in failures:
+            print(f" {failure}")
+        sys.exit(1)
+    print('\nNo regression against baselines.')
+
+
+if __name__ == '__main__':
+    main()
+
+# END OF FILE
+#---------------------------------------------------------------------------------
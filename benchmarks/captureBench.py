@@ -0,0 +1,167 @@
+# -*- coding:utf-8 -*-
+# !/usr/bin/env python
+#---------------------------------------------------------------------------------
+# Author: Zhang
+#
+# Create Date: 2026/10/18
+# Last Update on: 2026/10/18
+#
+# FILE: captureBench.py
+# Description: results per second the Device/run_ranging_demo capture path sustains, against cliserverSim.py
+#---------------------------------------------------------------------------------
+
+#---------------------------------------------------------------------------------
+# IMPORT REQUIRED PACKAGES HERE
+
+import io
+import os
+import sys
+import json
+import math
+import time
+import argparse
+import tempfile
+import contextlib
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+import benchmarks.logGenerator as logGenerator
+import benchmarks.cliserverSim as cliserverSim
+import utils.functions as funcs
+import utils.logFormat as logFormat
+from utils.device import Device
+from utils.logAnalyst import LogAnalyst
+from utils.logWriter import LogWriter
+
+# END OF PACKAGE IMPORT
+#---------------------------------------------------------------------------------
+
+#---------------------------------------------------------------------------------
+# DEFINE FUNCTIONS HERE
+
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+COMMAND_FILE = os.path.join(ROOT_DIR, 'command.json')
+SIMULATOR = os.path.abspath(cliserverSim.__file__)
+DATA_DIR = os.path.join(tempfile.gettempdir(), 'logmanager-capture-bench')
+
+DEFAULT_RATES = ('1k', '5k', '20k', '50k', '100k')
+DRAIN_SECONDS = 1.0     # captured on top of the stream duration, so the tail is not cut off
+STATS_TIMEOUT = 5.0     # seconds for the simulator to write its counters once disconnected
+RATE_TOLERANCE = 0.05   # a run keeps up if it delivers at least 95% of the target rate
+
+
+def count_results(log_file_path: str, log_format: str) -> tuple:
+    """ (ranging results, non-empty lines which are no result) of a captured log """
+    with open(log_file_path, 'rb') as f:
+        data = f.read()
+    results = sum(1 for _ in logFormat.SCANNERS[log_format](data))
+    lines = sum(1 for line in data.split(b'\n') if line.strip())
+    return results, lines - results
+
+
+def read_stats(stats_file_path: str) -> dict:
+    deadline = time.monotonic() + STATS_TIMEOUT
+    while not os.path.exists(stats_file_path):
+        if time.monotonic() >= deadline:
+            raise TimeoutError(f"Simulator wrote no counters to {stats_file_path}.")
+        time.sleep(0.05)
+    with open(stats_file_path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def bench_rate(rate: float, log_format: str, seconds: float, burst: int, fail_rate: float, send_buffer: int,
+               tcp_port: int, analyse=False, binary=False, log_writer=False, verbose=False) -> dict:
+    """ one capture run at 'rate' results per second, return its counters """
+    os.makedirs(DATA_DIR, exist_ok=True)
+    name = f"{log_format}_{rate:g}"
+    log_file_path = os.path.join(DATA_DIR, f"{name}.log")
+    stats_file_path = os.path.join(DATA_DIR, f"{name}_sim.json")
+    capture_file_path = os.path.join(DATA_DIR, f"{name}.uwbcap") if binary else None
+    for file_path in (stats_file_path, capture_file_path):  # a capture file would be appended to
+        if file_path is not None and os.path.exists(file_path):
+            os.remove(file_path)
+
+    count = max(1, int(rate * seconds))
+    cliserver_path = [sys.executable, SIMULATOR, '-f', log_format, '--rate', str(rate), '--burst', str(burst),
+                      '--count', str(count), '--fail-rate', str(fail_rate), '--send-buffer', str(send_buffer),
+                      '--stats', stats_file_path]
+    device = Device('responder', funcs.load_commands(COMMAND_FILE, 'responder'), f"SIM-{name}", tcp_port)
+    analyst = LogAnalyst(warmup_samples=0, analysis_samples=count) if analyse else None
+
+    # run_ranging_demo reports on stdout, kept for --verbose only
+    output = sys.stdout if verbose else io.StringIO()
+    log_file = LogWriter(log_file_path) if log_writer else open(log_file_path, 'w', encoding='utf-8')
+    try:
+        with log_file, contextlib.redirect_stdout(output):
+            report = funcs.run_ranging_demo(device, math.ceil((seconds + DRAIN_SECONDS) * 10), cliserver_path,
+                                            log_file, analyst, capture_file_path)
+    finally:
+        device.close_tcp_conn()  # the simulator writes its counters once disconnected
+    if report is None:
+        raise RuntimeError(f"Simulator did not answer the commands at {rate:g} results/s.")
+    stats = read_stats(stats_file_path)
+
+    results, malformed = count_results(log_file_path, log_format)
+    delivered = results / max(stats['seconds'], 1e-9)
+    lost = stats['sent'] - results
+    if stats['dropped']:
+        status = 'dropped'
+    elif malformed:
+        status = 'truncated'
+    elif lost:
+        status = 'lost'
+    elif delivered < rate * (1 - RATE_TOLERANCE):
+        status = 'behind'
+    else:
+        status = 'ok'
+    return {
+        'rate': rate,
+        'sent': stats['sent'],
+        'dropped': stats['dropped'],
+        'results': results,
+        'lost': lost,
+        'malformed lines': malformed,
+        'delivered/s': round(delivered, 1),
+        'lines/s': report.get('lines/s'),
+        'max lag (s)': round(stats['max lag (s)'], 3),
+        'status': status,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Load-test the capture path against a simulated Cliserver.')
+    parser.add_argument('-r', '--rates', type=str, nargs='+', default=list(DEFAULT_RATES))  # results/s, e.g. 1k 50k
+    parser.add_argument('-f', '--format', type=str, default='gui', choices=logGenerator.FORMATS)
+    parser.add_argument('-s', '--seconds', type=float, default=3.0)  # stream duration per rate
+    parser.add_argument('--burst', type=int, default=1)
+    parser.add_argument('--fail-rate', type=float, default=logGenerator.FAIL_RATE)
+    parser.add_argument('--send-buffer', type=int, default=cliserverSim.SEND_BUFFER)
+    parser.add_argument('--port', type=int, default=None)  # TCP port of the simulator, first free from 20120
+    parser.add_argument('-a', '--analyse', action='store_true')  # inline analysis while capturing
+    parser.add_argument('-b', '--binary', action='store_true')   # binary capture file while capturing
+    parser.add_argument('-l', '--log-writer', action='store_true')  # log written by a LogWriter thread
+    parser.add_argument('-v', '--verbose', action='store_true')
+    args = parser.parse_args()
+
+    tcp_port = args.port or funcs.find_available_tcp_port(20120)
+    print(f"{'rate/s':>10}{'sent':>10}{'dropped':>9}{'results':>10}{'lost':>7}{'malformed':>11}"
+          f"{'delivered/s':>13}{'lag s':>8}  status")
+    print('-' * 88)
+    sustained = 0
+    for rate in map(logGenerator.parse_scale, args.rates):
+        row = bench_rate(rate, args.format, args.seconds, args.burst, args.fail_rate, args.send_buffer,
+                         tcp_port, args.analyse, args.binary, args.log_writer, args.verbose)
+        print(f"{row['rate']:>10}{row['sent']:>10}{row['dropped']:>9}{row['results']:>10}{row['lost']:>7}"
+              f"{row['malformed lines']:>11}{row['delivered/s']:>13}{row['max lag (s)']:>8}  {row['status']}")
+        if row['status'] == 'ok':
+            sustained = max(sustained, rate)
+
+    print(f"\nSustained without drops or truncation: {sustained} results/s "
+          f"({args.format}, burst {args.burst}{', inline analysis' if args.analyse else ''}"
+          f"{', binary capture' if args.binary else ''}{', log writer thread' if args.log_writer else ''}).")
+
+
+if __name__ == '__main__':
+    main()
+
+# END OF FILE
+#---------------------------------------------------------------------------------
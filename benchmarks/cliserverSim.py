@@ -0,0 +1,228 @@
+# -*- coding:utf-8 -*-
+# !/usr/bin/env python
+#---------------------------------------------------------------------------------
+# Author: Zhang
+#
+# Create Date: 2026/10/18
+# Last Update on: 2026/10/18
+#
+# FILE: cliserverSim.py
+# Description: Classe CliserverSim, pure-Python stand-in for Cliserver.exe streaming synthetic ranging output
+#---------------------------------------------------------------------------------
+
+#---------------------------------------------------------------------------------
+# IMPORT REQUIRED PACKAGES HERE
+
+import os
+import sys
+import json
+import time
+import random
+import select
+import signal
+import socket
+import argparse
+import itertools
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+import benchmarks.logGenerator as logGenerator
+
+# END OF PACKAGE IMPORT
+#---------------------------------------------------------------------------------
+
+#---------------------------------------------------------------------------------
+# DEFINE CLASS HERE
+
+START_PREFIX = '[^UWB'    # the 'start' command of command.json, ranging output follows it
+POOL_MESSAGES = 10000     # distinct results generated up front, the stream cycles through them
+SEND_BUFFER = 64 * 1024   # bytes waiting for the client before new results are dropped
+MAX_SLEEP = 0.05          # seconds, longest wait between two looks at the socket
+
+
+class CliserverSim(object):
+    """
+    One client connection of a simulated Cliserver (TCP <-> COM port bridge).
+
+    Every command line (ended by '\\n', '\\r' stripped), or the bytes of a
+    command sent without line end once nothing more follows, is answered
+    with 'OK <command>'. A command starting with START_PREFIX starts the
+    ranging output, 'reset' stops it. Results go out at 'rate' per second in
+    bursts of 'burst' results written back to back, so bursts come every
+    burst / rate s.
+
+    Like the serial side of the real bridge, results are not queued without
+    bound: at most send_buffer bytes wait for a slow client, results which do
+    not fit are dropped and counted. send_buffer 0 queues everything, the
+    stream then falls behind its schedule instead (see 'max lag').
+    """
+    def __init__(self, conn: socket.socket, log_format='gui', rate=1000.0, fail_rate=logGenerator.FAIL_RATE,
+                 burst=1, count=0, distance=300, seed=0, send_buffer=SEND_BUFFER) -> None:
+        self.conn = conn
+        self.rate = rate
+        self.burst = max(1, burst)
+        self.count = count  # results per run, 0 streams until reset or disconnect
+        self.send_buffer = send_buffer
+
+        # gui logs put an empty line after every result
+        end = '\n\n' if log_format == 'gui' else '\n'
+        lines = logGenerator.LINE_GENERATORS[log_format](POOL_MESSAGES, distance, random.Random(seed), fail_rate)
+        self._pool = [(line + end).encode() for line in lines if line]
+
+        self._commands = bytearray()
+        self._out = bytearray()
+        self._streaming = False
+        self._messages = None
+        self._start = 0.0
+        self._due = 0  # results scheduled so far, sent or dropped
+
+        self.stats = {'format': log_format, 'rate': rate, 'burst': self.burst, 'commands': 0,
+                      'sent': 0, 'dropped': 0, 'bytes': 0, 'max lag (s)': 0.0, 'seconds': 0.0}
+
+    def __repr__(self) -> str:
+        return f"CliserverSim(format={self.stats['format']}, rate={self.rate}, burst={self.burst})"
+
+    def serve(self):
+        """ answer commands and stream results until the client disconnects """
+        self.conn.setblocking(False)
+        while True:
+            timeout = MAX_SLEEP
+            if self._streaming:
+                next_burst = self._start + (self._due + self.burst) / self.rate
+                timeout = min(timeout, max(next_burst - time.perf_counter(), 0.0))
+            readable, _, _ = select.select([self.conn], [self.conn] if self._out else [], [], timeout)
+            if readable and not self._receive():
+                break
+            if self._streaming:
+                self._schedule()
+            if self._out:
+                self._send()
+        self._stop()
+
+    def _receive(self) -> bool:
+        try:
+            data = self.conn.recv(65536)
+        except BlockingIOError:
+            return True
+        except ConnectionError:
+            return False
+        if not data:
+            return False
+        self._commands += data
+        while True:
+            end = self._commands.find(b'\n')
+            if end < 0:
+                # sent as is, like Cliserver.exe gets them from the original send_cmds
+                if self._commands and not select.select([self.conn], [], [], 0)[0]:
+                    end = len(self._commands)
+                else:
+                    return True
+            command = self._commands[:end].decode('utf-8', errors='replace').strip()
+            del self._commands[:end + 1]
+            if command:
+                self._execute(command)
+
+    def _execute(self, command: str):
+        self.stats['commands'] += 1
+        if command == 'reset':
+            self._stop()
+            self._out.clear()  # output of the stopped run still queued
+        self._out += f"OK {command.split(':', 1)[0]}\r\n".encode()
+        if command.startswith(START_PREFIX):
+            self._stop()
+            self._streaming = True
+            self._messages = itertools.cycle(self._pool)
+            self._start = time.perf_counter()
+            self._due = 0
+
+    def _schedule(self):
+        # whole bursts which are due by now, late ones are written at once to catch up
+        elapsed = time.perf_counter() - self._start
+        due = int(elapsed * self.rate) // self.burst * self.burst
+        if self.count:
+            due = min(due, self.count)
+        if due <= self._due:
+            return
+        self.stats['max lag (s)'] = max(self.stats['max lag (s)'], elapsed - (self._due + self.burst) / self.rate)
+        while self._due < due:
+            n = min(self.burst, due - self._due)
+            data = b''.join(itertools.islice(self._messages, n))
+            self._due += n
+            if self.send_buffer and len(self._out) + len(data) > self.send_buffer:
+                self.stats['dropped'] += n
+                continue
+            self._out += data
+            self.stats['sent'] += n
+        if self.count and self._due >= self.count:
+            self._stop()
+
+    def _send(self):
+        try:
+            n = self.conn.send(self._out)
+        except (BlockingIOError, InterruptedError):
+            return
+        except ConnectionError:
+            self._out.clear()
+            return
+        self.stats['bytes'] += n
+        del self._out[:n]
+
+    def _stop(self):
+        if self._streaming:
+            self._streaming = False
+            self.stats['seconds'] = round(time.perf_counter() - self._start, 6)
+            self.stats['achieved rate'] = round(self.stats['sent'] / max(self.stats['seconds'], 1e-9), 1)
+
+# END OF CLASS DEFINITION
+#---------------------------------------------------------------------------------
+
+#---------------------------------------------------------------------------------
+# DEFINE FUNCTIONS HERE
+
+def write_stats(stats: dict, stats_file_path: str):
+    # replaced at once so a reader never sees half of it
+    with open(stats_file_path + '.tmp', 'w', encoding='utf-8') as f:
+        json.dump(stats, f, indent=2)
+    os.replace(stats_file_path + '.tmp', stats_file_path)
+
+
+def main():
+    # same positional arguments as Cliserver.exe, so it can be given as cliserver_path
+    parser = argparse.ArgumentParser(description='Simulated Cliserver streaming synthetic ranging output.')
+    parser.add_argument('host', type=str)
+    parser.add_argument('tcp_port', type=int)
+    parser.add_argument('com_port', type=str)
+    parser.add_argument('-f', '--format', type=str, default='gui', choices=logGenerator.FORMATS)
+    parser.add_argument('--rate', type=float, default=1000.0)  # results per second
+    parser.add_argument('--fail-rate', type=float, default=logGenerator.FAIL_RATE)
+    parser.add_argument('--burst', type=int, default=1)  # results written back to back
+    parser.add_argument('--count', type=int, default=0)  # results per run, 0 until reset or disconnect
+    parser.add_argument('-d', '--distance', type=int, default=300)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--send-buffer', type=int, default=SEND_BUFFER)  # 0 never drops
+    parser.add_argument('--stats', type=str, default=None)  # JSON file of the counters, per connection
+    args = parser.parse_args()
+
+    # CliBridge.close terminates Cliserver, end like on Ctrl+C so the counters are still written
+    signal.signal(signal.SIGTERM, signal.default_int_handler)
+    simulator = None
+    try:
+        with socket.create_server((args.host, args.tcp_port)) as server:
+            conn, _ = server.accept()
+        with conn:
+            conn.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            simulator = CliserverSim(conn, args.format, args.rate, args.fail_rate, args.burst, args.count,
+                                     args.distance, args.seed, args.send_buffer)
+            simulator.serve()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        if simulator is not None and args.stats is not None:
+            simulator._stop()
+            write_stats(simulator.stats, args.stats)
+
+
+if __name__ == '__main__':
+    main()
+
+# END OF FILE
+#---------------------------------------------------------------------------------
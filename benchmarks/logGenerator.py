@@ -0,0 +1,127 @@
+# -*- coding:utf-8 -*-
+# !/usr/bin/env python
+#---------------------------------------------------------------------------------
+# Author: Zhang
+#
+# Create Date: 2026/10/18
+# Last Update on: 2026/10/18
+#
+# FILE: logGenerator.py
+# Description: synthetic gui/teraterm/mobis logs for benchmarks
+#---------------------------------------------------------------------------------
+
+#---------------------------------------------------------------------------------
+# IMPORT REQUIRED PACKAGES HERE
+
+import os
+import random
+import argparse
+
+# END OF PACKAGE IMPORT
+#---------------------------------------------------------------------------------
+
+#---------------------------------------------------------------------------------
+# DEFINE FUNCTIONS HERE
+
+FORMATS = ('gui', 'teraterm', 'mobis')
+
+FAIL_RATE = 0.05        # failed rangings (65535, '-', Time Out)
+UNSECURED_RATE = 0.02   # gui results with a non-zero security status code
+PORTS = (1, 2, 3)       # gui devices, interleaved
+INTERVAL_MS = 100       # gui time stamp step per device
+
+CHUNK_LINES = 65536     # lines written at once, keeps memory flat at any scale
+
+# a few lines of boot output, as in real captures, before the first result
+_PREAMBLE = {
+    'gui': [],
+    'teraterm': ['Tera Term log started', 'UWB demo v1.2.0', ''],
+    'mobis': ['off-uci ntf', 'off-uci cmd_res', '>> SECURE:46 1D C5 9A 69 60 58 CC FF FF FF FF BF 7F FF FF '],
+}
+
+
+def gui_lines(count: int, distance: int, rng: random.Random, fail_rate=FAIL_RATE):
+    timestamps = {port: rng.randrange(1_000_000) for port in PORTS}
+    for i in range(count):
+        port = PORTS[i % len(PORTS)]
+        timestamps[port] += INTERVAL_MS + rng.randrange(-3, 4)
+        status = rng.choice('123') if rng.random() < UNSECURED_RATE else '0'
+        dist = 65535 if rng.random() < fail_rate else distance + rng.randrange(-5, 6)
+        yield (f"(PORT {port}) : 6a,5,0,18,34,12,0,0,0,{status},0,a0,0,d5,6,0,0,0,0,c9,5b,65,c6,0,0,0,0,0"
+               f"   TimeStamp  :  {timestamps[port]}       Distance  :  {dist}")
+        yield ''  # gui logs put an empty line after every result
+
+
+def teraterm_lines(count: int, distance: int, rng: random.Random, fail_rate=FAIL_RATE):
+    for i in range(count):
+        dist = '-' if rng.random() < fail_rate else distance + rng.randrange(-5, 6)
+        yield f"Status: 0x00 BlockIndex: {i} Distance[cm]: {dist} AoA[deg]: {rng.randrange(-60, 61)}"
+
+
+def mobis_lines(count: int, distance: int, rng: random.Random, fail_rate=FAIL_RATE):
+    for _ in range(count):
+        if rng.random() < fail_rate:
+            yield '>> RAD RESULT: Time Out'
+        else:
+            yield f">> RAD RESULT:{(distance + rng.randrange(-5, 6)) / 100:.2f}m"
+
+
+LINE_GENERATORS = {
+    'gui': gui_lines,
+    'teraterm': teraterm_lines,
+    'mobis': mobis_lines,
+}
+
+
+def generate_log(log_file_path: str, log_format: str, samples: int, distance=300, seed=0) -> str:
+    """ write a log of 'samples' ranging results, deterministic for a given seed """
+    rng = random.Random(seed)
+    lines = LINE_GENERATORS[log_format](samples, distance, rng)
+    with open(log_file_path, 'w', encoding='utf-8', newline='\n') as f:
+        for line in _PREAMBLE[log_format]:
+            f.write(line + '\n')
+        chunk = []
+        for line in lines:
+            chunk.append(line)
+            if len(chunk) == CHUNK_LINES:
+                f.write('\n'.join(chunk) + '\n')
+                chunk = []
+        if chunk:
+            f.write('\n'.join(chunk) + '\n')
+    return log_file_path
+
+
+def cached_log(directory: str, log_format: str, samples: int, distance=300, seed=0) -> str:
+    """ path of a generated log, generated only if it does not exist yet """
+    os.makedirs(directory, exist_ok=True)
+    log_file_path = os.path.join(directory, f"{log_format}_{samples}_{distance}cm_seed{seed}.log")
+    if not os.path.exists(log_file_path):
+        generate_log(log_file_path + '.tmp', log_format, samples, distance, seed)
+        os.replace(log_file_path + '.tmp', log_file_path)
+    return log_file_path
+
+
+def parse_scale(text: str) -> int:
+    """ '1k', '10M' or '2500' to a number of samples """
+    text = text.strip().lower()
+    factor = {'k': 1_000, 'm': 1_000_000}.get(text[-1:], 1)
+    return int(float(text.rstrip('km')) * factor)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Write a synthetic log file.')
+    parser.add_argument('log_file_path', type=str)
+    parser.add_argument('-f', '--format', type=str, default='gui', choices=FORMATS)
+    parser.add_argument('-s', '--samples', type=str, default='1k')
+    parser.add_argument('-d', '--distance', type=int, default=300)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    generate_log(args.log_file_path, args.format, parse_scale(args.samples), args.distance, args.seed)
+
+
+if __name__ == '__main__':
+    main()
+
+# END OF FILE
+#---------------------------------------------------------------------------------
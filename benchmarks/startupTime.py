@@ -0,0 +1,92 @@
+# -*- coding:utf-8 -*-
+# !/usr/bin/env python
+#---------------------------------------------------------------------------------
+# Author: Zhang
+#
+# Create Date: 2026/10/18
+# Last Update on: 2026/10/18
+#
+# FILE: startupTime.py
+# Description: cold start budget check for logProcessing.py and rangingDemo.py
+#---------------------------------------------------------------------------------
+
+#---------------------------------------------------------------------------------
+# IMPORT REQUIRED PACKAGES HERE
+
+import os
+import sys
+import time
+import argparse
+import subprocess
+import statistics
+
+# END OF PACKAGE IMPORT
+#---------------------------------------------------------------------------------
+
+#---------------------------------------------------------------------------------
+# DEFINE FUNCTIONS HERE
+
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+
+# wall time budget of 'logProcessing.py --help' on top of a bare interpreter start
+STARTUP_BUDGET_MS = 60
+
+# modules which must not be loaded before they are needed
+HEAVY_MODULES = ('numpy', 'pandas', 'openpyxl', 'pyarrow', 'serial', 'socket', 'subprocess')
+
+SCRIPTS = ('logProcessing.py', 'rangingDemo.py')
+
+
+def heavy_modules_loaded(script: str) -> list:
+    """ import a script (without running main) and list heavy modules it pulled in """
+    code = (
+        "import sys, runpy\n"
+        f"runpy.run_path({script!r}, run_name='startup_check')\n"
+        f"print(' '.join(m for m in {HEAVY_MODULES!r} if m in sys.modules))"
+    )
+    output = subprocess.run(
+        [sys.executable, '-c', code], cwd=ROOT_DIR, capture_output=True, text=True, check=True
+    ).stdout
+    return output.split()
+
+
+def median_wall_time_ms(args: list, repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        subprocess.run([sys.executable] + args, cwd=ROOT_DIR, capture_output=True, check=True)
+        timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Check cold start time against STARTUP_BUDGET_MS.')
+    parser.add_argument('-r', '--repeat', type=int, default=10)
+    parser.add_argument('-b', '--budget', type=float, default=STARTUP_BUDGET_MS)
+    args = parser.parse_args()
+
+    failed = False
+    for script in SCRIPTS:
+        loaded = heavy_modules_loaded(script)
+        if loaded:
+            print(f"FAIL {script} imports {', '.join(loaded)} at start up.")
+            failed = True
+        else:
+            print(f"OK   {script} imports no heavy module at start up.")
+
+    interpreter = median_wall_time_ms(['-c', 'pass'], args.repeat)
+    help_time = median_wall_time_ms(['logProcessing.py', '--help'], args.repeat)
+    overhead = help_time - interpreter
+    status = 'OK  ' if overhead <= args.budget else 'FAIL'
+    print(f"{status} logProcessing.py --help: {help_time:.1f} ms, "
+          f"{overhead:.1f} ms over interpreter start (budget {args.budget:.0f} ms).")
+    failed |= overhead > args.budget
+
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == '__main__':
+    main()
+
+# END OF FILE
+#---------------------------------------------------------------------------------
@@ -4,7 +4,7 @@
 # Author: Zhang
 #
 # Create Date: 2024/10/09
-# Last Update on: 2024/11/02
+# Last Update on: 2026/10/18
 #
 # FILE: logProcessing.py
 # Description: option supported script for logAnalyst
@@ -14,9 +14,9 @@
 # IMPORT REQUIRED PACKAGES HERE
 
 import os
+import math
 import argparse
 
-import utils.logAnalyst as logAnalyst
 import utils.functions as funcs
 import utils.component as comps
 
@@ -31,24 +31,75 @@ def main():
     parser = argparse.ArgumentParser(description='Process a log file and analyze distance measurements.')
     args_dict = funcs.logAnalyst_arg_parser(parser=parser)
 
+    # every sample of 'logs' in one SQLite database, queries never re-parse a log
+    index_path = os.path.join(comps.Const.RESULT_DIR, 'samples.sqlite')
+    if args_dict['--index'] or args_dict['--query']:
+        if args_dict['--index']:
+            funcs.update_sample_index(index_path, comps.Const.LOG_DIR)
+        if args_dict['--query']:
+            funcs.query_sample_index(index_path, args_dict['-w'], args_dict['-n'], device_id=args_dict['--device'],
+                                     phy_distance=args_dict['-d'], by_file=args_dict['--by-file'])
+        return
+
+    # analysis modules pull in numpy, load them only once arguments are accepted
+    import utils.logAnalyst as logAnalyst
+    from utils.parseCache import ParseCache
+
+    # parsed sample columns are cached under 'analysis_results' with option '-c'
+    cache = ParseCache(os.path.join(comps.Const.RESULT_DIR, '.cache')) if args_dict['-c'] else None
+
     analyst = logAnalyst.LogAnalyst(
         warmup_samples=args_dict['-w'],
         analysis_samples=args_dict['-n'],
+        percentiles=args_dict['--percentiles'],
+        timeline=args_dict['--timeline'],
     )
 
-    if args_dict['-a']:
+    if args_dict['--sweep']:
+        # every log whose name tells its physical distance, e.g. '260cm.log' or '8.0m.log'
+        tasks = []
+        for filename in funcs.list_log_files(comps.Const.LOG_DIR):
+            phy_distance = funcs.parse_phy_distance(float('inf'), filename)
+            if math.isinf(phy_distance):
+                print(f"{filename} skipped, no physical distance in its name.")
+                continue
+            tasks.append((os.path.join(comps.Const.LOG_DIR, filename), phy_distance,
+                          args_dict['-w'], args_dict['-n'], args_dict['-r'], cache, args_dict['-j']))
+        print(f"Loading {len(tasks)} log files for the sweep.")
+
+        # '-r parallel' splits every file over all workers, files go one by one then
+        outcomes = funcs.batch_analysis(tasks, jobs=1 if args_dict['-r'] == 'parallel' else args_dict['-j'],
+                                        worker=funcs.sweep_worker)
+        funcs.sweep_report(outcomes, os.path.join(comps.Const.RESULT_DIR, f"sweep_report.{args_dict['-o']}"))
+    elif args_dict['-a']:
         # Process all log files under 'logs' folder
         # option '-a' has the heighest priority
-        log_files = [f for f in os.listdir(comps.Const.LOG_DIR) if f.endswith('.log')]
+        log_files = funcs.list_log_files(comps.Const.LOG_DIR)
+        tasks = []
         for filename in log_files:
-            print(f"Processing {filename}.")
-            log_file_path = os.path.join(comps.Const.LOG_DIR, filename)
-            phy_distance = funcs.parse_phy_distance(args_dict['-d'], filename)
-
-            funcs.analysis(analyst, log_file_path, phy_distance, visual=False)
-
-            save_file_path = funcs.construct_save_file_path(filename, comps.Const.RESULT_DIR)
-            analyst.save_result(save_file_path)
+            tasks.append((
+                os.path.join(comps.Const.LOG_DIR, filename),
+                funcs.parse_phy_distance(args_dict['-d'], filename),
+                funcs.construct_save_file_path(filename, comps.Const.RESULT_DIR, ext=args_dict['-o']),
+                args_dict['-w'], args_dict['-n'], args_dict['-r'], cache, args_dict['-o'], args_dict['--profile'],
+                args_dict['--percentiles'],
+                funcs.construct_save_file_path(filename, comps.Const.RESULT_DIR, ext='json', suffix='histogram')
+                if args_dict['--histogram'] else None,
+                args_dict['-j'], args_dict['--timeline'],
+            ))
+        print(f"Processing {len(tasks)} log files.")
+
+        # each file is parsed, analysed and saved in a worker process, or with
+        # '-r parallel' one file after the other, each split over all workers
+        # so a single huge capture does not hold up the batch on one core
+        outcomes = funcs.batch_analysis(tasks, jobs=1 if args_dict['-r'] == 'parallel' else args_dict['-j'])
+        funcs.summarize_batch(outcomes, os.path.join(comps.Const.RESULT_DIR, f"batch_summary.{args_dict['-o']}"))
+        if args_dict['--profile']:
+            funcs.save_batch_profile(outcomes, os.path.join(comps.Const.RESULT_DIR, 'batch_profile.json'))
+        if args_dict['--histogram']:
+            # error histograms of all files merged per device
+            funcs.save_batch_histograms(outcomes, args_dict['--percentiles'],
+                                        os.path.join(comps.Const.RESULT_DIR, 'batch_histogram.json'))
     else: 
         # process single file at once, get file name from input args 
         if args_dict['-f'] is None:
@@ -60,28 +111,63 @@ def main():
                     log_file_path = os.path.join(comps.Const.LOG_DIR, filename)
                     phy_distance = funcs.parse_phy_distance(args_dict['-d'], filename)
 
-                    funcs.analysis(analyst, log_file_path, phy_distance)
-                    save_file_path = funcs.construct_save_file_path(filename, comps.Const.RESULT_DIR)
-                    analyst.save_result(save_file_path)
+                    profiler = funcs.start_profiler() if args_dict['--profile'] else None
+                    funcs.analysis(analyst, log_file_path, phy_distance, reader=args_dict['-r'], cache=cache,
+                                   profiler=profiler, jobs=args_dict['-j'])
+                    save_file_path = funcs.construct_save_file_path(filename, comps.Const.RESULT_DIR, ext=args_dict['-o'])
+                    analyst.save_result(save_file_path, args_dict['-o'])
+                    if profiler is not None:
+                        funcs.save_profile(profiler.report(), funcs.construct_save_file_path(
+                            filename, comps.Const.RESULT_DIR, ext='json', suffix='profile'))
+                    if args_dict['--histogram']:
+                        funcs.save_histograms(analyst.histograms, phy_distance, args_dict['--percentiles'],
+                                              funcs.construct_save_file_path(filename, comps.Const.RESULT_DIR, ext='json',
+                                                                             suffix='histogram'))
 
         elif os.path.isabs(args_dict['-f']):  # received an absolute path
             filename = os.path.basename(args_dict['-f'])
             phy_distance = funcs.parse_phy_distance(args_dict['-d'], filename)
 
-            funcs.analysis(analyst, args_dict['-f'], phy_distance)
-
-            save_file_path = funcs.construct_save_file_path(filename, comps.Const.RESULT_DIR)
-            analyst.save_result(save_file_path)
+            if args_dict['--follow']:
+                # live statistics until Ctrl+C, then the complete analysis below
+                funcs.follow(analyst, args_dict['-f'], phy_distance, args_dict['-w'], args_dict['-n'])
+
+            profiler = funcs.start_profiler() if args_dict['--profile'] else None
+            funcs.analysis(analyst, args_dict['-f'], phy_distance, reader=args_dict['-r'], cache=cache, profiler=profiler,
+                           jobs=args_dict['-j'])
+
+            save_file_path = funcs.construct_save_file_path(filename, comps.Const.RESULT_DIR, ext=args_dict['-o'])
+            analyst.save_result(save_file_path, args_dict['-o'])
+            if profiler is not None:
+                funcs.save_profile(profiler.report(), funcs.construct_save_file_path(
+                    filename, comps.Const.RESULT_DIR, ext='json', suffix='profile'))
+            if args_dict['--histogram']:
+                funcs.save_histograms(analyst.histograms, phy_distance, args_dict['--percentiles'],
+                                      funcs.construct_save_file_path(filename, comps.Const.RESULT_DIR, ext='json',
+                                                                     suffix='histogram'))
         
         else:  # received a relative path from option
             filename = os.path.basename(args_dict['-f'])
             log_file_path = os.path.join(comps.Const.LOG_DIR, filename)
             phy_distance = funcs.parse_phy_distance(args_dict['-d'], filename)
 
-            funcs.analysis(analyst, log_file_path, phy_distance)
-
-            save_file_path = funcs.construct_save_file_path(filename, comps.Const.RESULT_DIR)
-            analyst.save_result(save_file_path)
+            if args_dict['--follow']:
+                # live statistics until Ctrl+C, then the complete analysis below
+                funcs.follow(analyst, log_file_path, phy_distance, args_dict['-w'], args_dict['-n'])
+
+            profiler = funcs.start_profiler() if args_dict['--profile'] else None
+            funcs.analysis(analyst, log_file_path, phy_distance, reader=args_dict['-r'], cache=cache, profiler=profiler,
+                           jobs=args_dict['-j'])
+
+            save_file_path = funcs.construct_save_file_path(filename, comps.Const.RESULT_DIR, ext=args_dict['-o'])
+            analyst.save_result(save_file_path, args_dict['-o'])
+            if profiler is not None:
+                funcs.save_profile(profiler.report(), funcs.construct_save_file_path(
+                    filename, comps.Const.RESULT_DIR, ext='json', suffix='profile'))
+            if args_dict['--histogram']:
+                funcs.save_histograms(analyst.histograms, phy_distance, args_dict['--percentiles'],
+                                      funcs.construct_save_file_path(filename, comps.Const.RESULT_DIR, ext='json',
+                                                                     suffix='histogram'))
 
 
 if __name__ == "__main__":
@@ -26,30 +26,145 @@ def main():
     comps.Const.COMMAND_FILE = os.path.join(os.path.dirname(__file__), 'command.json')
     comps.Const.CLISERVER = os.path.join(os.path.dirname(__file__), 'Cliserver.exe')
     comps.Const.LOG_DIR = os.path.join(os.path.dirname(__file__), 'logs')
+    comps.Const.RESULT_DIR = os.path.join(os.path.dirname(__file__), 'analysis_results')
 
     parser = argparse.ArgumentParser(description='Ranging demo')
     args_dict = funcs.rangingDemo_arg_parser(parser=parser)
 
     funcs.welcome_menu_for_rangingdemo()
 
+    if args_dict['-m'] is not None:
+        run_multi_device(args_dict)
+        return
+
     device = funcs.init_device(args_dict, comps.Const.COMMAND_FILE)
     print('Device initialized successfully.')
     print(f"Device info: {device}")
 
     log_file_name = funcs.name_log_file(device.role, args_dict['-d'])
-    if log_file_name:
-        log_file = open(os.path.join(comps.Const.LOG_DIR, log_file_name), 'w')
+    if log_file_name and args_dict['-b'] != 'only':
+        log_file = funcs.open_log_file(os.path.join(comps.Const.LOG_DIR, log_file_name), args_dict)
     else:
         log_file =None
+    captures = {}  # capture name per tx power of the session, see capture_name
+    # with option '-a' ranging results are analysed while they are received, one analyst per capture
+    analysts = {}
+
+    # Cliserver and its connection live from the first run until exit
+    try:
+        while True:
+            user_input = input("Waiting for command: ").lower().strip()
+            if user_input.startswith('set power'):
+                device.tx_power = int(user_input.split('=')[1])
+            elif user_input.startswith('run'):
+                name, new = capture_name(log_file_name, device, captures) if log_file_name else (None, False)
+                analyst = run_analyst(args_dict, name, analysts)
+                report = funcs.run_ranging_demo(device, args_dict['-t'], comps.Const.CLISERVER, log_file, analyst,
+                                                run_capture_file_path(args_dict, name, new), args_dict['--timeout'],
+                                                args_dict['--retries'], args_dict['--pipeline'])
+                if report is not None and analyst is not None:
+                    funcs.save_inline_analysis(analyst, name, args_dict['-d'], comps.Const.RESULT_DIR,
+                                               args_dict['-o'])
+            elif user_input == 'exit':
+                break
+            else:
+                print('Unsupported command.')
+    except (KeyboardInterrupt, EOFError):
+        print()
+    finally:
+        funcs.close_ranging_demo([device], [log_file])
+        print('Exiting...')
+
+
+def new_analyst(args_dict: dict):
+    # numpy is only loaded when inline analysis is asked for
+    import utils.logAnalyst as logAnalyst
+
+    return logAnalyst.LogAnalyst(warmup_samples=args_dict['-w'], analysis_samples=args_dict['-n'],
+                                 timeline=args_dict['--timeline'])
+
+
+def run_analyst(args_dict: dict, name: str, analysts: dict):
+    # inline analysis goes on over the runs of a capture like its text log and binary capture,
+    # so '<name>_analysis' matches an analysis of them read back
+    if not args_dict['-a'] or not name:
+        return None
+    if name not in analysts:
+        analysts[name] = new_analyst(args_dict)
+        analysts[name].begin_capture()
+    return analysts[name]
+
+
+def capture_name(log_file_name: str, device, captures: dict) -> tuple:
+    # runs of a session with the same tx power go into one capture, named after the text log for
+    # the first tx power and '<log>_tx<power>' for every other, so the samples of a power sweep are
+    # never filed under the header of another power. Return (name, True if new in this session)
+    if device.tx_power in captures:
+        return captures[device.tx_power], False
+    if captures:
+        name = f"{log_file_name.rsplit('.log', 1)[0]}_tx{device.tx_power}.log"
+    else:
+        name = log_file_name
+    captures[device.tx_power] = name
+    return name, True
+
+
+def run_capture_file_path(args_dict: dict, name: str, new: bool):
+    # with option '-b' a binary capture is written under 'logs' next to the text log,
+    # replaced when the session first uses it like the text log, later runs append to it.
+    # It shares the stem of the text log, so '-a', '--sweep' and '--index' read only one of them
+    if args_dict['-b'] == 'off' or not name:
+        return None
+    capture_file_path = os.path.join(comps.Const.LOG_DIR, f"{name.rsplit('.log', 1)[0]}.uwbcap")
+    if new and os.path.exists(capture_file_path):
+        os.remove(capture_file_path)
+    return capture_file_path
+
+
+def run_multi_device(args_dict: dict):
+    devices = funcs.init_devices(args_dict['-m'], comps.Const.COMMAND_FILE)
+    print(f"{len(devices)} devices initialized successfully.")
+    for device in devices:
+        print(f"Device info: {device}")
+
+    log_file_names = funcs.name_log_files(devices, args_dict['-d'])
+    log_files = [
+        funcs.open_log_file(os.path.join(comps.Const.LOG_DIR, name), args_dict)
+        if name and args_dict['-b'] != 'only' else None
+        for name in log_file_names
+    ]
+    captures = [{} for _ in devices]  # capture name per tx power of the session, per device
+    analysts = {}
 
-    while True:
-        user_input = input("Waiting for command: ").lower().strip()
-        if user_input.startswith('set power'):
-            device.tx_power = int(user_input.split('=')[1])
-        elif user_input.startswith('run'):
-            funcs.run_ranging_demo(device, args_dict['-t'], comps.Const.CLISERVER, log_file)
-        else:
-            print('Unsupported command.')
+    try:
+        while True:
+            user_input = input("Waiting for command: ").lower().strip()
+            if user_input.startswith('set power'):
+                for device in devices:
+                    device.tx_power = int(user_input.split('=')[1])
+            elif user_input.startswith('run'):
+                names, capture_file_paths = [], []
+                for log_file_name, device, device_captures in zip(log_file_names, devices, captures):
+                    name, new = capture_name(log_file_name, device, device_captures) if log_file_name else (None, False)
+                    names.append(name)
+                    capture_file_paths.append(run_capture_file_path(args_dict, name, new))
+                run_analysts = [run_analyst(args_dict, name, analysts) for name in names]
+                reports = funcs.run_multi_ranging_demo(devices, args_dict['-t'], comps.Const.CLISERVER, log_files,
+                                                       run_analysts, capture_file_paths, args_dict['--timeout'],
+                                                       args_dict['--retries'], args_dict['--pipeline'])
+                for analyst, name in zip(run_analysts, names):
+                    if reports is not None and analyst is not None:
+                        funcs.save_inline_analysis(analyst, name, args_dict['-d'], comps.Const.RESULT_DIR,
+                                                   args_dict['-o'])
+            elif user_input == 'exit':
+                break
+            else:
+                print('Unsupported command.')
+    except (KeyboardInterrupt, EOFError):
+        print()
+    finally:
+        funcs.close_ranging_demo(devices, log_files)
+        print('Exiting...')
     
 
 if __name__ == "__main__":
@@ -0,0 +1,62 @@
+# -*- coding:utf-8 -*-
+# !/usr/bin/env python
+#---------------------------------------------------------------------------------
+# Author: Zhang
+#
+# Create Date: 2026/10/18
+# Last Update on: 2026/10/18
+#
+# FILE: conftest.py
+# Description: fixtures shared by the tests, replay of a log over a local socket
+#---------------------------------------------------------------------------------
+
+#---------------------------------------------------------------------------------
+# IMPORT REQUIRED PACKAGES HERE
+
+import os
+import sys
+import socket
+import threading
+
+import pytest
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from utils.captureEngine import CaptureEngine
+
+# END OF PACKAGE IMPORT
+#---------------------------------------------------------------------------------
+
+#---------------------------------------------------------------------------------
+# DEFINE FUNCTIONS HERE
+
+REPLAY_CHUNK = 777  # odd size, so lines and UTF-8 sequences are split between reads
+
+
+def replay_bytes(data: bytes, line_handler, log_file=None, chunk=REPLAY_CHUNK) -> dict:
+    """ send data over a socket pair in chunks and capture it with a CaptureEngine, return its report """
+    receiver, sender = socket.socketpair()
+
+    def send():
+        with sender:
+            for start in range(0, len(data), chunk):
+                sender.sendall(data[start:start + chunk])
+
+    thread = threading.Thread(target=send, daemon=True)
+    thread.start()
+    engine = CaptureEngine()
+    engine.add('replay', receiver, log_file=log_file, line_handler=line_handler)
+    try:
+        report = engine.run(30.0, show_progress=False)  # ends as soon as the sender closes
+    finally:
+        engine.close()
+        receiver.close()
+    thread.join()
+    return report['replay']
+
+
+@pytest.fixture
+def replay():
+    return replay_bytes
+
+# END OF FILE
+#---------------------------------------------------------------------------------
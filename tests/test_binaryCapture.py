@@ -0,0 +1,127 @@
+# -*- coding:utf-8 -*-
+# !/usr/bin/env python
+#---------------------------------------------------------------------------------
+# Author: Zhang
+#
+# Create Date: 2026/10/18
+# Last Update on: 2026/10/18
+#
+# FILE: test_binaryCapture.py
+# Description: binary captures of logs replayed over a socket against the text reader, run with python -m pytest tests
+#---------------------------------------------------------------------------------
+
+#---------------------------------------------------------------------------------
+# IMPORT REQUIRED PACKAGES HERE
+
+import os
+import sys
+
+import numpy as np
+import pytest
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+import benchmarks.logGenerator as logGenerator
+import utils.binaryCapture as binaryCapture
+import utils.logFormat as logFormat
+from utils.binaryCapture import CaptureWriter
+from utils.logAnalyst import LogAnalyst
+
+# END OF PACKAGE IMPORT
+#---------------------------------------------------------------------------------
+
+#---------------------------------------------------------------------------------
+# DEFINE FUNCTIONS HERE
+
+LOG_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'logs'))
+REPO_LOGS = sorted(f for f in os.listdir(LOG_DIR) if f.endswith('.log'))
+DEVICE_CONFIG = {'role': 'responder', 'com_port': 'com7', 'tcp_port': '20020', 'tx_power': 5, 'commands': {}}
+
+
+def _capture(log_file_path: str, capture_file_path: str, replay) -> CaptureWriter:
+    writer = CaptureWriter(capture_file_path, DEVICE_CONFIG)
+    with open(log_file_path, 'rb') as f:
+        replay(f.read(), writer.feed_lines)
+    writer.close()
+    return writer
+
+
+def _assert_same_as_text(log_file_path: str, capture_file_path: str, whole_file: bool):
+    text, binary = LogAnalyst(10, 250), LogAnalyst(10, 250)
+    log_file_type = text.stream_log_file(log_file_path, whole_file=whole_file)
+    assert binary.load_capture_file(capture_file_path, whole_file=whole_file) == log_file_type
+    assert list(binary.distances.keys()) == list(text.distances.keys())
+    for device_id in text.distances:
+        assert np.array_equal(np.asarray(binary.distances[device_id]), np.asarray(text.distances[device_id]))
+        assert np.array_equal(np.asarray(binary.timestamps[device_id]), np.asarray(text.timestamps[device_id]))
+    if not whole_file:
+        text.analysis(float('inf'))
+        binary.analysis(float('inf'))
+        assert binary.analysis_results == text.analysis_results
+
+
+@pytest.mark.parametrize('filename', REPO_LOGS)
+def test_repo_logs_replayed(tmp_path, filename, replay):
+    log_file_path = os.path.join(LOG_DIR, filename)
+    capture_file_path = str(tmp_path / 'replay.uwbcap')
+    _capture(log_file_path, capture_file_path, replay)
+    _assert_same_as_text(log_file_path, capture_file_path, whole_file=False)
+    _assert_same_as_text(log_file_path, capture_file_path, whole_file=True)
+
+
+@pytest.mark.parametrize('log_format', logGenerator.FORMATS)
+def test_generated_logs_replayed(tmp_path, log_format, replay):
+    log_file_path = logGenerator.generate_log(str(tmp_path / f"{log_format}.log"), log_format, 1500, seed=6)
+    capture_file_path = str(tmp_path / f"{log_format}.uwbcap")
+    writer = _capture(log_file_path, capture_file_path, replay)
+    header, records = binaryCapture.read_capture(capture_file_path)
+    assert header['log_format'] == log_format and header['device'] == DEVICE_CONFIG
+    assert records.size == writer.records
+    _assert_same_as_text(log_file_path, capture_file_path, whole_file=True)
+
+
+def test_runs_append_under_one_header(tmp_path):
+    lines = open(logGenerator.generate_log(str(tmp_path / 'gui.log'), 'gui', 400, seed=8),
+                 encoding='utf-8').read().splitlines()
+    capture_file_path = str(tmp_path / 'session.uwbcap')
+    half = len(lines) // 2
+    for part in (lines[:half], lines[half:]):
+        writer = CaptureWriter(capture_file_path, DEVICE_CONFIG)
+        writer.feed_lines(part)
+        writer.close()
+    # a record cut off by a crash is dropped when the next run appends
+    with open(capture_file_path, 'ab') as f:
+        f.write(b'\0' * (binaryCapture.RECORD.size // 2))
+    CaptureWriter(capture_file_path, DEVICE_CONFIG).close()
+
+    whole_file_path = str(tmp_path / 'whole.uwbcap')
+    writer = CaptureWriter(whole_file_path, DEVICE_CONFIG)
+    writer.feed_lines(lines)
+    writer.close()
+
+    session, whole = binaryCapture.read_capture(capture_file_path), binaryCapture.read_capture(whole_file_path)
+    assert session[0]['log_format'] == 'gui'
+    for field in ('device', 'status', 'seq', 'timestamp', 'distance'):
+        assert np.array_equal(session[1][field], whole[1][field])
+
+
+def test_other_device_configuration_is_not_appended(tmp_path):
+    capture_file_path = str(tmp_path / 'session.uwbcap')
+    CaptureWriter(capture_file_path, DEVICE_CONFIG).close()
+    with pytest.raises(ValueError):
+        CaptureWriter(capture_file_path, dict(DEVICE_CONFIG, tx_power=7))
+    header, _ = binaryCapture.read_capture(capture_file_path)
+    assert header['device'] == DEVICE_CONFIG
+
+
+def test_unrecognized_head_is_given_up(tmp_path):
+    writer = CaptureWriter(str(tmp_path / 'capture.uwbcap'), DEVICE_CONFIG)
+    line = 'x' * 99
+    for _ in range(2 * logFormat.DETECT_BYTES // 100):
+        writer.feed_lines([line])
+    assert writer.unsupported
+    writer.feed_lines(['(PORT 1) : 6a,5,0,18,21,43,65,87,0,0,0,7e   TimeStamp  :  927646       Distance  :  126'])
+    writer.close()
+    assert writer.log_file_type is None and writer.records == 0
+
+# END OF FILE
+#---------------------------------------------------------------------------------
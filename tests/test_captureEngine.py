@@ -0,0 +1,65 @@
+# -*- coding:utf-8 -*-
+# !/usr/bin/env python
+#---------------------------------------------------------------------------------
+# Author: Zhang
+#
+# Create Date: 2026/10/18
+# Last Update on: 2026/10/18
+#
+# FILE: test_captureEngine.py
+# Description: line splitting and end of run of CaptureEngine channels, run with python -m pytest tests
+#---------------------------------------------------------------------------------
+
+#---------------------------------------------------------------------------------
+# IMPORT REQUIRED PACKAGES HERE
+
+import io
+import os
+import sys
+import socket
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from utils.captureEngine import CaptureEngine
+
+# END OF PACKAGE IMPORT
+#---------------------------------------------------------------------------------
+
+#---------------------------------------------------------------------------------
+# DEFINE FUNCTIONS HERE
+
+TEXT = 'Distance : 300 cm, ±2\n' * 200  # multi-byte characters split by the replay chunks
+
+
+def test_lines_reach_log_and_handler_unsplit(replay):
+    log_file, lines = io.StringIO(), []
+    report = replay(TEXT.encode('utf-8'), lines.extend, log_file=log_file)
+    assert log_file.getvalue() == TEXT
+    assert lines == TEXT.splitlines()
+    assert report['lines'] == 200 and report['partial line dropped (bytes)'] == 0
+
+
+def test_last_line_of_closed_connection_is_ended(replay):
+    log_file, lines = io.StringIO(), []
+    report = replay((TEXT + 'Distance : 301').encode('utf-8'), lines.extend, log_file=log_file)
+    assert report['connection closed']
+    assert log_file.getvalue() == TEXT + 'Distance : 301\n'
+    assert lines[-1] == 'Distance : 301' and report['lines'] == 201
+
+
+def test_partial_line_dropped_at_deadline():
+    receiver, sender = socket.socketpair()
+    with receiver, sender:
+        sender.sendall((TEXT + 'Distance : 3').encode('utf-8'))  # the run ends in the middle of a line
+        log_file, lines = io.StringIO(), []
+        engine = CaptureEngine()
+        engine.add('open', receiver, log_file=log_file, line_handler=lines.extend)
+        report = engine.run(0.3, show_progress=False)['open']
+        engine.close()
+    # the next run would append to a half line otherwise, and the analysis would see 3 cm
+    assert log_file.getvalue() == TEXT
+    assert lines == TEXT.splitlines()
+    assert report['partial line dropped (bytes)'] == len('Distance : 3')
+    assert not report['connection closed']
+
+# END OF FILE
+#---------------------------------------------------------------------------------
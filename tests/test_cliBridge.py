@@ -0,0 +1,184 @@
+# -*- coding:utf-8 -*-
+# !/usr/bin/env python
+#---------------------------------------------------------------------------------
+# Author: Zhang
+#
+# Create Date: 2026/10/18
+# Last Update on: 2026/10/18
+#
+# FILE: test_cliBridge.py
+# Description: CliBridge command/response matching against a scripted CLI, run with python -m pytest tests
+#---------------------------------------------------------------------------------
+
+#---------------------------------------------------------------------------------
+# IMPORT REQUIRED PACKAGES HERE
+
+import os
+import sys
+import socket
+import threading
+
+import pytest
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+import utils.functions as funcs
+import utils.logFormat as logFormat
+from utils.cliBridge import CliBridge, PIPELINE_COMMAND_END
+from utils.device import Device
+
+# END OF PACKAGE IMPORT
+#---------------------------------------------------------------------------------
+
+#---------------------------------------------------------------------------------
+# DEFINE FUNCTIONS HERE
+
+COMMANDS = [('reset', 'reset'), ('boot', 'boot'), ('setpower', 'config -w -tx_power 5'), ('start', '[^UWB:2A00]')]
+OUTPUT = b'(PORT 1) : 00,00,00,00,00,00,00,00,00,00,00, TimeStamp : 100, Distance : 300\r\n'
+
+
+def _is_output(line: str) -> bool:
+    return logFormat.detect_format(line) is not None
+
+
+class ScriptedCli(object):
+    """ other end of a socket pair, answers what it receives with respond(data) -> bytes or None """
+    def __init__(self, respond, **bridge_options) -> None:
+        self.received = []
+        self._respond = respond
+        self._sock, bridge_sock = socket.socketpair()
+        self.bridge = CliBridge('unused', '127.0.0.1', 0, 'com7', is_output=_is_output, command_timeout=0.5,
+                                **bridge_options)
+        self.bridge.sock = bridge_sock
+        self._thread = threading.Thread(target=self._serve, daemon=True)
+        self._thread.start()
+
+    def _serve(self):
+        while True:
+            try:
+                data = self._sock.recv(65536)
+            except OSError:
+                return
+            if not data:
+                return
+            self.received.append(data)
+            reply = self._respond(data)
+            if reply:
+                self._sock.sendall(reply)
+
+    def send(self, data: bytes):
+        self._sock.sendall(data)
+
+    def close(self):
+        self.bridge.close()
+        self._sock.close()
+        self._thread.join()
+
+
+@pytest.fixture
+def scripted():
+    clis = []
+
+    def start(respond, **bridge_options):
+        cli = ScriptedCli(respond, **bridge_options)
+        clis.append(cli)
+        return cli
+    yield start
+    for cli in clis:
+        cli.close()
+
+
+def test_default_sends_raw_commands_one_at_a_time(scripted):
+    cli = scripted(lambda data: b'OK ' + data + b'\r\n')
+    responses = cli.bridge.execute(COMMANDS)
+    assert responses == [(name, f"OK {command}") for name, command in COMMANDS]
+    # no line end added and each command only after the previous response
+    assert cli.received == [command.encode() for _, command in COMMANDS]
+
+
+def test_response_without_line_end(scripted):
+    cli = scripted(lambda data: b'> ' + data)
+    assert cli.bridge.execute(COMMANDS[:2]) == [('reset', '> reset'), ('boot', '> boot')]
+
+
+def test_ranging_output_is_never_a_response(scripted):
+    # output of the previous run keeps coming until reset is answered
+    def respond(data):
+        reply = OUTPUT * 3 + b'\r\n' + b'OK ' + data + b'\r\n'
+        return reply + OUTPUT if data.startswith(b'[^UWB') else reply
+    cli = scripted(respond)
+    cli.send(OUTPUT * 5)  # leftovers before the run, discarded
+    responses = cli.bridge.execute(COMMANDS)
+    assert [response for _, response in responses] == [f"OK {command}" for _, command in COMMANDS]
+    # output after the last response is kept for the capture or still on the socket, never consumed
+    rest = cli.bridge.take_pending()
+    while len(rest) < len(OUTPUT):
+        rest += cli.bridge.sock.recv(65536)
+    assert rest == OUTPUT
+
+
+def test_no_response_raises_without_retries(scripted):
+    cli = scripted(lambda data: b'OK reset\r\n' if data == b'reset' else None)
+    with pytest.raises(TimeoutError):
+        cli.bridge.execute(COMMANDS)
+    assert cli.received == [b'reset', b'boot']  # not resent
+
+
+def test_retries_are_opt_in(scripted):
+    attempts = []
+
+    def respond(data):
+        attempts.append(data)
+        if data == b'boot' and attempts.count(b'boot') == 1:
+            return None  # first boot is lost
+        return b'OK ' + data + b'\r\n'
+    cli = scripted(respond, retries=1)
+    assert [name for name, _ in cli.bridge.execute(COMMANDS)] == [name for name, _ in COMMANDS]
+    assert attempts.count(b'boot') == 2
+
+
+def test_pipeline_matches_responses_in_order(scripted):
+    def respond(data):
+        commands = [c for c in data.split(PIPELINE_COMMAND_END) if c]
+        return b''.join(OUTPUT + b'OK ' + command + b'\r\n' for command in commands)
+    cli = scripted(respond, pipeline=True, command_end=PIPELINE_COMMAND_END)
+    responses = cli.bridge.execute(COMMANDS)
+    assert responses == [(name, f"OK {command}") for name, command in COMMANDS]
+    assert b''.join(cli.received) == b''.join(command.encode() + PIPELINE_COMMAND_END for _, command in COMMANDS)
+
+
+def test_pipeline_resends_only_unanswered(scripted):
+    sent = []
+
+    def respond(data):
+        commands = [c for c in data.split(PIPELINE_COMMAND_END) if c]
+        sent.append(commands)
+        if len(sent) == 1:
+            commands = commands[:2]  # the last two are lost once
+        return b''.join(b'OK ' + command + b'\r\n' for command in commands)
+    cli = scripted(respond, pipeline=True, command_end=PIPELINE_COMMAND_END, retries=1)
+    assert len(cli.bridge.execute(COMMANDS)) == len(COMMANDS)
+    assert sent[1] == [command.encode() for _, command in COMMANDS[2:]]
+
+
+def test_pipeline_needs_command_end(scripted):
+    cli = scripted(lambda data: None, pipeline=True)
+    with pytest.raises(ValueError):
+        cli.bridge.execute(COMMANDS)
+
+
+def test_unanswered_commands_abort_the_run(scripted, monkeypatch):
+    cli = scripted(lambda data: None)
+    device = Device('responder', dict(COMMANDS), 'com7')
+
+    def establish_tcp_conn(*args, **kwargs):
+        device.bridge, device.tcp_connection = cli.bridge, cli.bridge.sock
+    monkeypatch.setattr(device, 'establish_tcp_conn', establish_tcp_conn)
+    monkeypatch.setattr(device, 'capture', lambda *args, **kwargs: pytest.fail('aborted run captured'))
+
+    device.establish_tcp_conn()
+    assert device.send_cmds() is None
+    assert funcs.run_ranging_demo(device, 10, 'unused') is None
+    assert device.bridge is None  # Cliserver ended, the next run starts a new one
+
+# END OF FILE
+#---------------------------------------------------------------------------------
@@ -0,0 +1,109 @@
+# -*- coding:utf-8 -*-
+# !/usr/bin/env python
+#---------------------------------------------------------------------------------
+# Author: Zhang
+#
+# Create Date: 2026/10/18
+# Last Update on: 2026/10/18
+#
+# FILE: test_distanceHistogram.py
+# Description: checks of DistanceHistogram merge, percentiles and JSON round trip, run with python -m pytest tests
+#---------------------------------------------------------------------------------
+
+#---------------------------------------------------------------------------------
+# IMPORT REQUIRED PACKAGES HERE
+
+import os
+import sys
+import json
+import math
+import pickle
+
+import numpy as np
+import pytest
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from utils.distanceHistogram import DistanceHistogram
+
+# END OF PACKAGE IMPORT
+#---------------------------------------------------------------------------------
+
+#---------------------------------------------------------------------------------
+# DEFINE FUNCTIONS HERE
+
+def _distances(seed: int, size: int) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    distances = rng.integers(280, 320, size).astype(np.float32)
+    distances[rng.random(size) < 0.05] = np.inf
+    return distances
+
+
+def test_merge_equals_histogram_of_all_samples():
+    parts = [_distances(seed, 1000 + seed * 7) for seed in range(4)]
+    merged = DistanceHistogram()
+    for part in parts:
+        histogram = DistanceHistogram()
+        histogram.add_array(part)
+        merged.merge(histogram)
+
+    whole = DistanceHistogram()
+    whole.add_array(np.concatenate(parts))
+    assert merged.counts == whole.counts
+    assert merged.failures == whole.failures
+
+
+def test_merge_order_does_not_matter():
+    a, b = DistanceHistogram(), DistanceHistogram()
+    a.add_array(_distances(1, 500))
+    b.add_array(_distances(2, 700))
+    ab = DistanceHistogram().merge(a).merge(b)
+    ba = DistanceHistogram().merge(b).merge(a)
+    assert ab.counts == ba.counts and ab.failures == ba.failures
+
+
+def test_merge_rejects_other_resolution():
+    with pytest.raises(ValueError):
+        DistanceHistogram(1.0).merge(DistanceHistogram(0.5))
+
+
+def test_add_and_add_array_agree():
+    distances = _distances(5, 2000)
+    one_by_one, at_once = DistanceHistogram(), DistanceHistogram()
+    for distance in distances.tolist():
+        one_by_one.add(distance)
+    at_once.add_array(distances)
+    assert one_by_one.counts == at_once.counts and one_by_one.failures == at_once.failures
+
+
+def test_percentiles_exact_for_integer_cm():
+    distances = _distances(9, 5001)
+    histogram = DistanceHistogram()
+    histogram.add_array(distances)
+    valid = np.sort(distances[np.isfinite(distances)])
+    for p, value in histogram.percentiles((1, 5, 50, 90, 99, 100)).items():
+        rank = max(1, math.ceil(p / 100 * valid.size))  # nearest rank
+        assert value == valid[rank - 1]
+
+
+def test_empty_percentiles_are_nan():
+    assert all(math.isnan(v) for v in DistanceHistogram().percentiles((50, 90)).values())
+
+
+def test_json_and_pickle_round_trip():
+    histogram = DistanceHistogram()
+    histogram.add_array(_distances(3, 800))
+    restored = DistanceHistogram.from_dict(json.loads(json.dumps(histogram.to_dict())))
+    assert restored.counts == histogram.counts and restored.failures == histogram.failures
+    unpickled = pickle.loads(pickle.dumps(histogram))
+    assert unpickled.counts == histogram.counts
+
+
+def test_shifted_gives_error_histogram():
+    histogram = DistanceHistogram()
+    histogram.add_array(np.array([299, 300, 300, 302, np.inf], dtype=np.float32))
+    error = histogram.shifted(-300)
+    assert error.counts == {-1: 1, 0: 2, 2: 1}
+    assert error.failures == 1
+
+# END OF FILE
+#---------------------------------------------------------------------------------
@@ -0,0 +1,61 @@
+# -*- coding:utf-8 -*-
+# !/usr/bin/env python
+#---------------------------------------------------------------------------------
+# Author: Zhang
+#
+# Create Date: 2026/10/18
+# Last Update on: 2026/10/18
+#
+# FILE: test_functions.py
+# Description: log file discovery and argument checks of utils.functions, run with python -m pytest tests
+#---------------------------------------------------------------------------------
+
+#---------------------------------------------------------------------------------
+# IMPORT REQUIRED PACKAGES HERE
+
+import os
+import sys
+import argparse
+
+import pytest
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+import utils.functions as funcs
+
+# END OF PACKAGE IMPORT
+#---------------------------------------------------------------------------------
+
+#---------------------------------------------------------------------------------
+# DEFINE FUNCTIONS HERE
+
+def _touch(directory, *names):
+    for name in names:
+        (directory / name).write_bytes(b'')
+
+
+def test_one_log_file_per_stem(tmp_path):
+    _touch(tmp_path, '8.0m.log.gz', '8.0m.log', '260cm.log.xz', 'notes.txt')
+    assert funcs.list_log_files(str(tmp_path)) == ['260cm.log.xz', '8.0m.log']
+
+
+def test_capture_next_to_its_text_log_is_skipped(tmp_path):
+    # '-b also' writes '300cm.uwbcap' next to '300cm.log', '-b only' writes the capture alone
+    _touch(tmp_path, '300cm.log', '300cm.uwbcap', '400cm.uwbcap')
+    assert funcs.list_log_files(str(tmp_path)) == ['300cm.log', '400cm.uwbcap']
+
+
+def test_result_names_follow_the_stem():
+    for name in ('8.0m.log', '8.0m.log.gz', '8.0m.log.zst'):
+        assert funcs.construct_save_file_path(name, 'results', ext='csv') == os.path.join('results', '8.0m_analysis.csv')
+
+
+def test_percentiles_are_checked():
+    parser = argparse.ArgumentParser()
+    assert funcs.parse_percentiles(parser, '5, 50,99.9,') == (5.0, 50.0, 99.9)
+    assert funcs.parse_percentiles(parser, '0,100') == (0.0, 100.0)
+    for bad in ('50,150', '-1', 'nan', 'median'):
+        with pytest.raises(SystemExit):
+            funcs.parse_percentiles(parser, bad)
+
+# END OF FILE
+#---------------------------------------------------------------------------------
@@ -0,0 +1,120 @@
+# -*- coding:utf-8 -*-
+# !/usr/bin/env python
+#---------------------------------------------------------------------------------
+# Author: Zhang
+#
+# Create Date: 2026/10/18
+# Last Update on: 2026/10/18
+#
+# FILE: test_inlineAnalysis.py
+# Description: inline analysis of logs replayed over a socket against the file reader, run with python -m pytest tests
+#---------------------------------------------------------------------------------
+
+#---------------------------------------------------------------------------------
+# IMPORT REQUIRED PACKAGES HERE
+
+import os
+import sys
+import random
+
+import numpy as np
+import pytest
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+import benchmarks.logGenerator as logGenerator
+import utils.logFormat as logFormat
+from utils.logAnalyst import LogAnalyst
+
+# END OF PACKAGE IMPORT
+#---------------------------------------------------------------------------------
+
+#---------------------------------------------------------------------------------
+# DEFINE FUNCTIONS HERE
+
+LOG_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'logs'))
+REPO_LOGS = sorted(f for f in os.listdir(LOG_DIR) if f.endswith('.log'))
+
+
+def _file_results(log_file_path: str) -> LogAnalyst:
+    analyst = LogAnalyst(10, 250)
+    analyst.extract_distance(analyst.read_log_file(log_file_path))
+    analyst.analysis(float('inf'))
+    return analyst
+
+
+def _inline_results(log_file_path: str, replay) -> LogAnalyst:
+    analyst = LogAnalyst(10, 250)
+    analyst.begin_capture()
+    with open(log_file_path, 'rb') as f:
+        replay(f.read(), analyst.feed_lines)
+    assert analyst.end_capture() is not None
+    analyst.analysis(float('inf'))
+    return analyst
+
+
+def _assert_same(expected: LogAnalyst, actual: LogAnalyst):
+    assert list(actual.distances.keys()) == list(expected.distances.keys())
+    for device_id in expected.distances:
+        assert np.array_equal(actual.distances[device_id], expected.distances[device_id])
+        assert np.array_equal(actual.timestamps[device_id], expected.timestamps[device_id])
+    assert actual.analysis_results == expected.analysis_results
+
+
+@pytest.mark.parametrize('filename', REPO_LOGS)
+def test_repo_logs_replayed(filename, replay):
+    log_file_path = os.path.join(LOG_DIR, filename)
+    _assert_same(_file_results(log_file_path), _inline_results(log_file_path, replay))
+
+
+@pytest.mark.parametrize('log_format', logGenerator.FORMATS)
+def test_generated_logs_replayed(tmp_path, log_format, replay):
+    log_file_path = logGenerator.generate_log(str(tmp_path / f"{log_format}.log"), log_format, 2000, seed=4)
+    _assert_same(_file_results(log_file_path), _inline_results(log_file_path, replay))
+
+
+@pytest.mark.parametrize('timeline', ['window', 'capture'])
+def test_runs_of_a_capture_accumulate(tmp_path, timeline, replay):
+    # the log of a session holds all its runs, the inline result after the last run must match it
+    log_file_path = logGenerator.generate_log(str(tmp_path / 'gui.log'), 'gui', 600, seed=5)
+    with open(log_file_path, 'rb') as f:
+        lines = f.read().splitlines(keepends=True)
+    runs = [lines[:40], lines[40:1000], lines[1000:]]  # the first run is shorter than the window
+    analyst = LogAnalyst(10, 250, timeline=timeline)
+    analyst.begin_capture()
+    for run in runs:
+        replay(b''.join(run), analyst.feed_lines)
+        assert analyst.end_capture() == 'gui'
+        analyst.analysis(float('inf'))
+    expected = LogAnalyst(10, 250, timeline=timeline)
+    expected.stream_log_file(log_file_path)
+    expected.analysis(float('inf'))
+    _assert_same(expected, analyst)
+
+
+def test_head_before_first_result_is_kept(tmp_path):
+    lines = open(logGenerator.generate_log(str(tmp_path / 'gui.log'), 'gui', 300), encoding='utf-8').read().splitlines()
+    analyst = LogAnalyst(0, 100)
+    analyst.begin_capture()
+    analyst.feed_lines(['OK reset', 'OK boot'])
+    for start in range(0, len(lines), 7):
+        analyst.feed_lines(lines[start:start + 7])
+    assert analyst.end_capture() == 'gui'
+    assert all(dists.size == 100 for dists in analyst.distances.values())
+
+
+def test_unrecognized_head_is_bounded():
+    analyst = LogAnalyst(0, 100)
+    analyst.begin_capture()
+    line = 'x' * 99
+    for _ in range(2 * logFormat.DETECT_BYTES // 100):
+        analyst.feed_lines([line])
+    # given up like the file readers, nothing more is buffered or detected
+    assert analyst.end_capture() is None
+    result = [line for line in logGenerator.gui_lines(5, 300, random.Random(0)) if line]
+    assert logFormat.detect_format(result[0]) == 'gui'
+    analyst.feed_lines(result)
+    assert analyst.end_capture() is None
+    assert not analyst._capture_head
+
+# END OF FILE
+#---------------------------------------------------------------------------------
@@ -0,0 +1,65 @@
+# -*- coding:utf-8 -*-
+# !/usr/bin/env python
+#---------------------------------------------------------------------------------
+# Author: Zhang
+#
+# Create Date: 2026/10/18
+# Last Update on: 2026/10/18
+#
+# FILE: test_logFollower.py
+# Description: LogFollower on a growing log, run with python -m pytest tests
+#---------------------------------------------------------------------------------
+
+#---------------------------------------------------------------------------------
+# IMPORT REQUIRED PACKAGES HERE
+
+import os
+import sys
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+import benchmarks.logGenerator as logGenerator
+import utils.logFormat as logFormat
+from utils.logFollower import LogFollower
+
+# END OF PACKAGE IMPORT
+#---------------------------------------------------------------------------------
+
+#---------------------------------------------------------------------------------
+# DEFINE FUNCTIONS HERE
+
+def _append(path: str, data: bytes):
+    with open(path, 'ab') as f:
+        f.write(data)
+
+
+def test_follows_appended_lines(tmp_path):
+    data = open(logGenerator.generate_log(str(tmp_path / 'source.log'), 'gui', 500, seed=7), 'rb').read()
+    path = str(tmp_path / 'growing.log')
+    follower = LogFollower(path, 10, 250)
+    assert follower.poll() == 0  # not created yet
+    samples = 0
+    for start in range(0, len(data), 1001):  # cut inside lines
+        _append(path, data[start:start + 1001])
+        samples += follower.poll()
+    expected = [line for line in data.decode('utf-8').splitlines() if logFormat.extract_gui(line.strip())]
+    assert follower.log_file_type == 'gui' and samples == len(expected)
+
+
+def test_unrecognized_head_is_given_up(tmp_path):
+    path = str(tmp_path / 'growing.log')
+    follower = LogFollower(path, 0, 10)
+    line = b'x' * 99 + b'\n'
+    for _ in range(2 * logFormat.DETECT_BYTES // len(line)):
+        _append(path, line * 5)
+        follower.poll()
+    assert follower.unsupported and follower.log_file_type is None
+    # results after the head are not looked at anymore, like the file readers
+    _append(path, b'(PORT 1) : 6a,5,0,18,21,43,65,87,0,0,0,7e   TimeStamp  :  927646       Distance  :  126\n')
+    assert follower.poll() == 0 and follower.log_file_type is None
+    # a re-created log is followed from the start again
+    open(path, 'wb').close()
+    _append(path, b'(PORT 1) : 6a,5,0,18,21,43,65,87,0,0,0,7e   TimeStamp  :  927646       Distance  :  126\n')
+    assert follower.poll() == 1 and not follower.unsupported
+
+# END OF FILE
+#---------------------------------------------------------------------------------
@@ -0,0 +1,67 @@
+# -*- coding:utf-8 -*-
+# !/usr/bin/env python
+#---------------------------------------------------------------------------------
+# Author: Zhang
+#
+# Create Date: 2026/10/18
+# Last Update on: 2026/10/18
+#
+# FILE: test_logFormat.py
+# Description: gui extractors and scanner on malformed lines, run with python -m pytest tests
+#---------------------------------------------------------------------------------
+
+#---------------------------------------------------------------------------------
+# IMPORT REQUIRED PACKAGES HERE
+
+import os
+import sys
+
+import pytest
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+import utils.logFormat as logFormat
+from utils.binaryCapture import CaptureWriter
+from utils.logAnalyst import LogAnalyst
+
+# END OF PACKAGE IMPORT
+#---------------------------------------------------------------------------------
+
+#---------------------------------------------------------------------------------
+# DEFINE FUNCTIONS HERE
+
+GOOD = '(PORT 1) : 6a,5,0,18,21,43,65,87,0,0,0,7e,0,1a,0,0   TimeStamp  :  927646       Distance  :  126'
+MALFORMED = [
+    '(PORT 1) : 6a,5,0,18   TimeStamp  :  927647       Distance  :  127',               # truncated payload
+    '(PORT 1) : 6a,5,0,18,21,43,65,87,0,0   TimeStamp  :  927648       Distance  :  128',  # no field after the status
+    '(PORT 1) : 6a,5,0,18,21,43,65,87,0,zz,0,7e   TimeStamp  :  927649       Distance  :  129',  # status not hex
+    '(PORT 1) :6a,5,0,18 TimeStamp:927650 Distance:130',                                # truncated, other spacing
+]
+
+
+@pytest.mark.parametrize('line', MALFORMED)
+def test_malformed_gui_line_is_skipped(line):
+    assert logFormat.extract_gui(line) is None
+    assert list(logFormat.scan_gui(line.encode())) == []
+
+
+def test_extractor_and_scanner_agree():
+    text = '\n'.join([GOOD] + MALFORMED + [GOOD.replace('126', '65535')]) + '\n'
+    extracted = [sample for sample in map(logFormat.extract_gui, text.splitlines()) if sample is not None]
+    assert extracted == list(logFormat.scan_gui(text.encode()))
+    assert [sample[2] for sample in extracted] == [126.0, logFormat.FAILED_DISTANCE]
+
+
+def test_malformed_line_does_not_stop_a_capture(tmp_path):
+    # line handlers run inside the capture engine, an exception there would end the run
+    analyst = LogAnalyst(0, 10)
+    analyst.begin_capture()
+    writer = CaptureWriter(str(tmp_path / 'capture.uwbcap'), {})
+    for handler in (analyst.feed_lines, writer.feed_lines):
+        handler([GOOD] + MALFORMED + [GOOD])
+    writer.close()
+    assert analyst.end_capture() == 'gui'
+    assert analyst.distances['1'].tolist() == [126.0, 126.0]
+    assert writer.records == 2
+
+# END OF FILE
+#---------------------------------------------------------------------------------
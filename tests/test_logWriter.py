@@ -0,0 +1,121 @@
+# -*- coding:utf-8 -*-
+# !/usr/bin/env python
+#---------------------------------------------------------------------------------
+# Author: Zhang
+#
+# Create Date: 2026/10/18
+# Last Update on: 2026/10/18
+#
+# FILE: test_logWriter.py
+# Description: checks of LogWriter flush, rotation and backpressure, run with python -m pytest tests
+#---------------------------------------------------------------------------------
+
+#---------------------------------------------------------------------------------
+# IMPORT REQUIRED PACKAGES HERE
+
+import os
+import sys
+import time
+
+import pytest
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from utils.logWriter import LogWriter
+
+# END OF PACKAGE IMPORT
+#---------------------------------------------------------------------------------
+
+#---------------------------------------------------------------------------------
+# DEFINE FUNCTIONS HERE
+
+def _read(path: str) -> str:
+    with open(path, 'r', encoding='utf-8', newline='') as f:
+        return f.read().replace(os.linesep, '\n')
+
+
+def _chunks(n: int) -> list:
+    # received chunks of complete lines, like the capture engine writes them
+    return [f"(PORT {i % 3 + 1}) : line {i}, Distance : {300 + i % 7}\n" * (1 + i % 4) for i in range(n)]
+
+
+def test_flush_makes_everything_visible(tmp_path):
+    path = str(tmp_path / 'capture.log')
+    writer = LogWriter(path, flush_interval=60.0)  # no periodic flush during the test
+    chunks = _chunks(50)
+    for chunk in chunks:
+        writer.write(chunk)
+    writer.flush()
+    assert _read(path) == ''.join(chunks)  # before close, from a second handle
+    writer.write('tail\n')
+    writer.close()
+    assert _read(path) == ''.join(chunks) + 'tail\n'
+
+
+def test_periodic_flush(tmp_path):
+    path = str(tmp_path / 'capture.log')
+    with LogWriter(path, flush_interval=0.05) as writer:
+        writer.write('first\n')
+        deadline = time.monotonic() + 5.0
+        while _read(path) != 'first\n' and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert _read(path) == 'first\n'
+
+
+def test_rotation_by_size_splits_between_writes(tmp_path):
+    path = str(tmp_path / '300cm.log')
+    chunks = _chunks(400)
+    writer = LogWriter(path, rotate_bytes=4096)
+    for chunk in chunks:
+        writer.write(chunk)
+        writer.flush()  # one batch per chunk, so parts can end after any of them
+    writer.close()
+
+    parts = [path] + [str(tmp_path / f"300cm_{i:03d}.log") for i in range(1, writer.metrics()['rotations'] + 1)]
+    assert writer.metrics()['rotations'] > 1
+    assert not os.path.exists(str(tmp_path / f"300cm_{len(parts):03d}.log"))
+    texts = [_read(part) for part in parts]
+    assert ''.join(texts) == ''.join(chunks)  # nothing lost or repeated
+    longest = max(len(chunk.encode()) for chunk in chunks)
+    for text in texts:
+        assert text.endswith('\n')  # never split inside a line
+        assert len(text.encode()) <= 4096 + longest
+
+
+def test_rotation_by_age(tmp_path):
+    path = str(tmp_path / 'capture.log')
+    with LogWriter(path, rotate_seconds=0.05) as writer:
+        writer.write('before\n')
+        writer.flush()
+        time.sleep(0.1)
+        writer.write('after\n')
+        writer.flush()
+        assert writer.name == str(tmp_path / 'capture_001.log')
+    assert _read(path) == 'before\n'
+    assert _read(str(tmp_path / 'capture_001.log')) == 'after\n'
+
+
+def test_backpressure_drops_nothing(tmp_path):
+    path = str(tmp_path / 'capture.log')
+    chunks = _chunks(2000)
+    with LogWriter(path, max_queue_chars=1024) as writer:
+        for chunk in chunks:
+            writer.write(chunk)
+    assert _read(path) == ''.join(chunks)
+    assert writer.metrics()['queued chars'] == 0
+
+
+def test_closed_writer(tmp_path):
+    writer = LogWriter(str(tmp_path / 'capture.log'))
+    writer.close()
+    writer.close()  # second close is a no-op
+    assert writer.closed
+    with pytest.raises(ValueError):
+        writer.write('late\n')
+
+
+def test_unknown_fsync_policy(tmp_path):
+    with pytest.raises(ValueError):
+        LogWriter(str(tmp_path / 'capture.log'), fsync='always')
+
+# END OF FILE
+#---------------------------------------------------------------------------------
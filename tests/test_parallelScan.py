@@ -0,0 +1,107 @@
+# -*- coding:utf-8 -*-
+# !/usr/bin/env python
+#---------------------------------------------------------------------------------
+# Author: Zhang
+#
+# Create Date: 2026/10/18
+# Last Update on: 2026/10/18
+#
+# FILE: test_parallelScan.py
+# Description: parallel_scan_log_file against the default reader with tiny byte ranges, run with python -m pytest tests
+#---------------------------------------------------------------------------------
+
+#---------------------------------------------------------------------------------
+# IMPORT REQUIRED PACKAGES HERE
+
+import os
+import sys
+
+import numpy as np
+import pytest
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+import benchmarks.logGenerator as logGenerator
+import utils.logAnalyst as logAnalyst
+from utils.logAnalyst import LogAnalyst
+from utils.stageProfiler import StageProfiler
+
+# END OF PACKAGE IMPORT
+#---------------------------------------------------------------------------------
+
+#---------------------------------------------------------------------------------
+# DEFINE FUNCTIONS HERE
+
+LOG_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'logs'))
+REPO_LOGS = sorted(f for f in os.listdir(LOG_DIR) if f.endswith('.log'))
+RANGE_BYTES = 1024  # forced range size, so even the small repo logs are split many times
+JOBS = 4
+
+
+def _default_columns(log_file_path: str, warmup: int, analysis: int) -> tuple:
+    analyst = LogAnalyst(warmup, analysis)
+    log_file_type = analyst.read_log_file(log_file_path)
+    analyst.extract_distance(log_file_type)
+    return log_file_type, analyst.distances, analyst.timestamps
+
+
+def _parallel_columns(log_file_path: str, warmup: int, analysis: int) -> tuple:
+    analyst = LogAnalyst(warmup, analysis)
+    log_file_type = analyst.parallel_scan_log_file(log_file_path, jobs=JOBS)
+    return log_file_type, analyst.distances, analyst.timestamps
+
+
+def _assert_same(expected: tuple, actual: tuple):
+    assert actual[0] == expected[0]
+    assert list(actual[1].keys()) == list(expected[1].keys())  # device order of first appearance
+    for device_id in expected[1]:
+        assert np.array_equal(actual[1][device_id], expected[1][device_id])
+        assert np.array_equal(actual[2][device_id], expected[2][device_id])
+
+
+@pytest.fixture(autouse=True)
+def tiny_ranges(monkeypatch):
+    monkeypatch.setattr(logAnalyst, 'PARALLEL_MIN_RANGE_BYTES', RANGE_BYTES)
+
+
+@pytest.mark.parametrize('log_format', logGenerator.FORMATS)
+@pytest.mark.parametrize('window', [(10, 250), (0, 10 ** 9)])
+def test_generated_logs(tmp_path, log_format, window):
+    log_file_path = logGenerator.generate_log(str(tmp_path / f"{log_format}.log"), log_format, 3000, seed=1)
+    assert os.path.getsize(log_file_path) > JOBS * RANGE_BYTES  # really split
+    _assert_same(_default_columns(log_file_path, *window), _parallel_columns(log_file_path, *window))
+
+
+@pytest.mark.parametrize('filename', REPO_LOGS)
+def test_repo_logs(filename):
+    log_file_path = os.path.join(LOG_DIR, filename)
+    _assert_same(_default_columns(log_file_path, 10, 250), _parallel_columns(log_file_path, 10, 250))
+
+
+def test_whole_file_keeps_every_sample(tmp_path):
+    log_file_path = logGenerator.generate_log(str(tmp_path / 'gui.log'), 'gui', 2000, seed=2)
+    analyst = LogAnalyst(10, 250)
+    analyst.parallel_scan_log_file(log_file_path, jobs=JOBS, whole_file=True)
+    reference = LogAnalyst(10, 250)
+    reference.stream_log_file(log_file_path, whole_file=True)
+    for device_id, dists in reference.distances.items():
+        assert list(analyst.distances[device_id]) == list(dists)
+
+
+@pytest.mark.parametrize('log_format', logGenerator.FORMATS)
+def test_profile_counts_failures_by_cause(tmp_path, log_format):
+    log_file_path = logGenerator.generate_log(str(tmp_path / f"{log_format}.log"), log_format, 3000, seed=3)
+    counters = {}
+    for reader in ('default', 'parallel'):
+        analyst = LogAnalyst(10, 250)
+        analyst.profiler = StageProfiler()
+        if reader == 'parallel':
+            analyst.parallel_scan_log_file(log_file_path, jobs=JOBS)
+        else:
+            analyst.extract_distance(analyst.read_log_file(log_file_path))
+        counters[reader] = {name: n for name, n in analyst.profiler.counters.items()
+                            if name == 'lines matched' or name.startswith('failed')}
+    assert any(name.startswith('failed') for name in counters['default'])
+    assert counters['parallel'] == counters['default']
+
+# END OF FILE
+#---------------------------------------------------------------------------------
@@ -0,0 +1,89 @@
+# -*- coding:utf-8 -*-
+# !/usr/bin/env python
+#---------------------------------------------------------------------------------
+# Author: Zhang
+#
+# Create Date: 2026/10/18
+# Last Update on: 2026/10/18
+#
+# FILE: test_runningStats.py
+# Description: checks of P2Quantile and RunningStats against numpy, run with python -m pytest tests
+#---------------------------------------------------------------------------------
+
+#---------------------------------------------------------------------------------
+# IMPORT REQUIRED PACKAGES HERE
+
+import os
+import sys
+import math
+import random
+import statistics
+
+import numpy as np
+import pytest
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from utils.runningStats import P2Quantile, RunningStats
+
+# END OF PACKAGE IMPORT
+#---------------------------------------------------------------------------------
+
+#---------------------------------------------------------------------------------
+# DEFINE FUNCTIONS HERE
+
+@pytest.mark.parametrize('n', [1, 2, 3, 4, 5])
+def test_p2_exact_below_five_samples(n):
+    samples = [310.0, 295.0, 301.0, 299.0, 305.0][:n]
+    quantile = P2Quantile(0.5)
+    for x in samples:
+        quantile.add(x)
+    if n < 5:
+        assert quantile.value == pytest.approx(float(np.median(samples)))
+    else:
+        assert quantile.value == 301.0  # middle marker of the sorted first five
+
+
+@pytest.mark.parametrize('p', [0.1, 0.5, 0.9])
+def test_p2_close_to_exact_quantile(p):
+    rng = random.Random(7)
+    samples = [rng.gauss(300.0, 3.0) for _ in range(20000)]
+    quantile = P2Quantile(p)
+    for x in samples:
+        quantile.add(x)
+    # a fraction of the standard deviation for 20k normal samples
+    assert abs(quantile.value - float(np.quantile(samples, p))) < 0.1
+
+
+def test_p2_integer_distances():
+    # ranging results are whole cm, many ties
+    rng = random.Random(3)
+    samples = [float(rng.randint(295, 305)) for _ in range(5000)]
+    quantile = P2Quantile(0.5)
+    for x in samples:
+        quantile.add(x)
+    assert abs(quantile.value - statistics.median(samples)) <= 1.0
+
+
+def test_p2_empty():
+    assert math.isnan(P2Quantile().value)
+
+
+def test_running_stats_matches_batch():
+    rng = random.Random(11)
+    samples = [float('inf') if rng.random() < 0.05 else float(rng.randint(290, 310)) for _ in range(3000)]
+    stats = RunningStats()
+    for x in samples:
+        stats.add(x)
+
+    valid = [x for x in samples if not math.isinf(x)]
+    assert stats.count == len(samples)
+    assert stats.success_count == len(valid)
+    assert stats.fail_count == len(samples) - len(valid)
+    assert stats.min == min(valid) and stats.max == max(valid)
+    assert stats.mean == pytest.approx(statistics.mean(valid))
+    assert stats.stdev == pytest.approx(statistics.stdev(valid))
+    assert abs(stats.median - statistics.median(valid)) <= 1.0
+    assert stats.histogram.count == len(valid) and stats.histogram.failures == stats.fail_count
+
+# END OF FILE
+#---------------------------------------------------------------------------------
@@ -0,0 +1,200 @@
+# -*- coding:utf-8 -*-
+# !/usr/bin/env python
+#---------------------------------------------------------------------------------
+# Author: Zhang
+#
+# Create Date: 2026/10/18
+# Last Update on: 2026/10/18
+#
+# FILE: binaryCapture.py
+# Description: compact binary capture file, writer used while capturing and reader
+#---------------------------------------------------------------------------------
+
+#---------------------------------------------------------------------------------
+# IMPORT REQUIRED PACKAGES HERE
+
+import os
+import sys
+import json
+import time
+import struct
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+import utils.logFormat as logFormat
+
+# END OF PACKAGE IMPORT
+#---------------------------------------------------------------------------------
+
+#---------------------------------------------------------------------------------
+# DEFINE CLASS HERE
+
+# File layout, little endian:
+#   magic       8 bytes  b'UWBCAP01'
+#   header size 4 bytes  uint32, length of the JSON header
+#   header      JSON     {'version', 'log_format', 'created', 'device': {role, com_port,
+#                         tcp_port, tx_power, commands}}, padded with spaces so
+#                         records start on a multiple of 8 bytes
+#   records     28 bytes each, see RECORD_FIELDS
+#
+# A record is 28 bytes against 60-90 bytes of text per gui line. An existing
+# capture is appended to only by runs with the device configuration of its
+# header, records carry no configuration of their own.
+
+CAPTURE_EXT = '.uwbcap'
+MAGIC = b'UWBCAP01'
+VERSION = 1
+
+RECORD_FIELDS = [
+    ('recv_time', '<f8'),   # host receive time, seconds since the epoch
+    ('device', '<u2'),      # port of gui logs, 0 for formats without port
+    ('status', '<u2'),      # security status code, non-zero means un-secured result
+    ('seq', '<u4'),         # sequence number of the sample within its device
+    ('timestamp', '<i8'),   # device time stamp (ms), logFormat.NO_TIMESTAMP if not logged
+    ('distance', '<f4'),    # cm, float('inf') if ranging failed
+]
+RECORD = struct.Struct('<dHHIqf')
+
+_HEADER_SIZE = struct.Struct('<I')
+_FORMAT_PLACEHOLDER = ' ' * 16  # room for the log format name, known only after detection
+
+
+class CaptureWriter(object):
+    """
+    Write ranging results of one device as fixed-width records.
+
+    feed_lines() has the signature of a CaptureEngine line handler: lines are
+    detected and extracted with logFormat as they arrive and only the samples
+    are written, the text itself is dropped. If capture_file_path is already
+    a capture its header is kept and records go on after the existing ones,
+    sequence numbers included; ValueError if it was captured with another
+    device configuration.
+    """
+    def __init__(self, capture_file_path: str, device_config: dict) -> None:
+        self.capture_file_path = capture_file_path
+        self.log_file_type = None
+        self.unsupported = False  # no known log format in the first logFormat.DETECT_BYTES
+        self.records = 0
+
+        self._seq = {}  # next sequence number per device
+        self._extract = None
+        self._head_chars = 0  # characters looked at for the log format
+        if is_capture_file(capture_file_path) and os.path.exists(capture_file_path):
+            self._append(device_config)
+            return
+        self._file = open(capture_file_path, 'wb')
+        self._header = {
+            'version': VERSION,
+            'log_format': _FORMAT_PLACEHOLDER,
+            'created': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'device': device_config,
+        }
+        self._write_header()
+
+    def __repr__(self) -> str:
+        return f"CaptureWriter(capture_file_path={self.capture_file_path}, records={self.records})"
+
+    def _append(self, device_config: dict):
+        # go on after the records of an earlier run
+        import numpy as np
+
+        self._file = open(self.capture_file_path, 'r+b')
+        self._header, start = _read_header(self._file, self.capture_file_path)
+        if self._header['device'] != json.loads(json.dumps(device_config)):
+            self._file.close()
+            raise ValueError(f"{self.capture_file_path} was captured with another device configuration "
+                             f"(tx_power {self._header['device'].get('tx_power')}), not appended to.")
+        existing = (os.fstat(self._file.fileno()).st_size - start) // RECORD.size
+        self._file.truncate(start + existing * RECORD.size)  # a record cut off when the last run died
+        if existing:
+            records = np.memmap(self.capture_file_path, dtype=np.dtype(RECORD_FIELDS), mode='r',
+                                offset=start, shape=(existing,))
+            devices, counts = np.unique(records['device'], return_counts=True)
+            self._seq = dict(zip(devices.tolist(), counts.tolist()))
+            del records
+        if self._header['log_format'].strip():
+            self.log_file_type = self._header['log_format'].strip()
+            self._extract = logFormat.EXTRACTORS[self.log_file_type]
+        self._file.seek(0, os.SEEK_END)
+
+    def _write_header(self):
+        header = json.dumps(self._header).encode('utf-8')
+        header += b' ' * (-(len(MAGIC) + _HEADER_SIZE.size + len(header)) % 8)
+        self._file.seek(0)
+        self._file.write(MAGIC + _HEADER_SIZE.pack(len(header)) + header)
+
+    def feed_lines(self, lines):
+        recv_time = time.time()  # lines of one read share the receive time
+        if self._extract is None:
+            if self.unsupported:
+                return
+            for line in lines:
+                line = line.strip()
+                log_file_type = logFormat.detect_format(line)
+                if log_file_type is not None:
+                    self._set_format(log_file_type)
+                    break
+                self._head_chars += len(line) + 1
+                if self._head_chars >= logFormat.DETECT_BYTES:
+                    # given up like the file readers instead of probing every line of the run
+                    self.unsupported = True
+                    return
+            else:
+                return
+
+        pack, write, seq = RECORD.pack, self._file.write, self._seq
+        for line in lines:
+            sample = self._extract(line.strip())
+            if sample is None:
+                continue
+            device_id, status, distance, timestamp = sample
+            device = int(device_id)
+            n = seq.get(device, 0)
+            seq[device] = n + 1
+            write(pack(recv_time, device, status, n, timestamp, distance))
+            self.records += 1
+
+    def _set_format(self, log_file_type: str):
+        # the placeholder keeps the header size, so it is rewritten in place
+        self.log_file_type = log_file_type
+        self._extract = logFormat.EXTRACTORS[log_file_type]
+        self._header['log_format'] = log_file_type.ljust(len(_FORMAT_PLACEHOLDER))
+        position = self._file.tell()
+        self._write_header()
+        self._file.seek(position)
+
+    def close(self):
+        self._file.close()
+
+# END OF CLASS DEFINITION
+#---------------------------------------------------------------------------------
+
+#---------------------------------------------------------------------------------
+# DEFINE FUNCTIONS HERE
+
+def is_capture_file(file_path: str) -> bool:
+    return file_path.endswith(CAPTURE_EXT)
+
+
+def read_capture(capture_file_path: str):
+    """ return (header dict, structured numpy array of all records) """
+    import numpy as np
+
+    with open(capture_file_path, 'rb') as f:
+        header, _ = _read_header(f, capture_file_path)
+        header['log_format'] = header['log_format'].strip() or None
+
+        records = np.fromfile(f, dtype=np.dtype(RECORD_FIELDS))
+    return header, records
+
+
+def _read_header(f, capture_file_path: str) -> tuple:
+    """ (header dict as written, offset of the first record), f is left at that offset """
+    f.seek(0)
+    if f.read(len(MAGIC)) != MAGIC:
+        raise ValueError(f"{capture_file_path} is not a binary capture file.")
+    header_size, = _HEADER_SIZE.unpack(f.read(_HEADER_SIZE.size))
+    header = json.loads(f.read(header_size).decode('utf-8'))
+    return header, f.tell()
+
+# END OF FILE
+#---------------------------------------------------------------------------------
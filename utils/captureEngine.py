@@ -0,0 +1,195 @@
+# -*- coding:utf-8 -*-
+# !/usr/bin/env python
+#---------------------------------------------------------------------------------
+# Author: Zhang
+#
+# Create Date: 2026/10/18
+# Last Update on: 2026/10/18
+#
+# FILE: captureEngine.py
+# Description: Classe CaptureEngine, selectors based capture of Device sockets
+#---------------------------------------------------------------------------------
+
+#---------------------------------------------------------------------------------
+# IMPORT REQUIRED PACKAGES HERE
+
+import sys
+import time
+import selectors
+
+# END OF PACKAGE IMPORT
+#---------------------------------------------------------------------------------
+
+#---------------------------------------------------------------------------------
+# DEFINE CLASS HERE
+
+RECV_BUFFER_SIZE = 64 * 1024      # bytes read from a socket at once
+MAX_LINE_BYTES = 64 * 1024        # longest line kept before the buffer counts as overflowed
+SELECT_TIMEOUT = 0.1              # seconds, also the progress report interval
+
+
+class _Channel(object):
+    """ one connection: a socket, its pending partial line and its counters """
+    def __init__(self, name: str, sock, log_file=None, line_handler=None, visual=False) -> None:
+        self.name = name
+        self.sock = sock
+        self.log_file = log_file
+        self.line_handler = line_handler  # called with a list of complete lines
+        self.visual = visual
+
+        self.pending = bytearray()  # bytes after the last '\n'
+        self.bytes = 0
+        self.lines = 0
+        self.overflows = 0
+        self.cut_bytes = 0  # partial line left when the run ended, see flush
+        self.closed = False
+
+    def feed(self, data):
+        """ append received bytes, hand over every complete line """
+        self.bytes += len(data)
+        pending = self.pending
+        pending += data
+
+        end = pending.rfind(b'\n') + 1
+        if not end:
+            if len(pending) > MAX_LINE_BYTES:
+                # no line end in sight, write it out as is rather than growing forever
+                self.overflows += 1
+                self._emit(bytes(pending), complete=False)
+                del pending[:]
+            return
+
+        # '\n' never occurs inside a multi-byte UTF-8 sequence, so decoding the
+        # complete lines alone never splits a character
+        chunk = bytes(pending[:end])
+        del pending[:end]
+        self._emit(chunk, complete=True)
+
+    def flush(self):
+        """
+        end of a run: a partial line is dropped, its rest would only come with the
+        output the next run discards. After Cliserver closed the connection it is
+        the last line and is ended with '\\n' instead.
+        """
+        if not self.pending:
+            return
+        if self.closed:
+            self.pending += b'\n'
+            self._emit(bytes(self.pending), complete=True)
+        else:
+            self.cut_bytes += len(self.pending)
+        del self.pending[:]
+
+    def _emit(self, chunk: bytes, complete: bool):
+        text = chunk.decode('utf-8', errors='replace')
+        if self.log_file is not None:
+            self.log_file.write(text)
+        if self.visual:
+            print(text, end='')
+
+        lines = text.splitlines()
+        if complete:
+            self.lines += len(lines)
+        if self.line_handler is not None and complete:
+            self.line_handler(lines)
+
+    def report(self, duration: float) -> dict:
+        duration = max(duration, 1e-9)
+        return {
+            'bytes': self.bytes,
+            'lines': self.lines,
+            'bytes/s': round(self.bytes / duration, 1),
+            'lines/s': round(self.lines / duration, 1),
+            'buffer overflowed': self.overflows > 0,
+            'overflow count': self.overflows,
+            'partial line dropped (bytes)': self.cut_bytes,
+            'connection closed': self.closed,
+        }
+
+
+class CaptureEngine(object):
+    """
+    Drain one or more TCP connections until a wall-clock deadline.
+
+    Every readable socket is read into one reusable buffer with recv_into, the
+    bytes are split into complete lines which go to the log file (and to an
+    optional line handler), and an incomplete trailing line waits for the next
+    read. The run length only depends on the clock, not on how much arrives.
+    """
+    def __init__(self, recv_buffer_size=RECV_BUFFER_SIZE) -> None:
+        self._selector = selectors.DefaultSelector()
+        self._buffer = bytearray(recv_buffer_size)
+        self._view = memoryview(self._buffer)
+        self._channels = []
+        self.duration = 0.0
+
+    def __repr__(self) -> str:
+        return f"CaptureEngine(channels={[channel.name for channel in self._channels]})"
+
+    def add(self, name: str, sock, log_file=None, line_handler=None, visual=False):
+        """ register a connected socket, it is read non-blocking while the engine runs """
+        channel = _Channel(name, sock, log_file, line_handler, visual)
+        self._channels.append(channel)
+        return channel
+
+    def run(self, duration_s: float, show_progress=True) -> dict:
+        """ capture for duration_s seconds, return the report of every channel """
+        selector, view = self._selector, self._view
+        for channel in self._channels:
+            channel.sock.setblocking(False)
+            selector.register(channel.sock, selectors.EVENT_READ, channel)
+
+        start = time.monotonic()
+        deadline = start + duration_s
+        next_progress = start
+        try:
+            while True:
+                now = time.monotonic()
+                if now >= deadline or not selector.get_map():
+                    break
+                if show_progress and now >= next_progress:
+                    next_progress = now + SELECT_TIMEOUT
+                    print(f"Ranging progress: {min(100.0, (now - start) * 100 / max(duration_s, 1e-9)):.2f}%", end='\r')
+                    sys.stdout.flush()
+
+                for key, _ in selector.select(timeout=min(SELECT_TIMEOUT, deadline - now)):
+                    self._drain(key.data, view)
+        finally:
+            self.duration = time.monotonic() - start
+            for channel in self._channels:
+                channel.flush()
+                if not channel.closed:
+                    selector.unregister(channel.sock)
+                    channel.sock.setblocking(True)
+        if show_progress:
+            print(f"Ranging progress: {100.0:.2f}%")
+        return self.report()
+
+    def _drain(self, channel: _Channel, view: memoryview):
+        # read until the socket would block, so a fast sender never backs up
+        while True:
+            try:
+                n = channel.sock.recv_into(view)
+            except (BlockingIOError, InterruptedError):
+                return
+            except ConnectionError:
+                n = 0
+            if not n:
+                channel.closed = True
+                self._selector.unregister(channel.sock)
+                return
+            channel.feed(view[:n])
+            if n < len(view):
+                return
+
+    def report(self) -> dict:
+        return {channel.name: channel.report(self.duration) for channel in self._channels}
+
+    def close(self):
+        self._selector.close()
+
+# END OF CLASS DEFINITION
+#---------------------------------------------------------------------------------
+
+# END OF FILE
+#---------------------------------------------------------------------------------
@@ -0,0 +1,210 @@
+# -*- coding:utf-8 -*-
+# !/usr/bin/env python
+#---------------------------------------------------------------------------------
+# Author: Zhang
+#
+# Create Date: 2026/10/18
+# Last Update on: 2026/10/18
+#
+# FILE: cliBridge.py
+# Description: Classe CliBridge, long-lived Cliserver process and its TCP connection
+#---------------------------------------------------------------------------------
+
+#---------------------------------------------------------------------------------
+# IMPORT REQUIRED PACKAGES HERE
+
+import time
+import socket
+import select
+import subprocess
+
+# END OF PACKAGE IMPORT
+#---------------------------------------------------------------------------------
+
+#---------------------------------------------------------------------------------
+# DEFINE CLASS HERE
+
+CONNECT_TIMEOUT = 10.0   # seconds for Cliserver to start listening
+COMMAND_TIMEOUT = 2.0    # seconds to wait for the response of one command
+COMMAND_RETRIES = 0      # resends of commands left without a response, none unless asked for
+CONNECT_POLL = 0.05      # seconds between connection attempts while Cliserver starts
+RESPONSE_SETTLE = 0.05   # seconds without more data before a response without line end is taken
+PIPELINE_COMMAND_END = b'\r\n'  # pipelined commands need an end to be told apart
+
+
+class CliBridge(object):
+    """
+    One Cliserver process (TCP <-> COM port bridge) and one connection to it,
+    started once and reused by every run until close().
+
+    By default a command is written as it is (command_end b'') and its
+    response awaited before the next one goes out, like the former
+    send_cmds, so reset and boot are done before the device is configured.
+    A response is a line up to response_end, or what arrived without one
+    once nothing more follows within RESPONSE_SETTLE. Empty lines and lines
+    for which is_output(line) is true are ranging output still arriving from
+    a previous run, they are skipped and never taken as a response.
+
+    With pipeline=True all commands, each ended by command_end, are written
+    back to back. The CLI answers in order, so the n-th response line belongs
+    to the n-th command. Commands left without a response within
+    command_timeout are sent again up to 'retries' times (none by default),
+    then TimeoutError is raised.
+    """
+    def __init__(self, cliserver_path: str, host: str, tcp_port, com_port: str, command_end=b'',
+                 response_end=b'\n', connect_timeout=CONNECT_TIMEOUT, command_timeout=COMMAND_TIMEOUT,
+                 retries=COMMAND_RETRIES, is_output=None, pipeline=False) -> None:
+        self.cliserver_path = cliserver_path
+        self.host = host
+        self.tcp_port = int(tcp_port)
+        self.com_port = com_port
+        self.command_end = command_end
+        self.response_end = response_end
+        self.connect_timeout = connect_timeout
+        self.command_timeout = command_timeout
+        self.retries = retries
+        self.is_output = is_output
+        self.pipeline = pipeline
+
+        self.process = None
+        self.sock = None
+        self._pending = bytearray()  # received after the last response, ranging output already
+
+    def __repr__(self) -> str:
+        return f"CliBridge(host={self.host}, tcp_port={self.tcp_port}, com_port={self.com_port}, alive={self.alive})"
+
+    def start(self) -> float:
+        """ start Cliserver and connect once it listens, return the seconds it took """
+        start = time.perf_counter()
+        # cliserver_path may also be a command prefix list, e.g. [python, simulator script, options]
+        prefix = list(self.cliserver_path) if isinstance(self.cliserver_path, (list, tuple)) else [self.cliserver_path]
+        self.process = subprocess.Popen(
+            prefix + [self.host, str(self.tcp_port), self.com_port],
+            stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+        )
+        deadline = time.monotonic() + self.connect_timeout
+        while True:
+            try:
+                self.sock = socket.create_connection((self.host, self.tcp_port),
+                                                     timeout=max(deadline - time.monotonic(), CONNECT_POLL))
+                break
+            except OSError:
+                if self.process.poll() is not None:
+                    self.close()
+                    raise ConnectionError(f"Cliserver exited with code {self.process.returncode} before accepting.")
+                if time.monotonic() >= deadline:
+                    self.close()
+                    raise TimeoutError(f"Cliserver did not accept on port {self.tcp_port} "
+                                       f"within {self.connect_timeout} s.")
+                time.sleep(CONNECT_POLL)
+        self.sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)  # commands are small
+        self.sock.settimeout(None)
+        return time.perf_counter() - start
+
+    @property
+    def alive(self) -> bool:
+        """ Cliserver still runs and has not closed the connection """
+        if self.sock is None or self.process is None or self.process.poll() is not None:
+            return False
+        readable, _, _ = select.select([self.sock], [], [], 0)
+        if not readable:
+            return True
+        try:
+            return self.sock.recv(1, socket.MSG_PEEK) != b''
+        except OSError:
+            return False
+
+    def execute(self, commands: list) -> list:
+        """ send [(name, command text)], return [(name, response text)] in the same order """
+        if self.pipeline and not self.command_end:
+            raise ValueError('Pipelined commands need a command_end to be told apart.')
+        self.discard_input()  # leftovers of the previous run are not responses
+        responses = []
+        if self.pipeline:
+            self._exchange(commands, responses)
+        else:
+            for command in commands:
+                self._exchange([command], responses)
+        return responses
+
+    def _exchange(self, commands: list, responses: list):
+        # write commands at once, collect their responses and resend those left without one
+        outstanding = list(commands)
+        attempts = 0
+        while outstanding:
+            self.sock.sendall(b''.join(command.encode() + self.command_end for _, command in outstanding))
+            while outstanding:
+                response = self._read_response(self.command_timeout, unended=not self.pipeline)
+                if response is None:
+                    break
+                responses.append((outstanding.pop(0)[0], response))
+            if outstanding:
+                attempts += 1
+                if attempts > self.retries:
+                    raise TimeoutError(f"No response to '{outstanding[0][0]}' after {attempts} attempt(s).")
+
+    def discard_input(self) -> int:
+        """ drop everything received so far, return the number of bytes """
+        dropped = len(self._pending)
+        del self._pending[:]
+        while select.select([self.sock], [], [], 0)[0]:
+            data = self.sock.recv(65536)
+            if not data:
+                break
+            dropped += len(data)
+        return dropped
+
+    def take_pending(self) -> bytes:
+        """ bytes received after the last response, the start of the ranging output """
+        data = bytes(self._pending)
+        del self._pending[:]
+        return data
+
+    def _read_response(self, timeout: float, unended=False):
+        # unended: bytes without response_end are a response too once nothing more follows
+        deadline = time.monotonic() + timeout
+        while True:
+            end = self._pending.find(self.response_end)
+            if end >= 0 or (unended and self._pending.strip() and not self._more_within(deadline)):
+                end = end + len(self.response_end) if end >= 0 else len(self._pending)
+                response = bytes(self._pending[:end]).decode('utf-8', errors='replace').strip()
+                del self._pending[:end]
+                if not response or (self.is_output is not None and self.is_output(response)):
+                    continue  # ranging output, not a response
+                return response
+            remaining = deadline - time.monotonic()
+            if remaining <= 0 or not select.select([self.sock], [], [], remaining)[0]:
+                return None
+            data = self.sock.recv(65536)
+            if not data:
+                raise ConnectionError('Connection closed by Cliserver.')
+            self._pending += data
+
+    def _more_within(self, deadline: float) -> bool:
+        # more data arrives within RESPONSE_SETTLE (and before deadline)
+        remaining = min(RESPONSE_SETTLE, deadline - time.monotonic())
+        return remaining > 0 and bool(select.select([self.sock], [], [], remaining)[0])
+
+    def close(self, timeout=2.0):
+        """ close the connection and end Cliserver, killed if it does not exit within timeout """
+        if self.sock is not None:
+            try:
+                self.sock.shutdown(socket.SHUT_RDWR)
+            except OSError:  # peer already gone
+                pass
+            self.sock.close()
+            self.sock = None
+        if self.process is not None and self.process.poll() is None:
+            self.process.terminate()
+            try:
+                self.process.wait(timeout)
+            except subprocess.TimeoutExpired:
+                self.process.kill()
+                self.process.wait()
+        del self._pending[:]
+
+# END OF CLASS DEFINITION
+#---------------------------------------------------------------------------------
+
+# END OF FILE
+#---------------------------------------------------------------------------------
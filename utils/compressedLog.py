@@ -0,0 +1,125 @@
+# -*- coding:utf-8 -*-
+# !/usr/bin/env python
+#---------------------------------------------------------------------------------
+# Author: Zhang
+#
+# Create Date: 2026/10/18
+# Last Update on: 2026/10/18
+#
+# FILE: compressedLog.py
+# Description: streaming reads of .gz/.xz/.zst compressed log archives
+#---------------------------------------------------------------------------------
+
+#---------------------------------------------------------------------------------
+# IMPORT REQUIRED PACKAGES HERE
+
+import io
+import shutil
+import subprocess
+
+# END OF PACKAGE IMPORT
+#---------------------------------------------------------------------------------
+
+#---------------------------------------------------------------------------------
+# DEFINE FUNCTIONS HERE
+
+# Archived logs are named <name>.log.gz, .log.xz or .log.zst. They are
+# decompressed while being read, nothing is written to disk and only one read
+# buffer or chunk of decompressed text is held at a time.
+#   gz, xz : standard library (gzip, lzma)
+#   zst    : the 'zstandard' package if installed, else the 'zstd' command line
+#            tool in a child process, which decompresses while we parse
+COMPRESSED_EXTENSIONS = ('.gz', '.xz', '.zst')
+
+CHUNK_BYTES = 4 * 1024 * 1024  # decompressed bytes per chunk of iter_chunks
+
+
+def is_compressed(log_file_path: str) -> bool:
+    return log_file_path.endswith(COMPRESSED_EXTENSIONS)
+
+
+def open_binary(log_file_path: str):
+    """ readable binary file object of the decompressed content, plain files are opened as they are """
+    if log_file_path.endswith('.gz'):
+        import gzip
+        return gzip.open(log_file_path, 'rb')
+    if log_file_path.endswith('.xz'):
+        import lzma
+        return lzma.open(log_file_path, 'rb')
+    if log_file_path.endswith('.zst'):
+        return _open_zstd(log_file_path)
+    return open(log_file_path, 'rb')
+
+
+def open_text(log_file_path: str):
+    """ same as open(log_file_path, 'r', encoding='utf-8') for plain and compressed logs """
+    if not is_compressed(log_file_path):
+        return open(log_file_path, 'r', encoding='utf-8')
+    return io.TextIOWrapper(open_binary(log_file_path), encoding='utf-8')
+
+
+def iter_chunks(log_file_path: str, chunk_bytes=CHUNK_BYTES):
+    """
+    Yield the decompressed content in chunks of about chunk_bytes which end
+    after a line break (the last one excepted), so line based scanners can run
+    over each chunk on its own.
+    """
+    with open_binary(log_file_path) as f:
+        rest = b''
+        while True:
+            data = f.read(chunk_bytes)
+            if not data:
+                break
+            end = data.rfind(b'\n')
+            if end < 0:  # no line break in this chunk, keep collecting
+                rest += data
+                continue
+            yield rest + data[:end + 1]
+            rest = data[end + 1:]
+        if rest:
+            yield rest
+
+
+def _open_zstd(log_file_path: str):
+    try:
+        import zstandard
+    except ImportError:
+        zstandard = None
+
+    if zstandard is not None:
+        # read_across_frames: archives written by pzstd/zstd -T are multi-frame
+        return zstandard.ZstdDecompressor().stream_reader(
+            open(log_file_path, 'rb'), read_across_frames=True, closefd=True)
+
+    if shutil.which('zstd') is None:
+        raise ImportError(f"Reading {log_file_path} needs the 'zstandard' package or the 'zstd' command line tool.")
+    return io.BufferedReader(_PipeReader([shutil.which('zstd'), '-d', '-c', '-q', log_file_path]))
+
+
+class _PipeReader(io.RawIOBase):
+    """ stdout of a decompressing child process as a binary file, the process is ended on close """
+    def __init__(self, command: list) -> None:
+        self._process = subprocess.Popen(command, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer) -> int:
+        n = self._process.stdout.readinto(buffer)
+        if n == 0 and self._process.wait() != 0:  # end of output, a broken archive ends it as well
+            error = self._process.stderr.read().decode('utf-8', errors='replace').strip()
+            raise OSError(f"zstd failed ({self._process.returncode}): {error}")
+        return n
+
+    def close(self):
+        if self.closed:
+            return
+        if self._process.poll() is None:
+            self._process.kill()  # stopped early, e.g. once the analysis window is filled
+        self._process.stdout.close()
+        self._process.stderr.close()
+        self._process.wait()
+        super().close()
+
+# END OF FILE
+#---------------------------------------------------------------------------------
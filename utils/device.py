@@ -15,12 +15,11 @@
 
 import os
 import sys
-import time
-import socket
-import subprocess
 
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 import utils.functions as funcs
+import utils.cliBridge as cliBridge
+import utils.logFormat as logFormat
 
 # END OF PACKAGE IMPORT
 #---------------------------------------------------------------------------------
@@ -39,6 +38,7 @@ class Device(object):
         self._com_port = com_port    # USB serial port
         self._tcp_port = tcp_port    # TCP port
         self.tcp_connection = None   # TCP connection
+        self.bridge = None           # Cliserver process and connection, kept across runs
 
     def __setattr__(self, name, value) -> None:
         if name == 'tx_power':
@@ -47,43 +47,101 @@ class Device(object):
                 return
         super().__setattr__(name, value)
 
+    @property
+    def com_port(self) -> str:
+        return self._com_port
+
+    @property
+    def config(self) -> dict:
+        """ configuration used to start the ranging demo, recorded in binary captures """
+        return {
+            'role': self.role,
+            'com_port': self._com_port,
+            'tcp_port': self._tcp_port,
+            'tx_power': self.tx_power,
+            'commands': self._cmds_dict,
+        }
+
     def __repr__(self) -> str:
         return f"Device(role={self.role}, com_port={self._com_port}, tcp_port={self._tcp_port},)"
     
-    def establish_tcp_conn(self, cliserver_path=r'Cliserver.exe', host=r'127.0.0.1'):
+    def establish_tcp_conn(self, cliserver_path=r'Cliserver.exe', host=r'127.0.0.1',
+                           command_timeout=cliBridge.COMMAND_TIMEOUT, retries=cliBridge.COMMAND_RETRIES,
+                           pipeline=False):
+        """
+        start Cliserver and connect, or keep the bridge of a previous run while it is alive
+        commands wait for each response unless pipeline, then they are ended by CR LF and sent at once
+        """
+        command_end = cliBridge.PIPELINE_COMMAND_END if pipeline else b''
+        if self.bridge is not None:
+            if self.bridge.alive:
+                self.bridge.command_timeout, self.bridge.retries = command_timeout, retries
+                self.bridge.pipeline, self.bridge.command_end = pipeline, command_end
+                return
+            self.close_tcp_conn()  # Cliserver died or hung up, start a new one
+
+        self.bridge = cliBridge.CliBridge(cliserver_path, host, self._tcp_port, self._com_port,
+                                          command_end=command_end, command_timeout=command_timeout,
+                                          retries=retries, pipeline=pipeline,
+                                          is_output=lambda line: logFormat.detect_format(line) is not None)
         try:
-            subprocess.Popen(
-                [cliserver_path, host, self._tcp_port, self._com_port],
-                shell=True, stdout=subprocess.PIPE
-            )
-            self.tcp_connection = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-            self.tcp_connection.connect((host, int(self._tcp_port)))
-        except Exception as e:
-            print('Failed to establish TCP connection: {e}')
+            seconds = self.bridge.start()
+        except OSError as e:
+            print(f"Failed to establish TCP connection: {e}")
             sys.exit("Exiting...")
+        self.tcp_connection = self.bridge.sock
+        print(f"Cliserver for {self._com_port} ready in {seconds * 1000:.0f} ms.")
 
-    def receive(self, log_file=None, buff_size=2048, visual=False):
-        if self.tcp_connection is None:
-            print('TCP connection is not established.')
-            return
-        resp = self.tcp_connection.recv(buff_size).decode()
-        if log_file is not None:
-            log_file.write(f"{resp}")
-        if visual:
-            print(f"{resp}")
-
-    def send_cmds(self):
+    def send_cmds(self) -> dict:
+        """ send all commands, return {command name: response}, None if the device did not answer """
         if self.tcp_connection is None:
             print('TCP connection is not established.')
-            return
-        
+            return None
+
+        commands = []
         for key in self._cmds_dict.keys():
             if key == 'setpower':
                 command = f"{self._cmds_dict[key]}{self.tx_power}"
             else:
                 command = self._cmds_dict[key]
-            self.tcp_connection.send(command.encode())
-            self.receive()
+            commands.append((key, command))
+        try:
+            return dict(self.bridge.execute(commands))
+        except (TimeoutError, ConnectionError) as e:
+            print(f"Commands to {self._com_port} not acknowledged: {e}")
+            return None
+
+    def capture(self, duration_s: float, log_file=None, visual=False, line_handler=None) -> dict:
+        """ receive ranging demo messages for duration_s seconds, return the capture report """
+        if self.tcp_connection is None:
+            print('TCP connection is not established.')
+            return {}
+
+        from utils.captureEngine import CaptureEngine
+
+        engine = CaptureEngine()
+        self.attach(engine, log_file, line_handler, visual)
+        try:
+            return engine.run(duration_s)[self.com_port]
+        finally:
+            engine.close()
+
+    def attach(self, engine, log_file=None, line_handler=None, visual=False):
+        """ register the TCP connection to a CaptureEngine shared by several devices """
+        channel = engine.add(self.com_port, self.tcp_connection, log_file, line_handler, visual)
+        if self.bridge is not None:
+            # ranging output which arrived together with the last command response
+            pending = self.bridge.take_pending()
+            if pending:
+                channel.feed(pending)
+        return channel
+
+    def close_tcp_conn(self):
+        """ close the connection and end Cliserver, once the last run is done """
+        if self.bridge is not None:
+            self.bridge.close()
+            self.bridge = None
+        self.tcp_connection = None
 
 # END OF CLASS DEFINATION
 #---------------------------------------------------------------------------------
@@ -121,11 +179,9 @@ if __name__ == '__main__':
     device.send_cmds()
 
     # receive ranging demo message within ranging_time * 0.1s
-    for _ in range(0, ranging_time + 1):
-        device.receive(log_file=log_file)
-        time.sleep(0.1)
-    
-    device.tcp_connection.close()
+    device.capture(ranging_time * 0.1, log_file=log_file)
+
+    device.close_tcp_conn()
 
     if log_file is not None:
         log_file.close()
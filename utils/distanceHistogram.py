@@ -0,0 +1,137 @@
+# -*- coding:utf-8 -*-
+# !/usr/bin/env python
+#---------------------------------------------------------------------------------
+# Author: Zhang
+#
+# Create Date: 2026/10/18
+# Last Update on: 2026/10/18
+#
+# FILE: distanceHistogram.py
+# Description: Classe DistanceHistogram, mergeable fixed-bin sketch of distances
+#---------------------------------------------------------------------------------
+
+#---------------------------------------------------------------------------------
+# IMPORT REQUIRED PACKAGES HERE
+
+import math
+
+# END OF PACKAGE IMPORT
+#---------------------------------------------------------------------------------
+
+#---------------------------------------------------------------------------------
+# DEFINE CLASS HERE
+
+DEFAULT_PERCENTILES = (5, 50, 90, 99)
+
+
+class DistanceHistogram(object):
+    """
+    Fixed-bin histogram of ranging distances (cm) plus a failure count.
+
+    Bin k holds distances in [k * resolution, (k + 1) * resolution), only
+    non-empty bins are stored, so memory is bounded by the distance range over
+    the resolution and not by the number of samples. Histograms of the same
+    resolution merge by adding counts, in any order, which makes them usable on
+    streams and across files and worker processes.
+
+    Percentiles are nearest-rank and reported as the lower edge of their bin,
+    exact for the integer cm distances of our logs at the default resolution.
+    """
+    def __init__(self, resolution=1.0) -> None:
+        self.resolution = resolution
+        self.counts = {}  # bin index -> number of samples
+        self.failures = 0
+
+    def __repr__(self) -> str:
+        return f"DistanceHistogram(resolution={self.resolution}, count={self.count}, failures={self.failures})"
+
+    def add(self, distance: float):
+        """ one sample, float('inf') counts as a failed ranging """
+        if math.isinf(distance):
+            self.failures += 1
+            return
+        idx = math.floor(distance / self.resolution)
+        self.counts[idx] = self.counts.get(idx, 0) + 1
+
+    def add_array(self, distances):
+        """ a whole numpy column at once, inf counts as a failed ranging """
+        import numpy as np
+
+        distances = np.asarray(distances, dtype=np.float64)
+        valid = np.isfinite(distances)
+        self.failures += int(distances.size - np.count_nonzero(valid))
+        bins, counts = np.unique(np.floor(distances[valid] / self.resolution).astype(np.int64), return_counts=True)
+        for idx, count in zip(bins.tolist(), counts.tolist()):
+            self.counts[idx] = self.counts.get(idx, 0) + count
+
+    def merge(self, other):
+        """ add the counts of another histogram of the same resolution, return self """
+        if other.resolution != self.resolution:
+            raise ValueError(f"Cannot merge histograms of {other.resolution} cm and {self.resolution} cm bins.")
+        for idx, count in other.counts.items():
+            self.counts[idx] = self.counts.get(idx, 0) + count
+        self.failures += other.failures
+        return self
+
+    def shifted(self, offset_cm: float):
+        """
+        New histogram of distance + offset_cm, e.g. the ranging error with
+        -physical distance. Offsets are rounded to whole bins.
+        """
+        shift = round(offset_cm / self.resolution)
+        histogram = DistanceHistogram(self.resolution)
+        histogram.counts = {idx + shift: count for idx, count in self.counts.items()}
+        histogram.failures = self.failures
+        return histogram
+
+    @property
+    def count(self) -> int:
+        """ number of successful samples """
+        return sum(self.counts.values())
+
+    def percentiles(self, percentiles=DEFAULT_PERCENTILES) -> dict:
+        """ {p: value} of all p in 0-100, nan without samples, one pass over the sorted bins """
+        total = self.count
+        if not total:
+            return {p: float('nan') for p in percentiles}
+
+        # nearest rank, the smallest value with at least p% of the samples at or below it
+        ranks = sorted((max(1, math.ceil(p / 100 * total)), p) for p in percentiles)
+        values, seen, pos = {}, 0, 0
+        for idx in sorted(self.counts):
+            seen += self.counts[idx]
+            while pos < len(ranks) and ranks[pos][0] <= seen:
+                values[ranks[pos][1]] = idx * self.resolution
+                pos += 1
+        return {p: values[p] for p in percentiles}
+
+    def cdf(self) -> list:
+        """ (bin lower edge, count, cumulative fraction) of every non-empty bin, ascending """
+        total, seen, rows = self.count, 0, []
+        for idx in sorted(self.counts):
+            seen += self.counts[idx]
+            rows.append((idx * self.resolution, self.counts[idx], seen / total))
+        return rows
+
+    def to_dict(self) -> dict:
+        """ JSON-ready sketch, from_dict restores it """
+        bins = sorted(self.counts)
+        return {
+            'resolution (cm)': self.resolution,
+            'failures': self.failures,
+            'bins': bins,
+            'counts': [self.counts[idx] for idx in bins],
+        }
+
+    @classmethod
+    def from_dict(cls, sketch: dict):
+        histogram = cls(sketch['resolution (cm)'])
+        histogram.counts = dict(zip(sketch['bins'], sketch['counts']))
+        histogram.failures = sketch['failures']
+        return histogram
+
+# END OF CLASS DEFINITION
+#---------------------------------------------------------------------------------
+
+# END OF FILE
+#---------------------------------------------------------------------------------
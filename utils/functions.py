@@ -4,7 +4,7 @@
 # Author: Zhang
 #
 # Create Date: 2024/10/09
-# Last Update on: 2024/10/10
+# Last Update on: 2026/10/18
 #
 # FILE: functions.py
 # Description: functions which will be used in main loop are defined here
@@ -13,21 +13,33 @@
 #---------------------------------------------------------------------------------
 # IMPORT REQUIRED PACKAGES HERE
 
+from __future__ import annotations
+
 import os
 import re
 import sys
 import math
 import json
 import time
-import socket
 import argparse
 import platform
 
-import serial.tools.list_ports
+from typing import TYPE_CHECKING
+
+# Heavy or capture-only dependencies (numpy, pandas, pyserial, socket, ...) are
+# imported inside the functions which use them, so '--help' and the analysis
+# path of logProcessing.py never pay for the capture path and vice versa.
+# Keep module level imports of this file to the standard library.
+if TYPE_CHECKING:
+    from utils.logAnalyst import LogAnalyst
+    from utils.parseCache import ParseCache
+    from utils.device import Device
+    from utils.stageProfiler import StageProfiler
 
-from utils.logAnalyst import LogAnalyst
-from utils.device import Device
-# from .logAnalyst import LogAnalyst
+# text logs, their compressed archives (compressedLog.COMPRESSED_EXTENSIONS)
+# and binary captures (binaryCapture.CAPTURE_EXT) found under 'logs', in order
+# of preference when one capture is there in several of them
+LOG_FILE_EXTENSIONS = ('.log', '.log.gz', '.log.xz', '.log.zst', '.uwbcap')
 
 # END OF PACKAGE IMPORT
 #---------------------------------------------------------------------------------
@@ -43,6 +55,21 @@ def logAnalyst_arg_parser(parser: argparse.ArgumentParser):
     parser.add_argument('-d', '--physicalDistance', type=float, default=float('inf'))
     parser.add_argument('-w', '--warmupSamples', type=int, default=10)
     parser.add_argument('-n', '--analysisSamples', type=int, default=250)
+    parser.add_argument('-r', '--reader', type=str, default='default', choices=['default', 'stream', 'mmap', 'parallel'])
+    parser.add_argument('-j', '--jobs', type=int, default=0)  # worker processes for '-a' or '-r parallel', 0 for all cores
+    parser.add_argument('-c', '--cache', action='store_true')  # reuse parsed samples across runs
+    parser.add_argument('--follow', action='store_true')  # live statistics while the log is written
+    parser.add_argument('-o', '--output', type=str, default='xlsx', choices=['xlsx', 'csv', 'parquet', 'jsonl'])
+    parser.add_argument('--profile', action='store_true')  # time/memory per stage and counters as JSON
+    parser.add_argument('--sweep', action='store_true')  # one calibration report over all logs of known distance
+    parser.add_argument('--index', action='store_true')  # add new and changed logs to the sample index
+    parser.add_argument('--query', action='store_true')  # statistics from the sample index, '-d'/'--device' filter
+    parser.add_argument('--device', type=str, default=None)  # device id, e.g. '2' for PORT 2
+    parser.add_argument('--by-file', action='store_true')  # query results per file instead of per distance
+    parser.add_argument('--percentiles', type=str, default='5,50,90,99')  # reported percentiles, comma separated
+    parser.add_argument('--histogram', action='store_true')  # cm histograms and CDFs of distance and error as JSON
+    parser.add_argument('--timeline', type=str, default='window', choices=['window', 'capture'],
+                        help="time-series metrics over the analysis window or the whole capture (reads all of it)")
 
     args = parser.parse_args()
 
@@ -51,13 +78,64 @@ def logAnalyst_arg_parser(parser: argparse.ArgumentParser):
         '-f': args.file,
         '-w': args.warmupSamples,
         '-n': args.analysisSamples,
-        '-d': args.physicalDistance
+        '-d': args.physicalDistance,
+        '-r': args.reader,
+        '-j': args.jobs,
+        '-c': args.cache,
+        '--follow': args.follow,
+        '-o': args.output,
+        '--profile': args.profile,
+        '--sweep': args.sweep,
+        '--index': args.index,
+        '--query': args.query,
+        '--device': args.device,
+        '--by-file': args.by_file,
+        '--percentiles': parse_percentiles(parser, args.percentiles),
+        '--histogram': args.histogram,
+        '--timeline': args.timeline,
     }
 
+def parse_percentiles(parser: argparse.ArgumentParser, percentiles: str) -> tuple:
+    """ '5,50,90,99' -> (5.0, 50.0, 90.0, 99.0), every value between 0 and 100 """
+    values = []
+    for p in percentiles.split(','):
+        if not p.strip():
+            continue
+        try:
+            value = float(p)
+        except ValueError:
+            value = None
+        if value is None or not 0 <= value <= 100:
+            parser.error(f"invalid percentile '{p.strip()}', expected a number between 0 and 100")
+        values.append(value)
+    return tuple(values)
+
+def log_file_stem(log_file_name: str) -> str:
+    # '8.0m' for '8.0m.log', '8.0m.log.gz' and '8.0m.uwbcap'
+    for ext in LOG_FILE_EXTENSIONS:
+        if log_file_name.endswith(ext):
+            return log_file_name[:-len(ext)]
+    return os.path.splitext(log_file_name)[0]
+
+def list_log_files(directory: str) -> list:
+    """ sorted log files of directory, one per stem: 'x.log' and 'x.log.gz' or 'x.uwbcap' hold the same
+        capture and share their result names, so only the first in LOG_FILE_EXTENSIONS order is kept """
+    log_files = {}
+    for filename in os.listdir(directory):
+        if filename.endswith(LOG_FILE_EXTENSIONS):
+            log_files.setdefault(log_file_stem(filename), []).append(filename)
+    chosen = []
+    for stem in sorted(log_files):
+        candidates = sorted(log_files[stem], key=lambda f: LOG_FILE_EXTENSIONS.index(f[len(stem):]))
+        chosen.append(candidates[0])
+        for duplicate in candidates[1:]:
+            print(f"{duplicate} skipped, same capture as {candidates[0]}.")
+    return sorted(chosen)
+
 def chose_log_file(directory: str) -> str:
     # list all log files under 'logs' directory and let user chose on of them
     # return the choosed log file name
-    log_files = [f for f in os.listdir(directory) if f.endswith('.log')]
+    log_files = list_log_files(directory)
     if not log_files:
         print('No log files found in the "log" folder.')
         return None
@@ -82,9 +160,9 @@ def chose_log_file(directory: str) -> str:
         print('Invalid input. Please input a number.')
         return None
 
-def construct_save_file_path(log_file_name: str, result_dir: str, ext=r'xlsx') -> str:
-    filename = log_file_name.split('.log')[0]
-    res_filename = f"{filename}_analysis.{ext}"
+def construct_save_file_path(log_file_name: str, result_dir: str, ext=r'xlsx', suffix=r'analysis') -> str:
+    filename = log_file_stem(log_file_name)  # results of 'x.log.gz' are named after 'x.log'
+    res_filename = f"{filename}_{suffix}.{ext}"
     return os.path.join(result_dir, res_filename)
 
 def parse_phy_distance(phy_distance: float, filename: str) -> float:
@@ -99,18 +177,320 @@ def parse_phy_distance(phy_distance: float, filename: str) -> float:
         phy_dist = phy_distance
     return phy_dist
 
-def analysis(analyst: LogAnalyst, log_file_path: str, phy_distance: float, visual=True):
-    file_type = analyst.read_log_file(log_file_path)
+def analysis(analyst: LogAnalyst, log_file_path: str, phy_distance: float, visual=True, reader='default',
+             cache: ParseCache = None, profiler: StageProfiler = None, jobs=0) -> dict:
+    # return analysis results of all devices, {device_id: results}
+    analyst.profiler = profiler
+    load_samples(analyst, log_file_path, reader, cache, jobs)
+
+    analyst.analysis(phy_distance)  # analysis, all devices in one pass
+    if visual:
+        for device_id in analyst.distances.keys():
+            analyst.show_result(device_id)  # show results on terminal
+    return analyst.analysis_results
+
+def load_samples(analyst: LogAnalyst, log_file_path: str, reader='default', cache: ParseCache = None, jobs=0) -> str:
+    """ fill analyst.distances/timestamps (windowed) from a log file or binary capture, return the log format """
+    from utils.binaryCapture import is_capture_file
+
+    if is_capture_file(log_file_path):
+        # binary captures already hold the columns, nothing to parse or cache
+        file_type = analyst.load_capture_file(log_file_path)
+        reader, cache = 'capture', None
+    elif cache is not None:
+        # parsed columns come from the cache, only slicing runs on a hit
+        file_type = analyst.cached_log_file(log_file_path, cache, reader, jobs)
+    elif reader == 'stream':
+        # read, detect and extract in one pass, stop once the window is filled
+        file_type = analyst.stream_log_file(log_file_path)
+    elif reader == 'mmap':
+        # same as 'stream' but scans the memory-mapped bytes of the file
+        file_type = analyst.scan_log_file(log_file_path)
+    elif reader == 'parallel':
+        # whole file scanned in byte ranges by 'jobs' processes, same columns as 'default'
+        file_type = analyst.parallel_scan_log_file(log_file_path, jobs)
+    else:
+        file_type = analyst.read_log_file(log_file_path)
     print(f"log format: {file_type}")
     if file_type is None:
         raise ValueError('Unsupported log file format.')
     
-    analyst.extract_distance(file_type)
-    for device_id in analyst.distances.keys():
-        analyst.analysis(phy_distance, device_id)  # analysis
-        if visual:
-            analyst.show_result(device_id)  # show results on terminal
-    
+    if reader == 'default' and cache is None:
+        analyst.extract_distance(file_type)
+    return file_type
+
+def follow(analyst: LogAnalyst, log_file_path: str, phy_distance: float, warmup_samples: int,
+           analysis_samples: int, poll_interval=0.5):
+    """
+    Refresh the analysis table while the log file is still being written,
+    only newly appended bytes are parsed on every poll. Stop with Ctrl+C.
+    """
+    from utils.logFollower import LogFollower
+
+    follower = LogFollower(log_file_path, warmup_samples, analysis_samples)
+    print(f"Following {log_file_path}, press Ctrl+C to stop.")
+    try:
+        while True:
+            if follower.poll():
+                analyst.live_analysis(follower.stats, phy_distance)
+                os.system('cls') if platform.system() == 'Windows' else os.system('clear')
+                print(f"Following {log_file_path}, press Ctrl+C to stop.")
+                print(f"log format: {follower.log_file_type}")
+                for device_id in analyst.analysis_results.keys():
+                    analyst.show_result(device_id)
+                if follower.window_filled:
+                    print('Analysis window filled.')
+            if follower.unsupported:
+                print("Unsupported log file format, follow stopped.")
+                return
+            time.sleep(poll_interval)
+    except KeyboardInterrupt:
+        print('Follow stopped.')
+
+def analysis_worker(task: tuple) -> tuple:
+    """
+    Parse, analyse and save one log file, used by batch_analysis.
+    Runs in a worker process, so all inputs come in with the task and
+    failures are returned instead of raised to keep the batch going.
+    """
+    (log_file_path, phy_distance, save_file_path, warmup_samples, analysis_samples, reader, cache, output_format,
+     profile, percentiles, histogram_file_path, parse_jobs, timeline) = task
+    from utils.logAnalyst import LogAnalyst
+
+    profiler = start_profiler() if profile else None
+    filename = os.path.basename(log_file_path)
+    try:
+        analyst = LogAnalyst(warmup_samples=warmup_samples, analysis_samples=analysis_samples, percentiles=percentiles,
+                             timeline=timeline)
+        results = analysis(analyst, log_file_path, phy_distance, visual=False, reader=reader, cache=cache,
+                           profiler=profiler, jobs=parse_jobs)
+        analyst.save_result(save_file_path, output_format)
+        if histogram_file_path is not None:
+            save_histograms(analyst.histograms, phy_distance, percentiles, histogram_file_path, visual=False)
+    except Exception as e:
+        return filename, None, f"{type(e).__name__}: {e}", profiler.report() if profile else None, None
+    # histograms go back to the parent process, they merge into the batch histograms there
+    return filename, results, None, profiler.report() if profile else None, analyst.histograms
+
+def sweep_worker(task: tuple) -> tuple:
+    """ load the windowed samples of one log file for a sweep, same outcome layout as analysis_worker """
+    log_file_path, phy_distance, warmup_samples, analysis_samples, reader, cache, parse_jobs = task
+    from utils.logAnalyst import LogAnalyst
+
+    filename = os.path.basename(log_file_path)
+    try:
+        analyst = LogAnalyst(warmup_samples=warmup_samples, analysis_samples=analysis_samples)
+        load_samples(analyst, log_file_path, reader=reader, cache=cache, jobs=parse_jobs)
+    except Exception as e:
+        return filename, None, f"{type(e).__name__}: {e}", None, None
+    return filename, (phy_distance, analyst.distances), None, None, None
+
+def batch_analysis(tasks: list, jobs=0, worker=analysis_worker) -> list:
+    """
+    Run worker (analysis_worker or sweep_worker) over all tasks with 'jobs'
+    worker processes (0 for all cores, 1 to stay in the current process).
+    Results come back in the order of 'tasks' whatever order workers finish in.
+    """
+    jobs = jobs if jobs > 0 else (os.cpu_count() or 1)
+    jobs = min(jobs, len(tasks))
+
+    if jobs <= 1:
+        outcomes = map(worker, tasks)
+        return [report_batch_progress(idx, len(tasks), outcome) for idx, outcome in enumerate(outcomes)]
+
+    from concurrent.futures import ProcessPoolExecutor
+
+    with ProcessPoolExecutor(max_workers=jobs) as executor:
+        outcomes = executor.map(worker, tasks)
+        return [report_batch_progress(idx, len(tasks), outcome) for idx, outcome in enumerate(outcomes)]
+
+def report_batch_progress(idx: int, total: int, outcome: tuple) -> tuple:
+    filename, _, error, _, _ = outcome
+    if error is None:
+        print(f"[{idx + 1}/{total}] {filename} done.")
+    else:
+        print(f"[{idx + 1}/{total}] {filename} failed: {error}")
+    return outcome
+
+def summarize_batch(outcomes: list, save_file_path=None):
+    """ print one table for all files of a batch and save it if a path is given """
+    rows = []
+    for filename, results, error, _, _ in outcomes:
+        if error is not None:
+            rows.append({'file': filename, 'device': None, 'error': error})
+            continue
+        for device_id, metrics in results.items():
+            rows.append({'file': filename, 'device': device_id, **metrics, 'error': None})
+
+    print(f"{' File':<24}{' Device':<8}{' Ave. (cm)':<12}{' Std.':<8}{' Success':<10}\n" + '-' * 62)
+    for row in rows:
+        if row['error'] is not None:
+            print(f" {row['file']:<24}{'-':<8}{row['error']}")
+        else:
+            print(f" {row['file']:<24}{row['device']:<8}{row['average distance (cm)']:<12}"
+                  f"{row['std. deviation']:<8}{row['success rate']:<10}")
+    print('-' * 62)
+    failed = sum(error is not None for _, _, error, _, _ in outcomes)
+    print(f"{len(outcomes) - failed} of {len(outcomes)} log files analysed.", end='\n\n')
+
+    if save_file_path is not None and rows:
+        import pandas as pd
+        df = pd.DataFrame(rows)
+        if save_file_path.endswith('.csv'):
+            df.to_csv(save_file_path, index=False)
+        elif save_file_path.endswith('.parquet'):
+            df.astype(str).to_parquet(save_file_path, index=False)
+        elif save_file_path.endswith('.jsonl'):
+            df.to_json(save_file_path, orient='records', lines=True)
+        else:
+            df.to_excel(save_file_path, sheet_name='summary', index=False)
+
+def sweep_report(outcomes: list, save_file_path: str):
+    """ one calibration report over all files of a sweep """
+    from utils.sweepAnalysis import SweepDataset
+
+    dataset = SweepDataset()
+    for filename, loaded, error, _, _ in outcomes:
+        if error is None:
+            phy_distance, distances = loaded
+            dataset.add(filename, phy_distance, distances)
+    if dataset.freeze().empty:
+        print('No ranging results to build a sweep report from.')
+        return
+
+    dataset.show_report()
+    dataset.save_report(save_file_path)
+    print(f"Sweep report saved to {save_file_path}")
+
+def update_sample_index(db_path: str, log_dir: str):
+    """ index new and changed log files of log_dir, forget removed ones, physical distances from file names """
+    from utils.sampleIndex import SampleIndex
+
+    log_file_paths = [os.path.join(log_dir, f) for f in list_log_files(log_dir)]
+    index = SampleIndex(db_path)
+    try:
+        start, indexed = time.perf_counter(), 0
+        for log_file_path in log_file_paths:
+            filename = os.path.basename(log_file_path)
+            if index.add_file(log_file_path, parse_phy_distance(float('inf'), filename)):
+                indexed += 1
+                print(f"{filename} indexed.")
+        removed = index.prune(log_file_paths)
+        summary = index.summary()
+    finally:
+        index.close()
+    print(f"{indexed} indexed, {len(log_file_paths) - indexed} unchanged, {removed} removed "
+          f"in {time.perf_counter() - start:.2f} s. "
+          f"Index holds {summary['samples']} samples of {summary['files']} files.")
+
+def query_sample_index(db_path: str, warmup_samples: int, analysis_samples: int, device_id=None,
+                       phy_distance=float('inf'), by_file=False):
+    """ print windowed statistics per physical distance and device from the index, nothing is parsed """
+    from utils.sampleIndex import SampleIndex
+
+    if not os.path.exists(db_path):
+        sys.exit(f"No sample index at {db_path}, build it with option '--index' first.")
+    index = SampleIndex(db_path)
+    try:
+        results = index.query(warmup_samples, analysis_samples, device_id, phy_distance, by_file)
+    finally:
+        index.close()
+    if not results:
+        print('No indexed samples match the query.')
+        return
+
+    def number(value, width):
+        return f"{'-':<{width}}" if value is None else f"{value:<{width}.2f}"
+
+    print(f"{' Phy. (cm)':<11}{' Device':<8}{' Files':<7}{' Samples':<9}{' Success':<9}"
+          f"{' Ave. (cm)':<11}{' Std.':<8}{' Min':<9}{' Max':<9}" + (' File' if by_file else ''))
+    print('-' * (81 if by_file else 76))
+    for row in results:
+        print(f" {number(row['physical distance (cm)'], 10)}{row['device']:<8}{row['files']:<7}{row['samples']:<9}"
+              f"{row['success rate'] * 100:<6.2f}%  {number(row['average distance (cm)'], 11)}"
+              f"{number(row['std. deviation'], 8)}{number(row['min distance (cm)'], 9)}"
+              f"{number(row['max distance (cm)'], 9)}" + (row['file'] if by_file else ''))
+    print('-' * (81 if by_file else 76))
+
+def start_profiler() -> StageProfiler:
+    """ new StageProfiler, with tracemalloc tracing for peak memory per stage """
+    import tracemalloc
+    from utils.stageProfiler import StageProfiler
+
+    if not tracemalloc.is_tracing():
+        tracemalloc.start()
+    return StageProfiler()
+
+def save_profile(profile: dict, save_file_path: str):
+    with open(save_file_path, 'w', encoding='utf-8') as f:
+        json.dump(profile, f, indent=2)
+    print(f"Profile saved to {save_file_path}")
+
+def save_batch_profile(outcomes: list, save_file_path: str):
+    """ per-file profiles of a batch and their aggregate in one JSON file """
+    from utils.stageProfiler import merge_reports
+
+    files = {filename: profile for filename, _, _, profile, _ in outcomes if profile is not None}
+    save_profile({'total': merge_reports(list(files.values())), 'files': files}, save_file_path)
+
+def histogram_report(histogram, phy_distance: float, percentiles: tuple) -> dict:
+    """ percentiles, CDF and mergeable sketch of one device, error (measured - physical) if phy_distance is known """
+    report = {
+        'physical distance (cm)': None if math.isinf(phy_distance) else phy_distance,
+        'samples': histogram.count + histogram.failures,
+        'failures': histogram.failures,
+        'distance percentiles (cm)': {f"p{p:g}": v for p, v in histogram.percentiles(percentiles).items()},
+    }
+    if not math.isinf(phy_distance):
+        error = histogram.shifted(-phy_distance)
+        report['error percentiles (cm)'] = {f"p{p:g}": v for p, v in error.percentiles(percentiles).items()}
+        report['error cdf'] = [list(row) for row in error.cdf()]
+    else:
+        report['distance cdf'] = [list(row) for row in histogram.cdf()]
+    report['sketch'] = histogram.to_dict()
+    return report
+
+def save_histograms(histograms: dict, phy_distance: float, percentiles: tuple, save_file_path: str, visual=True):
+    """ histograms {device_id: DistanceHistogram} of one log file as JSON """
+    report = {device_id: histogram_report(h, phy_distance, percentiles) for device_id, h in histograms.items()}
+    with open(save_file_path, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2)
+    if visual:
+        print(f"Histograms saved to {save_file_path}")
+
+def save_batch_histograms(outcomes: list, percentiles: tuple, save_file_path: str):
+    """
+    Ranging error histograms of every device merged over all files of a batch
+    with a known physical distance, no raw sample is needed for that.
+    """
+    merged, files = {}, {}
+    for filename, results, _, _, histograms in outcomes:
+        if histograms is None:
+            continue
+        for device_id, histogram in histograms.items():
+            phy_distance = results[device_id]['physical distance (cm)']
+            if math.isinf(phy_distance):
+                continue
+            error = histogram.shifted(-phy_distance)
+            if device_id in merged:
+                merged[device_id].merge(error)
+            else:
+                merged[device_id] = error
+            files.setdefault(device_id, []).append(filename)
+
+    total = {}
+    for device_id, error in merged.items():
+        total[device_id] = {
+            'files': files[device_id],
+            'samples': error.count + error.failures,
+            'failures': error.failures,
+            'error percentiles (cm)': {f"p{p:g}": v for p, v in error.percentiles(percentiles).items()},
+            'error cdf': [list(row) for row in error.cdf()],
+            'sketch': error.to_dict(),
+        }
+    with open(save_file_path, 'w', encoding='utf-8') as f:
+        json.dump(total, f, indent=2)
+    print(f"Batch histograms saved to {save_file_path}")
 
 #------------------------ FUNCTIONS FOR RANGING DEMO -----------------------------
 
@@ -120,6 +500,25 @@ def rangingDemo_arg_parser(parser: argparse.ArgumentParser):
     parser.add_argument('-d', '--distance', type=float, default=float('inf'))
     parser.add_argument('-p', '--power', type=int, default=5)
     parser.add_argument('-t', '--time', type=int, default=600)
+    parser.add_argument('-a', '--analyse', action='store_true')  # analyse while capturing, save right after
+    parser.add_argument('-w', '--warmupSamples', type=int, default=10)
+    parser.add_argument('-n', '--analysisSamples', type=int, default=250)
+    parser.add_argument('-o', '--output', type=str, default='xlsx', choices=['xlsx', 'csv', 'parquet', 'jsonl'])
+    parser.add_argument('-b', '--binary', type=str, default='off', choices=['off', 'also', 'only'],
+                        help="write a binary capture (.uwbcap) next to or instead of the text log")
+    parser.add_argument('-m', '--multi', type=str, nargs='+', default=None, metavar='ROLE:COMPORT',
+                        help="capture several devices at once, e.g. '-m tx:com3 rx:com7 rx:com9'")
+    parser.add_argument('--timeout', type=float, default=2.0, help="seconds to wait for each command response")
+    parser.add_argument('--retries', type=int, default=0, help="resends of unanswered commands")
+    parser.add_argument('--pipeline', action='store_true',
+                        help="send all commands at once, ended by CR LF, instead of waiting for each response")
+    parser.add_argument('--rotate-mb', type=float, default=0, help="go on in a new log file every N MB, 0 never")
+    parser.add_argument('--rotate-minutes', type=float, default=0, help="go on in a new log file every N minutes, 0 never")
+    parser.add_argument('--fsync', type=str, default='rotate', choices=['never', 'rotate', 'flush'],
+                        help="when log files are synced to disk: never, per finished file, or on every flush")
+    parser.add_argument('--flush-interval', type=float, default=1.0, help="seconds between flushes of the log files")
+    parser.add_argument('--timeline', type=str, default='window', choices=['window', 'capture'],
+                        help="inline time-series metrics over the analysis window or the whole capture")
     
     args = parser.parse_args()
 
@@ -129,8 +528,36 @@ def rangingDemo_arg_parser(parser: argparse.ArgumentParser):
         '-p': args.power,
         '-t': args.time,
         '-c': args.comPort,
+        '-a': args.analyse,
+        '-w': args.warmupSamples,
+        '-n': args.analysisSamples,
+        '-o': args.output,
+        '-b': args.binary,
+        '-m': parse_device_pairs(parser, args.multi) if args.multi else None,
+        '--timeout': args.timeout,
+        '--retries': args.retries,
+        '--pipeline': args.pipeline,
+        '--rotate-mb': args.rotate_mb,
+        '--rotate-minutes': args.rotate_minutes,
+        '--fsync': args.fsync,
+        '--flush-interval': args.flush_interval,
+        '--timeline': args.timeline,
     }
 
+def parse_device_pairs(parser: argparse.ArgumentParser, pairs: list) -> list:
+    """ ['tx:com3', 'rx:com7'] -> [('tx', 'com3'), ('rx', 'com7')] """
+    device_pairs = []
+    for pair in pairs:
+        role, _, com_port = pair.partition(':')
+        if role.lower() not in ('tx', 'rx') or not com_port:
+            parser.error(f"invalid device '{pair}', expected ROLE:COMPORT with ROLE 'tx' or 'rx'")
+        device_pairs.append((role.lower(), com_port.lower()))
+
+    com_ports = [com_port for _, com_port in device_pairs]
+    if len(set(com_ports)) != len(com_ports):
+        parser.error('a COM port is given more than once')
+    return device_pairs
+
 def welcome_menu_for_rangingdemo():
     """
     Displays a welcome message and user menu.
@@ -145,6 +572,7 @@ def welcome_menu_for_rangingdemo():
     print("- \'run\'              : Start the ranging demo.")
     print("- \'set power=[value]\': Set the transmission power of current device.")
     print("-                      : The transmission power of current device is default to 5.")
+    print("- \'exit\'             : Close Cliserver and the log files, then quit.")
     print("----------------------------------------------------------------------------------")
 
 def load_commands(cmd_file_path: str, role: str) -> dict:
@@ -153,6 +581,8 @@ def load_commands(cmd_file_path: str, role: str) -> dict:
     return commands[role]
 
 def select_com_port() -> str:
+    import serial.tools.list_ports
+
     ports = list(serial.tools.list_ports.comports())
     usb_serial_ports = [port for port in ports if 'USB Serial' in port.description]
 
@@ -176,6 +606,8 @@ def set_role(role_mapping) -> str:
     return role_mapping[role]
 
 def find_available_tcp_port(start_port=20020, host=r'127.0.0.1'):
+    import socket
+
     port = start_port
     while True:
         with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
@@ -205,9 +637,24 @@ def init_device(args_dict: dict, cmd_file_path: str) -> Device:
     # init TCP port
     tcp_port = find_available_tcp_port()
 
+    from utils.device import Device
+
     device = Device(role, cmds, com_port, tcp_port)
     return device
 
+def init_devices(device_pairs: list, cmd_file_path: str) -> list:
+    """ one Device per (role, COM port) pair, each on its own TCP port """
+    from utils.device import Device
+
+    role_mapping = {'tx': 'initiator', 'rx': 'responder'}
+    devices, tcp_port = [], None
+    for role, com_port in device_pairs:
+        role = role_mapping[role]
+        # ports are only probed, not held, so continue after the last one given out
+        tcp_port = find_available_tcp_port() if tcp_port is None else find_available_tcp_port(tcp_port + 1)
+        devices.append(Device(role, load_commands(cmd_file_path, role), com_port, tcp_port))
+    return devices
+
 def name_log_file(device_role: str, distance: float) -> str:
     if device_role == 'initiator':
         return None
@@ -221,27 +668,184 @@ def name_log_file(device_role: str, distance: float) -> str:
         else:
             return f"{str(user_input)}.log"
 
-def run_ranging_demo(device: Device, ranging_time: int, cliserver_path: str, log_file=None):
-    # establish TCP connection
-    device.establish_tcp_conn(cliserver_path)
-
-    # send all commands to start ranging demo
-    device.send_cmds()
+def open_log_file(log_file_path: str, args_dict: dict):
+    """ log file written by a background thread, so disk latency never stalls the capture """
+    from utils.logWriter import LogWriter
+
+    return LogWriter(log_file_path, rotate_bytes=int(args_dict['--rotate-mb'] * 1e6),
+                     rotate_seconds=args_dict['--rotate-minutes'] * 60, fsync=args_dict['--fsync'],
+                     flush_interval=args_dict['--flush-interval'])
+
+def run_ranging_demo(device: Device, ranging_time: int, cliserver_path: str, log_file=None,
+                     analyst: LogAnalyst = None, capture_file_path: str = None, command_timeout=2.0,
+                     retries=0, pipeline=False) -> dict:
+    """ one run, return the capture report or None if the device did not answer the commands """
+    # establish TCP connection, Cliserver and the connection of a previous run are reused
+    device.establish_tcp_conn(cliserver_path, command_timeout=command_timeout, retries=retries, pipeline=pipeline)
+
+    # send all commands to start ranging demo, nothing is captured from a device which did not answer
+    start = time.perf_counter()
+    if device.send_cmds() is None:
+        abort_run([device])
+        return None
+    print(f"Commands sent in {(time.perf_counter() - start) * 1000:.0f} ms.")
 
     # receive ranging demo message within ranging_time * 0.1s
-    for i in range(0, ranging_time + 1):
-        device.receive(log_file=log_file)
-        sys.stdout.flush()
-        print(f"Ranging progress: {float(i * 100 / ranging_time):.2f}%", end='\r')
-        time.sleep(0.1)
+    # received lines go through the log format extractors while capturing
+    line_handler, capture_writer = capture_line_handler(device, analyst, capture_file_path)
+    report = device.capture(ranging_time * 0.1, log_file=log_file, line_handler=line_handler)
     print('Ranging completed.')
+    show_capture_report(report)
+    if capture_writer is not None:
+        capture_writer.close()
+        show_capture_writer_result(capture_writer)
 
-    # close TCP connection for current device
-    device.close_tcp_conn()
-
-    # close log file
+    # the connection and the log file stay open for the next run, see close_ranging_demo
     if log_file is not None:
-        log_file.close()
+        log_file.flush()
+        show_log_writer_metrics(log_file)
+    return report
+
+def name_log_files(devices: list, distance: float) -> list:
+    """ log file name per device, the COM port tells responders apart """
+    base_name = None
+    names = []
+    for device in devices:
+        if device.role == 'initiator':
+            names.append(None)
+            continue
+        if base_name is None:
+            base_name = name_log_file(device.role, distance).rsplit('.log', 1)[0]
+        names.append(f"{base_name}@{device.com_port}.log")
+    return names
+
+def run_multi_ranging_demo(devices: list, ranging_time: int, cliserver_path: str, log_files: list,
+                           analysts: list = None, capture_file_paths: list = None, command_timeout=2.0, retries=0,
+                           pipeline=False) -> dict:
+    """ one run of all devices, return the capture reports per COM port or None if a device did not answer """
+    from utils.captureEngine import CaptureEngine
+
+    for device in devices:
+        device.establish_tcp_conn(cliserver_path, command_timeout=command_timeout, retries=retries, pipeline=pipeline)
+
+    # configure responders first so they are listening when the initiators start
+    start = time.perf_counter()
+    for device in sorted(devices, key=lambda d: d.role == 'initiator'):
+        if device.send_cmds() is None:
+            abort_run(devices)
+            return None
+    print(f"Commands sent in {(time.perf_counter() - start) * 1000:.0f} ms.")
+
+    # all devices are captured by one engine, so they start and stop together
+    engine = CaptureEngine()
+    capture_writers = []
+    analysts = analysts or [None] * len(devices)
+    capture_file_paths = capture_file_paths or [None] * len(devices)
+    for device, log_file, analyst, capture_file_path in zip(devices, log_files, analysts, capture_file_paths):
+        line_handler, capture_writer = capture_line_handler(device, analyst, capture_file_path)
+        capture_writers.append(capture_writer)
+        device.attach(engine, log_file=log_file, line_handler=line_handler)
+    try:
+        reports = engine.run(ranging_time * 0.1)
+    finally:
+        engine.close()
+    print('Ranging completed.')
+
+    for device, log_file, capture_writer in zip(devices, log_files, capture_writers):
+        print(f"{device}:")
+        show_capture_report(reports[device.com_port])
+        if log_file is not None:
+            log_file.flush()
+            show_log_writer_metrics(log_file)
+        if capture_writer is not None:
+            capture_writer.close()
+            show_capture_writer_result(capture_writer)
+    return reports
+
+def abort_run(devices: list):
+    """ end Cliserver of every device after a device did not answer, the next run starts them again """
+    for device in devices:
+        device.close_tcp_conn()
+    print('Run aborted, nothing captured.')
+
+def close_ranging_demo(devices: list, log_files: list):
+    """ end Cliserver of every device and close the log files, on exit only """
+    for device in devices:
+        device.close_tcp_conn()
+    for log_file in log_files:
+        if log_file is not None:
+            try:
+                log_file.close()  # a LogWriter writes what is still queued first
+            except OSError as e:
+                print(f"Failed to close log file: {e}")
+
+def capture_line_handler(device: Device, analyst: LogAnalyst = None, capture_file_path: str = None):
+    """ line handler feeding inline analysis (begun with analyst.begin_capture) and/or a binary capture,
+        and the capture writer """
+    handlers, capture_writer = [], None
+    if analyst is not None:
+        handlers.append(analyst.feed_lines)
+    if capture_file_path is not None:
+        from utils.binaryCapture import CaptureWriter
+
+        capture_writer = CaptureWriter(capture_file_path, device.config)
+        handlers.append(capture_writer.feed_lines)
+
+    if len(handlers) < 2:
+        return (handlers[0] if handlers else None), capture_writer
+
+    def line_handler(lines):
+        for handler in handlers:
+            handler(lines)
+    return line_handler, capture_writer
+
+def save_inline_analysis(analyst: LogAnalyst, log_file_name: str, distance: float, result_dir: str,
+                         output_format='xlsx'):
+    """ analyse the samples collected during the runs of a capture and save them, no re-read of the log """
+    file_type = analyst.end_capture()
+    if file_type is None:
+        print(f"No ranging results recognized for {log_file_name}, nothing to analyse.")
+        return
+
+    phy_distance = parse_phy_distance(distance, log_file_name)
+    try:
+        analyst.analysis(phy_distance)
+    except ValueError as e:
+        print(f"{log_file_name}: {e}")
+        return
+    for device_id in analyst.distances.keys():
+        analyst.show_result(device_id)
+
+    save_file_path = construct_save_file_path(log_file_name, result_dir, ext=output_format)
+    analyst.save_result(save_file_path, output_format)
+    print(f"Analysis results saved to {save_file_path}")
+
+def show_capture_report(report: dict):
+    if not report:
+        return
+    print(f"Received {report['lines']} lines ({report['bytes']} bytes), "
+          f"{report['lines/s']} lines/s, {report['bytes/s']} bytes/s.")
+    if report['buffer overflowed']:
+        print(f"Warning: {report['overflow count']} line(s) exceeded the receive buffer and were written unsplit.")
+    if report['connection closed']:
+        print('Warning: connection closed by Cliserver before the end of the run.')
+
+def show_capture_writer_result(capture_writer):
+    if capture_writer.unsupported:
+        print(f"Warning: unsupported log format, nothing written to {capture_writer.capture_file_path}")
+        return
+    print(f"{capture_writer.records} ranging results written to {capture_writer.capture_file_path}")
+
+def show_log_writer_metrics(log_file):
+    # only a LogWriter has metrics, plain files are written synchronously
+    if not hasattr(log_file, 'metrics'):
+        return
+    metrics = log_file.metrics()
+    print(f"Log written: {metrics['bytes written']} bytes in {metrics['batches']} writes to {metrics['file']}, "
+          f"max queue depth {metrics['max queue depth']}, {metrics['rotations']} rotation(s).")
+    if metrics['blocked writes']:
+        print(f"Warning: capture waited {metrics['time blocked (s)']:.3f} s for the disk "
+              f"({metrics['blocked writes']} blocked write(s)).")
 
 # END OF FILE
 #---------------------------------------------------------------------------------
\ No newline at end of file
@@ -4,7 +4,7 @@
 # Author: Zhang
 #
 # Create Date: 2024/10/09
-# Last Update on: 2024/11/02
+# Last Update on: 2026/10/18
 #
 # FILE: logAnalyst.py
 # Description: Classe LogAnalyst is defined here
@@ -13,13 +13,27 @@
 #---------------------------------------------------------------------------------
 # IMPORT REQUIRED PACKAGES HERE
 
+import os
+import sys
 import math
-import re
-import statistics
+import mmap
 
-import pandas as pd
+import numpy as np
 
+from array import array
+from functools import partial
 from collections import defaultdict
+from itertools import chain
+from contextlib import nullcontext
+from concurrent.futures import ProcessPoolExecutor
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+import utils.logFormat as logFormat
+import utils.timeSeries as timeSeries
+import utils.resultWriter as resultWriter
+import utils.binaryCapture as binaryCapture
+import utils.distanceHistogram as distanceHistogram
+import utils.compressedLog as compressedLog
 
 # END OF PACKAGE IMPORT
 #---------------------------------------------------------------------------------
@@ -27,127 +41,599 @@ from collections import defaultdict
 #---------------------------------------------------------------------------------
 # DEFINE CLASS HERE
 
+# parallel_scan_log_file gives every worker at least this many bytes, below
+# that starting a process costs more than it saves
+PARALLEL_MIN_RANGE_BYTES = 8 * 1024 * 1024
+
+# spans the time-series metrics (rate, gaps, stalls, per-second statistics)
+# are computed over: the analysis 'window' or the whole 'capture'
+TIMELINES = ('window', 'capture')
+
+
 class LogAnalyst(object):
-    def __init__(self, warmup_samples: int, analysis_samples: int) -> None:
+    def __init__(self, warmup_samples: int, analysis_samples: int,
+                 percentiles=distanceHistogram.DEFAULT_PERCENTILES, timeline='window') -> None:
+        if timeline not in TIMELINES:
+            raise ValueError(f"Unsupported timeline '{timeline}', expected one of {TIMELINES}.")
         self._warmup_samples = warmup_samples
         self._analysis_samples = analysis_samples
+        self.percentiles = percentiles  # reported next to the median, from the histograms
+        # with 'capture' every reader goes through the whole file, the full columns are kept
+        # in capture_distances/capture_timestamps and the time-series metrics use them
+        self.timeline = timeline
         self._content = None
 
-        self._distance_pattern = {
-            'gui': r"Distance\s*:\s*(\d+)",
-            'teraterm': r"Distance\[cm\]: (\d+|-)",
-            'mobis': r">> RAD RESULT:( Time Out|([\d.]+))"
-        }
+        # ranging results used to analysis (intercepted), with unit cm
+        # float32 column per device, float('inf') marks a failed ranging
+        self.distances = {}
+        self.valid = {}  # validity mask per device, True for successful ranging
+        # int64 device time stamps (ms) per device, next to distances
+        # logFormat.NO_TIMESTAMP for log formats without time stamp
+        self.timestamps = {}
+        self.capture_distances = {}   # whole capture per device, timeline 'capture' only
+        self.capture_timestamps = {}
+        self.analysis_results = {}  # analysis results
+        self.windowed_results = {}  # per-second statistics of timestamped devices
+        self.histograms = {}  # DistanceHistogram of the analysed window per device
 
-        self._ranging_failed_flag = {
-            'gui': r"65535",
-            'teraterm': r"-",
-            'mobis': r" Time Out"
-        }
+        self._capture_type = None   # log format of an inline analysis, see begin_capture
+        self._received = None
+        self._capture_head = []
+        self._capture_head_chars = 0
 
-        # ranging results used to analysis (intercepted)
-        # with unit cm
-        # self.distances = defaultdict(list)  
-        self.analysis_results = {}  # analysis results
+        # a StageProfiler records time/memory per stage and counters when set
+        self.profiler = None
 
     def read_log_file(self, log_file_path: str) -> str:
         """ guess log file type from content """
-        with open(log_file_path, 'r', encoding='utf-8') as f:
-            # read log file line by line and remove empty line
-            self._content = [line.strip() for line in f.readlines() if line.strip()]
+        # read log file line by line and remove empty line
+        with self._stage('read'):
+            self._content = list(self._iter_lines(log_file_path))
+        self._count('lines scanned', len(self._content))
         
         if not self._content:  # empty log file
             return None
         
-        for line in self._content:
-            if "PORT" in line and "TimeStamp" in line:
-                return 'gui'
-            elif "Status" in line and "BlockIndex" in line:
-                return 'teraterm'
-            elif "RAD RESULT" in line:
-                return 'mobis'
-            else: continue 
-        return None
-    
-    def extract_distance(self, log_file_type, device_info_pattern=r"PORT\s*(\d+)"):
-        self.distances = defaultdict(list)
-
-        distance_pattern = self._distance_pattern[log_file_type]
-        ranging_failed_flag = self._ranging_failed_flag[log_file_type]
-
-        for line in self._content:
-            device_id = '0'
-            security_status_code = 0
-
-            if log_file_type == 'gui':
-                # extract port information for gui log
-                device_id = re.search(device_info_pattern, line).group(1)
-                # extract secutrity status code
-                security_status_code = int(line.split(',')[9])
-            
-            # search distance information in current line
-            match = re.search(distance_pattern, line)
-            # only deal lines contains distance information
-            if match:
-                if not security_status_code:
-                    tmp = match.group(1)
-                    curr_dist = float(tmp) if tmp != ranging_failed_flag else float('inf')
-                else:
-                    # security code is not 0
-                    # un-secured results, regarded as ranging failed
-                    curr_dist = float('inf')
-                
-                if log_file_type == 'mobis' and not math.isinf(curr_dist):
-                    # change the unit to cm
-                    curr_dist = round(curr_dist * 100)
+        # only the head of the content is looked at, see logFormat.DETECT_BYTES
+        with self._stage('detect'):
+            return logFormat.detect_format_head(self._content)
+
+    def stream_log_file(self, log_file_path: str, whole_file=False) -> str:
+        """
+        Read, detect and extract in one pass without keeping the file content.
+
+        Reading stops as soon as every device seen so far has collected
+        warmup_samples + analysis_samples results, so only the head of a long
+        capture is parsed (all of it with timeline 'capture'). A device which
+        shows up for the first time after all others are full is therefore
+        not reported.
+        Fills self.distances exactly like read_log_file + extract_distance.
+        With whole_file=True every sample is read and kept without slicing.
+        """
+        self._content = None
+        self._new_buffers()
+
+        source = self._iter_lines(log_file_path)
+        lines = self._count_lines(source) if self.profiler is not None else source
+
+        # lines before the first recognizable line are replayed after detection
+        head, log_file_type = [], None
+        head_chars = 0
+        with self._stage('detect'):
+            for line in lines:
+                head.append(line)
+                log_file_type = self._detect_format(line)
+                head_chars += len(line) + 1
+                if log_file_type is not None or head_chars >= logFormat.DETECT_BYTES:
+                    break
+        if log_file_type is None:  # empty or unsupported log file
+            source.close()
+            return None
+
+        with self._stage('extract'):
+            samples = self._iter_distances(chain(head, lines), log_file_type)
+            self._fill_window(samples, whole_file)
+        source.close()
+
+        if not whole_file:
+            self._intercept()
+        return log_file_type
+
+    def scan_log_file(self, log_file_path: str, whole_file=False) -> str:
+        """
+        Memory-mapped alternative to stream_log_file for very large captures.
+
+        A compiled bytes pattern runs with finditer over the mapped file, so no
+        line is decoded or kept as str and peak memory does not grow with the
+        file size. Same early termination and results as stream_log_file.
+        Compressed logs cannot be mapped, the pattern runs over chunks of
+        their decompressed stream instead.
+        """
+        self._content = None
+        self._new_buffers()
+
+        if compressedLog.is_compressed(log_file_path):
+            # nothing to map, the same scanners run over decompressed chunks
+            return self._scan_chunks(log_file_path, whole_file)
+
+        with open(log_file_path, 'rb') as f:
+            if os.fstat(f.fileno()).st_size == 0:  # empty log file
+                return None
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+                # lines are never split here, only the mapped bytes are counted
+                self._count('bytes mapped', len(buffer))
+                with self._stage('detect'):
+                    log_file_type = self._detect_format_bytes(buffer)
+                if log_file_type is None:  # unsupported log file
+                    return None
+
+                with self._stage('extract'):
+                    samples = logFormat.SCANNERS[log_file_type](buffer)
+                    counted = self._count_samples(samples, log_file_type, self.profiler.counters) if self.profiler is not None else samples
+                    self._fill_window(self._iter_secured(counted), whole_file)
+                    samples.close()  # release the buffer before unmapping
+
+        if not whole_file:
+            self._intercept()
+        return log_file_type
+
+    def parallel_scan_log_file(self, log_file_path: str, jobs=0, whole_file=False) -> str:
+        """
+        scan_log_file over byte ranges of one file in 'jobs' worker processes,
+        0 for all cores. Ranges end on line breaks and their columns are
+        appended in file order, so columns and windows are exactly those of
+        read_log_file + extract_distance: every sample is parsed, there is no
+        early termination. Compressed logs and files too small to split are
+        scanned in this process.
+        """
+        self._content = None
+        self._new_buffers()
+
+        with open(log_file_path, 'rb') as f:
+            size = os.fstat(f.fileno()).st_size
+            jobs = jobs if jobs > 0 else (os.cpu_count() or 1)
+            parts = min(jobs, size // PARALLEL_MIN_RANGE_BYTES)
+            if compressedLog.is_compressed(log_file_path) or parts < 2:
+                log_file_type = self.scan_log_file(log_file_path, whole_file=True)
+                if log_file_type is not None and not whole_file:
+                    self._intercept()
+                return log_file_type
+
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+                self._count('bytes mapped', size)
+                with self._stage('detect'):
+                    log_file_type = self._detect_format_bytes(buffer)
+                if log_file_type is None:  # unsupported log file
+                    return None
+                # equal ranges, each boundary moved to just after the next line break
+                bounds = [0]
+                for idx in range(1, parts):
+                    newline = buffer.find(b'\n', max(size * idx // parts, bounds[-1]))
+                    bounds.append(size if newline < 0 else newline + 1)
+                bounds.append(size)
+
+        count = self.profiler is not None  # workers count failures by cause like the other readers
+        ranges = [(log_file_path, start, end, log_file_type, count)
+                  for start, end in zip(bounds, bounds[1:]) if end > start]
+        self._count('parse ranges', len(ranges))
+        with self._stage('extract'):
+            with ProcessPoolExecutor(max_workers=len(ranges)) as executor:
+                for distances, timestamps, counters in executor.map(_scan_range, ranges):
+                    # devices keep the order of their first sample in the file
+                    for device_id in distances.keys():
+                        self.distances[device_id].extend(distances[device_id])
+                        self.timestamps[device_id].extend(timestamps[device_id])
+                    for name, n in counters.items():
+                        self._count(name, n)
+
+        if not whole_file:
+            self._intercept()
+        return log_file_type
+
+    def _scan_chunks(self, log_file_path: str, whole_file: bool) -> str:
+        chunks = compressedLog.iter_chunks(log_file_path)
+        head = next(chunks, b'')
+        self._count('bytes decompressed', len(head))
+        with self._stage('detect'):
+            log_file_type = self._detect_format_bytes(head)
+        if log_file_type is None:  # empty or unsupported log file
+            chunks.close()
+            return None
+
+        def scan(chunk):
+            self._count('bytes decompressed', len(chunk))
+            return logFormat.SCANNERS[log_file_type](chunk)
+
+        with self._stage('extract'):
+            # the first chunk was counted above
+            samples = chain(logFormat.SCANNERS[log_file_type](head), chain.from_iterable(map(scan, chunks)))
+            counted = self._count_samples(samples, log_file_type, self.profiler.counters) if self.profiler is not None else samples
+            self._fill_window(self._iter_secured(counted), whole_file)
+        chunks.close()  # stops decompressing once the window is filled
+
+        if not whole_file:
+            self._intercept()
+        return log_file_type
+
+    def cached_log_file(self, log_file_path: str, cache, reader='mmap', jobs=0) -> str:
+        """
+        Load the sample columns of a log file from a ParseCache, parse the whole
+        file with 'reader' (and 'jobs' for the parallel one) and store its columns on a miss. Only the window
+        slicing runs on a hit, so changing -w/-n/-d does not re-parse the log.
+        """
+        with self._stage('load'):
+            entry = cache.load(log_file_path)
+        self._count('cache hits' if entry is not None else 'cache misses')
+        if entry is not None:
+            self._content = None
+            log_file_type, self.distances, self.timestamps = entry
+        else:
+            if reader == 'stream':
+                log_file_type = self.stream_log_file(log_file_path, whole_file=True)
+            elif reader == 'mmap':
+                log_file_type = self.scan_log_file(log_file_path, whole_file=True)
+            elif reader == 'parallel':
+                log_file_type = self.parallel_scan_log_file(log_file_path, jobs, whole_file=True)
+            else:
+                log_file_type = self.read_log_file(log_file_path)
+                if log_file_type is not None:
+                    self._extract_all(log_file_type)
+            if log_file_type is None:  # empty or unsupported log file
+                return None
+            with self._stage('cache'):
+                cache.store(log_file_path, log_file_type, self.distances, self.timestamps)
+
+        self._intercept()
+        return log_file_type
+
+    def load_capture_file(self, capture_file_path: str, whole_file=False) -> str:
+        """
+        Load a binary capture written by rangingDemo straight into the columns,
+        nothing is parsed. Return the log format recorded in its header.
+        """
+        self._content = None
+        with self._stage('load'):
+            header, records = binaryCapture.read_capture(capture_file_path)
+            if header['log_format'] is None or not records.size:  # nothing was captured
+                return None
+
+            # devices in order of their first sample, like the text readers
+            devices, first = np.unique(records['device'], return_index=True)
+            self.distances, self.timestamps = {}, {}
+            for device in devices[np.argsort(first)]:
+                device_records = records[records['device'] == device]
+                dists = device_records['distance'].copy()
+                # un-secured results, regarded as ranging failed
+                dists[device_records['status'] != 0] = logFormat.FAILED_DISTANCE
+                self.distances[str(device)] = dists
+                self.timestamps[str(device)] = device_records['timestamp']
+
+        if not whole_file:
+            self._intercept()
+        return header['log_format']
+
+    def begin_capture(self):
+        """ start inline analysis, lines are then given with feed_lines while a capture runs """
+        self._content = None
+        self._new_buffers()
+        self._received = None  # samples fed so far, kept by end_capture for the next run
+        self._capture_type = None
+        self._capture_head = []  # lines before the first recognizable line
+        self._capture_head_chars = 0
+
+    def feed_lines(self, lines):
+        """ extract samples from freshly received lines, same extractors as the file readers """
+        if self._received is not None:  # a further run of the capture, go on after its samples
+            self.distances, self.timestamps = self._received
+            self._received = None
+        lines = [line for line in map(str.strip, lines) if line]
+        if self._capture_type is None:
+            if self._capture_head is None:  # nothing recognized in the first DETECT_BYTES
+                return
+            for idx, line in enumerate(lines):
+                self._capture_head.append(line)
+                self._capture_head_chars += len(line) + 1
+                self._capture_type = self._detect_format(line)
+                if self._capture_type is not None:
+                    break
+                if self._capture_head_chars >= logFormat.DETECT_BYTES:
+                    # unsupported output, given up like the file readers instead of buffering all of it
+                    self._capture_head = None
+                    return
+            if self._capture_type is None:
+                return
+            lines, self._capture_head = self._capture_head + lines[idx + 1:], []
+
+        # stops appending once the window of a device is filled, like stream_log_file
+        self._fill_window(self._iter_distances(lines, self._capture_type))
+
+    def end_capture(self) -> str:
+        """
+        Finish a run of inline analysis, return the log format or None if
+        nothing was recognized. The samples are kept, feed_lines of a further
+        run of the same capture goes on after them, so the window is the one a
+        file reader takes from the log of all runs.
+        """
+        if self._capture_type is not None:
+            if self._received is None:
+                self._received = (self.distances, self.timestamps)
+            self.distances, self.timestamps = dict(self._received[0]), dict(self._received[1])
+            self._intercept()
+        return self._capture_type
+
+    def _new_buffers(self):
+        # growable float32 buffers, 4 bytes per sample instead of a float object
+        self.distances = defaultdict(partial(array, 'f'))
+        self.timestamps = defaultdict(partial(array, 'q'))
+
+    def _fill_window(self, samples, whole_file=False):
+        """
+        Append (device_id, distance, timestamp) samples until every device seen
+        so far has collected warmup_samples + analysis_samples results, or all
+        of them with timeline 'capture'.
+        """
+        if whole_file or self.timeline == 'capture':
+            for device_id, curr_dist, timestamp in samples:
                 self.distances[device_id].append(curr_dist)
+                self.timestamps[device_id].append(timestamp)
+            return
+
+        window = self._warmup_samples + self._analysis_samples
+        full_devices = set()
+        for device_id, curr_dist, timestamp in samples:
+            dists = self.distances[device_id]
+            if len(dists) < window:
+                dists.append(curr_dist)
+                self.timestamps[device_id].append(timestamp)
+                if len(dists) == window:
+                    full_devices.add(device_id)
+            if len(full_devices) == len(self.distances):
+                break  # every device has filled its window, stop reading
+
+    @staticmethod
+    def _iter_lines(log_file_path: str):
+        """ yield stripped, non-empty lines of a log file one by one, compressed logs are decompressed on the fly """
+        with compressedLog.open_text(log_file_path) as f:
+            for line in f:
+                line = line.strip()
+                if line:
+                    yield line
+
+    @staticmethod
+    def _detect_format(line: str) -> str:
+        return logFormat.detect_format(line)
+
+    @staticmethod
+    def _detect_format_bytes(buffer) -> str:
+        """ _detect_format for a bytes buffer, only its first logFormat.DETECT_BYTES are decoded """
+        return logFormat.detect_format_bytes(buffer)
+    
+    def extract_distance(self, log_file_type):
+        with self._stage('extract'):
+            self._extract_all(log_file_type)
+        self._intercept()
 
-        # intercept useful distances
+    def _extract_all(self, log_file_type):
+        self._new_buffers()
+        self._fill_window(self._iter_distances(self._content, log_file_type), whole_file=True)
+
+    def _iter_distances(self, lines, log_file_type):
+        """ yield (device_id, distance, timestamp) for every line contains distance information """
+        extract = logFormat.EXTRACTORS[log_file_type]
+        # only deal lines contains distance information
+        samples = (sample for sample in map(extract, lines) if sample is not None)
+        if self.profiler is not None:
+            samples = self._count_samples(samples, log_file_type, self.profiler.counters)
+        return self._iter_secured(samples)
+
+    @staticmethod
+    def _iter_secured(samples):
+        """ turn (device_id, status, distance, timestamp) into (device_id, distance, timestamp) """
+        for device_id, security_status_code, curr_dist, timestamp in samples:
+            if security_status_code:
+                # security code is not 0
+                # un-secured results, regarded as ranging failed
+                curr_dist = float('inf')
+            yield device_id, curr_dist, timestamp
+
+    def _intercept(self):
+        with self._stage('window'):
+            kept = self._slice_window()
+
+        if self.profiler is not None:
+            # matched samples which are not analysed, either never appended
+            # by an early-stopping reader or cut off here
+            matched = self.profiler.counters.get('lines matched', kept[0])
+            self._count('samples dropped by window', matched - kept[1])
+
+    def _slice_window(self) -> tuple:
+        """ cut every device to its window and freeze the columns, return samples (before, after) """
+        before = sum(len(dists) for dists in self.distances.values())
+        if self.timeline == 'capture':
+            # copies, the buffers of an inline analysis still grow with the next run
+            self.capture_distances = {
+                device_id: np.array(dists, dtype=np.float32) for device_id, dists in self.distances.items()
+            }
+            self.capture_timestamps = {
+                device_id: np.array(self.timestamps[device_id], dtype=np.int64)
+                for device_id in self.distances.keys()
+            }
+
+        # intercept useful distances, time stamps are cut the same way
         for device_id in self.distances.keys():
             length = len(self.distances[device_id])
             if length <= self._warmup_samples:
-                self.distances[device_id] = self.distances[device_id]
+                window = slice(None)
             elif self._warmup_samples < length <= (self._warmup_samples + self._analysis_samples):
-                self.distances[device_id] = self.distances[device_id][self._warmup_samples:]
-            elif (self._warmup_samples + self._analysis_samples) < length:
-                self.distances[device_id] = \
-                    self.distances[device_id][self._warmup_samples:self._warmup_samples + self._analysis_samples]
-            else: pass
-
-    def analysis(self, physical_distance: float, device_id: str):
-        success_dists = [d for d in self.distances[device_id] if not math.isinf(d)]  # successful ranging results
-        if not success_dists:
-            raise ValueError('All ranging failed. No valied ranging results to analysis.')
-            
-        min_dist = min(success_dists)
-        max_dist = max(success_dists)
-        ave_dist = statistics.mean(success_dists)
-        median_dist = statistics.median(success_dists)
-        stdev = statistics.stdev(success_dists)
+                window = slice(self._warmup_samples, None)
+            else:
+                window = slice(self._warmup_samples, self._warmup_samples + self._analysis_samples)
+            self.distances[device_id] = self.distances[device_id][window]
+            self.timestamps[device_id] = self.timestamps[device_id][window]
+
+        # freeze buffers into float32/int64 columns and validity masks
+        self.distances = {
+            device_id: np.asarray(dists, dtype=np.float32) for device_id, dists in self.distances.items()
+        }
+        self.timestamps = {
+            device_id: np.asarray(self.timestamps[device_id], dtype=np.int64) for device_id in self.distances.keys()
+        }
+        self.valid = {device_id: np.isfinite(dists) for device_id, dists in self.distances.items()}
+        return before, sum(dists.size for dists in self.distances.values())
+
+    def _stage(self, name: str):
+        return self.profiler.stage(name) if self.profiler is not None else nullcontext()
+
+    def _count(self, name: str, n=1):
+        if self.profiler is not None:
+            self.profiler.count(name, n)
 
+    def _count_lines(self, lines):
+        counters = self.profiler.counters
+        for line in lines:
+            counters['lines scanned'] += 1
+            yield line
+
+    @staticmethod
+    def _count_samples(samples, log_file_type: str, counters):
+        """ pass (device_id, status, distance, timestamp) samples through, counting failures by cause """
+        failed = f"failed: {logFormat.FORMATS[log_file_type].failure}"
+        for sample in samples:
+            counters['lines matched'] += 1
+            if sample[1]:
+                counters['failed: security code'] += 1
+            elif sample[2] == logFormat.FAILED_DISTANCE:
+                counters[failed] += 1
+            yield sample
+
+    def analysis(self, physical_distance: float, device_id=None):
+        """
+        Analyse all devices in one vectorized pass over their columns.
+        Results of every device are kept, device_id only selects which device
+        must have successful ranging results. Distance statistics cover the
+        analysis window, time-series metrics the span given by timeline.
+        """
+        with self._stage('analysis'):
+            device_ids = list(self.distances.keys())
+            metrics = self._device_statistics(
+                [self.distances[d] for d in device_ids], [self.valid[d] for d in device_ids]
+            )
+
+            for dev, success_cnt in zip(device_ids, metrics['count']):
+                if not success_cnt and device_id in (None, dev):
+                    raise ValueError('All ranging failed. No valied ranging results to analysis.')
+
+            self.analysis_results = {}  # clear previous results
+            self.windowed_results = {}
+            self.histograms = {}
+
+            for idx, dev in enumerate(device_ids):
+                self.analysis_results[dev] = self._result_entry(
+                    float(metrics['min'][idx]), float(metrics['max'][idx]), float(metrics['mean'][idx]),
+                    float(metrics['median'][idx]), float(metrics['stdev'][idx]),
+                    int(metrics['count'][idx]), len(self.distances[dev]), physical_distance,
+                )
+                self.histograms[dev] = distanceHistogram.DistanceHistogram()
+                self.histograms[dev].add_array(self.distances[dev])
+                self.analysis_results[dev].update(self._percentile_entry(self.histograms[dev], self.percentiles))
+
+                # time-series metrics next to the existing ones for timestamped logs
+                if self.timeline == 'capture' and dev in self.capture_timestamps:
+                    timestamps, dists = self.capture_timestamps[dev], self.capture_distances[dev]
+                    valid = np.isfinite(dists)
+                else:
+                    timestamps, dists, valid = self.timestamps.get(dev), self.distances[dev], self.valid[dev]
+                if timestamps is not None and timestamps.size and (timestamps != logFormat.NO_TIMESTAMP).all():
+                    self.analysis_results[dev].update(timeSeries.timeseries_metrics(timestamps))
+                    self.windowed_results[dev] = timeSeries.windowed_stats(timestamps, dists, valid)
+
+    def live_analysis(self, running_stats: dict, physical_distance: float):
+        """
+        Fill analysis_results from incrementally updated RunningStats of every
+        device (see LogFollower), devices without any sample yet are skipped.
+        The median is an estimate here.
+        """
+        self.analysis_results = {}
+        for device_id, stats in running_stats.items():
+            if not stats.count:
+                continue
+            self.analysis_results[device_id] = self._result_entry(
+                stats.min, stats.max, stats.mean, stats.median, stats.stdev,
+                stats.success_count, stats.count, physical_distance,
+            )
+            self.analysis_results[device_id].update(self._percentile_entry(stats.histogram, self.percentiles))
+
+    @staticmethod
+    def _result_entry(min_dist, max_dist, ave_dist, median_dist, stdev, successed_cnt, total_cnt, physical_distance):
         if math.isinf(physical_distance):
             offset = 'None (True distance is not provided)'
         else:
-            offset = (physical_distance - ave_dist)
-            
-        successed_cnt = len(success_dists)
-        failed_cnt = len(self.distances[device_id]) - successed_cnt
-        ranging_success_rate = successed_cnt / len(self.distances[device_id])
+            offset = round(physical_distance - ave_dist, 2)
 
-        self.analysis_results = {}  # clear previous results
+        failed_cnt = total_cnt - successed_cnt
+        ranging_success_rate = successed_cnt / total_cnt
 
-        self.analysis_results[device_id] = {
+        return {
             'min distance (cm)': min_dist,
             'max distance (cm)': max_dist,
             'average distance (cm)': round(ave_dist, 2),
             'median distance (cm)': round(median_dist, 2),
             'physical distance (cm)': physical_distance,
-            'offset (real - ave.) (cm)': round(offset, 2),
+            'offset (real - ave.) (cm)': offset,
             'std. deviation': round(stdev, 2),
             'success count': successed_cnt,
             'fail count': failed_cnt,
             'success rate': f"{round(ranging_success_rate * 100, 2)}%"
         }
+
+    @staticmethod
+    def _percentile_entry(histogram, percentiles) -> dict:
+        return {f"p{p:g} distance (cm)": value for p, value in histogram.percentiles(percentiles).items()}
+
+    @staticmethod
+    def _device_statistics(columns: list, masks: list) -> dict:
+        """
+        min/max/mean/median/stdev and success count of the valid samples of
+        every column, computed on one concatenated array grouped by column.
+        Metrics of a column without valid samples are nan.
+        """
+        n_devices = len(columns)
+        lengths = [len(column) for column in columns]
+        groups = np.repeat(np.arange(n_devices), lengths)
+        values = np.concatenate(columns).astype(np.float64) if columns else np.empty(0)
+        valid = np.concatenate(masks) if masks else np.empty(0, dtype=bool)
+        values, groups = values[valid], groups[valid]
+
+        # sort by device, then by value, so every device is one sorted run
+        order = np.lexsort((values, groups))
+        values, groups = values[order], groups[order]
+
+        counts = np.bincount(groups, minlength=n_devices)
+        nan = np.full(n_devices, np.nan)
+        if not values.size:
+            return {'count': counts, 'min': nan, 'max': nan, 'mean': nan, 'median': nan, 'stdev': nan}
+
+        # index of first, last and middle samples of every run, 0 for empty runs
+        starts = np.cumsum(counts) - counts
+        has_data = counts > 0
+        first = np.where(has_data, starts, 0)
+        last = np.where(has_data, starts + counts - 1, 0)
+        lower_mid = np.where(has_data, starts + (counts - 1) // 2, 0)
+        upper_mid = np.where(has_data, starts + counts // 2, 0)
+
+        with np.errstate(invalid='ignore', divide='ignore'):
+            mean = np.bincount(groups, weights=values, minlength=n_devices) / counts
+            squares = np.bincount(groups, weights=(values - mean[groups]) ** 2, minlength=n_devices)
+            stdev = np.where(counts > 1, np.sqrt(squares / (counts - 1)), np.nan)
+
+        return {
+            'count': counts,
+            'min': np.where(has_data, values[first], nan),
+            'max': np.where(has_data, values[last], nan),
+            'mean': mean,
+            'median': np.where(has_data, (values[lower_mid] + values[upper_mid]) / 2, nan),
+            'stdev': stdev,
+        }
     
     def show_result(self, device_id):
         print(f"Ranging results from device @ port {device_id}:")
@@ -156,25 +642,37 @@ class LogAnalyst(object):
             print(f" {key:<30}{value:<10}")
         print('-' * 41, end='\n\n')
     
-    def save_result(self, save_file_path):
-        with pd.ExcelWriter(save_file_path, engine='openpyxl') as writer:
-            for device_id, results in self.analysis_results.items():
-                dists = self.distances[device_id]
-
-                max_len = max(len(dists), len(results))
-                data = {
-                    'Ranging result': dists + [None] * (max_len - len(dists)),
-                    'Metric': list(results.keys()) + [None] * (max_len - len(results)),
-                    'Value': list(results.values()) + [None] * (max_len - len(results))
-                }
-
-                df = pd.DataFrame(data)
-                df.fillna('nan')
-                df.to_excel(writer, sheet_name=f"device@port{device_id}", index=False)
+    def save_result(self, save_file_path, output_format='xlsx'):
+        """ write samples and results of all devices, output_format is xlsx, csv, parquet or jsonl """
+        with self._stage('save'):
+            resultWriter.WRITERS[output_format](
+                save_file_path, self.analysis_results, self.distances, self.windowed_results
+            )
 
 # END OF CLASS DEFINITION
 #---------------------------------------------------------------------------------
 
+#---------------------------------------------------------------------------------
+# DEFINE FUNCTIONS HERE
+
+def _scan_range(task: tuple) -> tuple:
+    """ worker of parallel_scan_log_file, (distances, time stamps) columns and counters of one byte range """
+    log_file_path, start, end, log_file_type, count = task
+    distances, timestamps = defaultdict(partial(array, 'f')), defaultdict(partial(array, 'q'))
+    counters = defaultdict(int)
+    with open(log_file_path, 'rb') as f:
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+            with memoryview(buffer)[start:end] as view:  # no copy of the range
+                samples = logFormat.SCANNERS[log_file_type](view)
+                counted = LogAnalyst._count_samples(samples, log_file_type, counters) if count else samples
+                for device_id, curr_dist, timestamp in LogAnalyst._iter_secured(counted):
+                    distances[device_id].append(curr_dist)
+                    timestamps[device_id].append(timestamp)
+                samples.close()  # release the view before unmapping
+    return dict(distances), dict(timestamps), dict(counters)
+
+#---------------------------------------------------------------------------------
+
 if __name__ == '__main__':
     # interest log file (log file name)
     log_file_path = r'C:\Users\lyin0\Desktop\LogManager\logs\8.0m.log'
@@ -198,8 +696,8 @@ if __name__ == '__main__':
     # parse log file, extract ranging results
     myAnalyst.extract_distance(file_type)
 
+    myAnalyst.analysis(physical_distance)  # analysis, all devices at once
     for device_id in myAnalyst.distances.keys():
-        myAnalyst.analysis(physical_distance, device_id)  # analysis
         myAnalyst.show_result(device_id)  # show results on terminal
 
     myAnalyst.save_result(save_file_path)  # save all results to one excel file
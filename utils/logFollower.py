@@ -0,0 +1,130 @@
+# -*- coding:utf-8 -*-
+# !/usr/bin/env python
+#---------------------------------------------------------------------------------
+# Author: Zhang
+#
+# Create Date: 2026/10/18
+# Last Update on: 2026/10/18
+#
+# FILE: logFollower.py
+# Description: Classe LogFollower is defined here
+#---------------------------------------------------------------------------------
+
+#---------------------------------------------------------------------------------
+# IMPORT REQUIRED PACKAGES HERE
+
+import os
+import sys
+import codecs
+
+from collections import defaultdict
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+import utils.logFormat as logFormat
+from utils.runningStats import RunningStats
+
+# END OF PACKAGE IMPORT
+#---------------------------------------------------------------------------------
+
+#---------------------------------------------------------------------------------
+# DEFINE CLASS HERE
+
+class LogFollower(object):
+    """
+    Follow a log file which is still being written (tail -f).
+
+    Every poll() reads only the bytes appended since the previous call, keeps
+    an incomplete trailing line for the next call and updates RunningStats of
+    every device with the samples inside the warmup/analysis window. Like
+    the file readers, only the first logFormat.DETECT_BYTES are looked at
+    for the log format, then the file is given up as unsupported.
+    """
+    def __init__(self, log_file_path: str, warmup_samples: int, analysis_samples: int) -> None:
+        self.log_file_path = log_file_path
+        self._warmup_samples = warmup_samples
+        self._analysis_samples = analysis_samples
+        self._reset()
+
+    def _reset(self):
+        self.log_file_type = None
+        self.unsupported = False  # no known log format in the first DETECT_BYTES
+        self._head_chars = 0      # characters looked at for the log format
+        self.stats = {}  # device_id -> RunningStats of the analysis window
+        self._seen = defaultdict(int)  # samples seen per device, warmup included
+
+        self._offset = 0     # bytes consumed so far
+        self._partial = ''   # incomplete trailing line
+        self._decoder = codecs.getincrementaldecoder('utf-8')(errors='replace')
+
+    def __repr__(self) -> str:
+        return f"LogFollower(log_file_path={self.log_file_path}, format={self.log_file_type}, offset={self._offset})"
+
+    def poll(self) -> int:
+        """ consume newly appended bytes, return number of new samples """
+        try:
+            size = os.path.getsize(self.log_file_path)
+        except FileNotFoundError:  # not created yet
+            return 0
+        if size < self._offset:  # truncated or re-created, start over
+            self._reset()
+        if size == self._offset:
+            return 0
+        if self.unsupported:  # nothing more is read, only truncation is still noticed
+            self._offset = size
+            return 0
+
+        with open(self.log_file_path, 'rb') as f:
+            f.seek(self._offset)
+            chunk = f.read(size - self._offset)
+        self._offset += len(chunk)
+
+        # a chunk may end inside a line or inside a multi-byte character
+        lines = (self._partial + self._decoder.decode(chunk)).split('\n')
+        self._partial = lines.pop()
+
+        new_samples = 0
+        for line in lines:
+            line = line.strip()
+            if not line:
+                continue
+            if self.log_file_type is None:
+                self.log_file_type = logFormat.detect_format(line)
+                if self.log_file_type is None:
+                    self._head_chars += len(line) + 1
+                    if self._head_chars >= logFormat.DETECT_BYTES:
+                        self.unsupported = True
+                        self._partial = ''
+                        break
+                    continue
+            new_samples += self._add_line(line)
+        return new_samples
+
+    def _add_line(self, line: str) -> int:
+        sample = logFormat.EXTRACTORS[self.log_file_type](line)
+        if sample is None:
+            return 0
+
+        device_id, security_status_code, curr_dist, _ = sample
+        if security_status_code:
+            # un-secured results, regarded as ranging failed
+            curr_dist = float('inf')
+
+        seen = self._seen[device_id]
+        self._seen[device_id] = seen + 1
+        if device_id not in self.stats:
+            self.stats[device_id] = RunningStats()
+        if self._warmup_samples <= seen < self._warmup_samples + self._analysis_samples:
+            self.stats[device_id].add(curr_dist)
+        return 1
+
+    @property
+    def window_filled(self) -> bool:
+        # every device seen so far has filled its warmup + analysis window
+        window = self._warmup_samples + self._analysis_samples
+        return bool(self._seen) and all(seen >= window for seen in self._seen.values())
+
+# END OF CLASS DEFINITION
+#---------------------------------------------------------------------------------
+
+# END OF FILE
+#---------------------------------------------------------------------------------
@@ -0,0 +1,280 @@
+# -*- coding:utf-8 -*-
+# !/usr/bin/env python
+#---------------------------------------------------------------------------------
+# Author: Zhang
+#
+# Create Date: 2026/10/18
+# Last Update on: 2026/10/18
+#
+# FILE: logFormat.py
+# Description: per-format fast extractors used by LogAnalyst
+#---------------------------------------------------------------------------------
+
+#---------------------------------------------------------------------------------
+# IMPORT REQUIRED PACKAGES HERE
+
+import re
+
+from functools import partial
+from collections import namedtuple
+
+# END OF PACKAGE IMPORT
+#---------------------------------------------------------------------------------
+
+#---------------------------------------------------------------------------------
+# DEFINE FUNCTIONS HERE
+
+# Every extractor takes one stripped log line and returns a tuple
+# (device_id, status, distance, timestamp) or None if the line carries no
+# ranging result.
+#   device_id: str, '0' for formats without port information
+#   status   : int, security status code, non-zero means un-secured result
+#   distance : float with unit cm, float('inf') if ranging failed
+#   timestamp: int, device time stamp with unit ms, NO_TIMESTAMP if not logged
+#
+# Throughput target: extract_gui handles gui result lines at least
+# EXTRACT_MIN_SPEEDUP times as fast as the former re.search + split path, both
+# timed side by side by benchmarks/analysisBench.py, which fails below it.
+# Measured on one x86_64 core with Python 3.11: 400-500k lines/s against
+# 250-330k lines/s for the former path (1.5-1.6x). Iterating and stripping the
+# lines alone runs at 2.5-3.5M lines/s, so parsing, not reading, bounds the
+# text readers.
+EXTRACT_MIN_SPEEDUP = 1.3
+
+FAILED_DISTANCE = float('inf')
+NO_TIMESTAMP = -1
+
+
+# Formats are looked up in a registry: each format registers a detector, which
+# tells from one line whether a log is of this format, its extractor and
+# optionally a bytes scanner. Detection only looks at the first DETECT_BYTES of
+# a log, so it costs the same whatever the file size, and a format only ever
+# runs its own extractor, so registering a new one does not slow down others.
+DETECT_BYTES = 16 * 1024
+
+LogFormat = namedtuple('LogFormat', ['name', 'detect', 'extract', 'scan', 'failure'])
+
+FORMATS = {}     # name -> LogFormat, in detection order
+EXTRACTORS = {}  # name -> extractor
+SCANNERS = {}    # name -> bytes scanner
+
+
+def register_format(name: str, detect, extract, scan=None, failure='failed'):
+    """
+    Add a log format. detect(line) -> bool sees stripped lines of the head of a
+    log, extract(line) returns a sample tuple or None (see above) and
+    scan(buffer) yields sample tuples from a bytes buffer. Without scan, the
+    buffer is split into lines which are given to extract.
+    failure is how the format logs a failed ranging, used to name counters.
+    """
+    if scan is None:
+        scan = partial(_scan_lines, extract)
+    FORMATS[name] = LogFormat(name, detect, extract, scan, failure)
+    EXTRACTORS[name] = extract
+    SCANNERS[name] = scan
+
+
+def detect_format(line: str) -> str:
+    """ guess log file type from one line, None if the line is not recognizable """
+    for log_format in FORMATS.values():
+        if log_format.detect(line):
+            return log_format.name
+    return None
+
+
+def detect_format_head(lines, max_chars=DETECT_BYTES) -> str:
+    """ detect_format over the lines of the head of a log, at most max_chars characters are looked at """
+    for line in lines:
+        log_file_type = detect_format(line)
+        if log_file_type is not None:
+            return log_file_type
+        max_chars -= len(line) + 1
+        if max_chars <= 0:
+            break
+    return None
+
+
+def detect_format_bytes(buffer, max_bytes=DETECT_BYTES) -> str:
+    """ detect_format over the first max_bytes of a bytes buffer or mmap, the buffer position is kept """
+    head = buffer[:max_bytes].decode('utf-8', errors='replace')
+    return detect_format_head((line.strip() for line in head.splitlines()), max_chars=max_bytes)
+
+
+def _detect_gui(line: str) -> bool:
+    return "PORT" in line and "TimeStamp" in line
+
+
+def _detect_teraterm(line: str) -> bool:
+    return "Status" in line and "BlockIndex" in line
+
+
+def _detect_mobis(line: str) -> bool:
+    return "RAD RESULT" in line
+
+
+_TERATERM_DISTANCE = re.compile(r"Distance\[cm\]: (\d+|-)")
+_MOBIS_DISTANCE = re.compile(r">> RAD RESULT:( Time Out|([\d.]+))")
+
+
+def extract_gui(line: str):
+    """
+    (PORT 1) : 6a,5,0,18,...,0,0   TimeStamp  :  927646       Distance  :  126
+
+    Lines of exactly this layout are taken apart with one str.split, others
+    (other spacing, no time stamp, ...) go through _extract_gui_fields.
+    """
+    parts = line.split()
+    if len(parts) == 10 and parts[7] == 'Distance' and parts[4] == 'TimeStamp' and parts[0] == '(PORT':
+        distance, timestamp = parts[9], parts[6]
+        if distance.isdigit() and timestamp.isdigit() and parts[1][-1:] == ')':
+            # the 10th field of the payload is the security status code, see _security_status_code
+            fields = parts[3].split(',', 10)
+            if len(fields) < 11:
+                return None
+            try:
+                security_status_code = int(fields[9], 16)
+            except ValueError:
+                return None
+            if distance == '65535':  # ranging failed
+                return parts[1][:-1], security_status_code, FAILED_DISTANCE, int(timestamp)
+            return parts[1][:-1], security_status_code, float(distance), int(timestamp)
+    return _extract_gui_fields(line)
+
+
+def _extract_gui_fields(line: str):
+    # any spacing around the fields, str.find and slicing only
+    # the distance is the last field of a gui line
+    head, sep, distance = line.rpartition('Distance')
+    if not sep:
+        return None
+    distance = distance.lstrip(' \t:')
+    if not distance.isdigit():
+        return None
+
+    port_pos = head.find('PORT')
+    if port_pos < 0:
+        return None
+    device_id = head[port_pos + 4:head.find(')', port_pos)].strip()
+
+    security_status_code = _security_status_code(head)
+    if security_status_code is None:
+        return None
+
+    timestamp = head[head.rfind('TimeStamp') + 9:].strip(' \t:')
+    timestamp = int(timestamp) if timestamp.isdigit() else NO_TIMESTAMP
+
+    if distance == '65535':  # ranging failed
+        return device_id, security_status_code, FAILED_DISTANCE, timestamp
+    return device_id, security_status_code, float(distance), timestamp
+
+
+def _security_status_code(payload: str):
+    # the 10th field of the payload is the security status code, followed by more fields,
+    # None for a truncated or garbled payload which scan_gui does not match either
+    fields = payload.split(',', 10)
+    if len(fields) < 11:
+        return None
+    try:
+        return int(fields[9], 16)
+    except ValueError:
+        return None
+
+
+def extract_teraterm(line: str):
+    """ ... Distance[cm]: 50 ... or Distance[cm]: - if ranging failed """
+    if 'Distance[cm]' not in line:
+        return None
+    match = _TERATERM_DISTANCE.search(line)
+    if match is None:
+        return None
+
+    distance = match.group(1)
+    if distance == '-':
+        return '0', 0, FAILED_DISTANCE, NO_TIMESTAMP
+    return '0', 0, float(distance), NO_TIMESTAMP
+
+
+def extract_mobis(line: str):
+    """ >> RAD RESULT:0.29m or >> RAD RESULT: Time Out, unit changed from m to cm """
+    if 'RAD RESULT' not in line:
+        return None
+    match = _MOBIS_DISTANCE.search(line)
+    if match is None:
+        return None
+
+    distance = match.group(2)
+    if distance is None:  # Time Out
+        return '0', 0, FAILED_DISTANCE, NO_TIMESTAMP
+    return '0', 0, round(float(distance) * 100), NO_TIMESTAMP
+
+
+# Bytes scanners run over a whole (memory-mapped) buffer instead of one line
+# and yield the same (device_id, status, distance, timestamp) tuples as the
+# extractors.
+#
+# Record patterns start with a literal, so the regex engine jumps from record
+# to record, and only use character classes which cannot run past the next
+# field (no lazy '.*?' re-tried at every position). They run with findall over
+# line aligned windows of SCAN_WINDOW_BYTES: no match object per record and at
+# most one window of tuples alive, whatever the buffer size.
+
+SCAN_WINDOW_BYTES = 1024 * 1024
+
+_GUI_RECORD = re.compile(
+    rb"PORT[ \t]*(\d+)\)[ \t]*:[ \t]*(?:[^,\n]*,){9}[ \t]*([0-9A-Fa-f]+)[ \t]*,"
+    rb"[^T\n]*TimeStamp[ \t]*:[ \t]*(\d+)[^D\n]*Distance[ \t]*:[ \t]*(\d+)"
+)
+_TERATERM_RECORD = re.compile(rb"Distance\[cm\]: (\d+|-)")
+_MOBIS_RECORD = re.compile(rb">> RAD RESULT:(?: Time Out|([\d.]+))")
+_NEWLINE = re.compile(rb"\n")
+
+
+def _findall_windows(pattern, buffer):
+    # bytes, bytearray, mmap and memoryview alike, the buffer is never copied
+    size, pos = len(buffer), 0
+    while pos < size:
+        newline = _NEWLINE.search(buffer, min(pos + SCAN_WINDOW_BYTES, size))
+        end = newline.end() if newline is not None else size
+        yield from pattern.findall(buffer, pos, end)
+        pos = end
+
+
+def scan_gui(buffer):
+    ports = {}  # b'1' -> '1', decoded once per device
+    for port, security_status_code, timestamp, distance in _findall_windows(_GUI_RECORD, buffer):
+        device_id = ports.get(port)
+        if device_id is None:
+            device_id = ports[port] = port.decode()
+        if distance == b'65535':  # ranging failed
+            yield device_id, int(security_status_code, 16), FAILED_DISTANCE, int(timestamp)
+        else:
+            yield device_id, int(security_status_code, 16), float(distance), int(timestamp)
+
+
+def scan_teraterm(buffer):
+    for distance in _findall_windows(_TERATERM_RECORD, buffer):
+        yield '0', 0, FAILED_DISTANCE if distance == b'-' else float(distance), NO_TIMESTAMP
+
+
+def scan_mobis(buffer):
+    for distance in _findall_windows(_MOBIS_RECORD, buffer):
+        yield '0', 0, FAILED_DISTANCE if not distance else round(float(distance) * 100), NO_TIMESTAMP
+
+
+_LINE = re.compile(rb"[^\r\n]+")
+
+
+def _scan_lines(extract, buffer):
+    # generic scanner of formats without a dedicated one
+    for match in _LINE.finditer(buffer):
+        sample = extract(match.group().decode('utf-8', errors='replace').strip())
+        if sample is not None:
+            yield sample
+
+
+register_format('gui', _detect_gui, extract_gui, scan_gui, failure='65535')
+register_format('teraterm', _detect_teraterm, extract_teraterm, scan_teraterm, failure='-')
+register_format('mobis', _detect_mobis, extract_mobis, scan_mobis, failure='Time Out')
+
+# END OF FILE
+#---------------------------------------------------------------------------------
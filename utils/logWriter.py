@@ -0,0 +1,272 @@
+# -*- coding:utf-8 -*-
+# !/usr/bin/env python
+#---------------------------------------------------------------------------------
+# Author: Zhang
+#
+# Create Date: 2026/10/18
+# Last Update on: 2026/10/18
+#
+# FILE: logWriter.py
+# Description: Classe LogWriter, log file written by a background thread, with rotation
+#---------------------------------------------------------------------------------
+
+#---------------------------------------------------------------------------------
+# IMPORT REQUIRED PACKAGES HERE
+
+import os
+import time
+import threading
+
+# END OF PACKAGE IMPORT
+#---------------------------------------------------------------------------------
+
+#---------------------------------------------------------------------------------
+# DEFINE CLASS HERE
+
+QUEUE_CHARS = 64 * 1024 * 1024   # text waiting for the disk before write() blocks
+BATCH_CHARS = 256 * 1024         # queued text written at once without waiting for more
+BATCH_LINGER = 0.05              # seconds a small batch waits for more text
+FLUSH_INTERVAL = 1.0             # seconds, written data reaches the OS at least this often
+FSYNC_POLICIES = ('never', 'rotate', 'flush')
+
+
+class LogWriter(object):
+    """
+    Text log file with the write()/flush()/close() of a file object, written
+    by a dedicated thread so a slow disk or network share never holds up the
+    thread reading the sockets.
+
+    write() only queues the text. The thread writes everything queued in one
+    call, waiting up to BATCH_LINGER for more unless BATCH_CHARS are queued.
+    Once max_queue_chars are queued, write() blocks until the thread catches
+    up (backpressure, nothing is dropped) and the time spent so is counted.
+    flush() returns once everything written before it reached the OS.
+
+    With rotate_bytes and/or rotate_seconds the log goes on in a new part
+    '<name>_001.log', '<name>_002.log', ... once the current one is that big
+    or old. Parts are only started for new data and split between writes,
+    which are complete received lines. fsync is 'never', 'rotate' (each
+    finished part and on close) or 'flush' (every flush as well).
+    """
+    def __init__(self, log_file_path: str, rotate_bytes=0, rotate_seconds=0.0, fsync='rotate',
+                 flush_interval=FLUSH_INTERVAL, max_queue_chars=QUEUE_CHARS, encoding='utf-8') -> None:
+        if fsync not in FSYNC_POLICIES:
+            raise ValueError(f"Unsupported fsync policy '{fsync}', expected one of {FSYNC_POLICIES}.")
+        self.log_file_path = log_file_path
+        self.rotate_bytes = rotate_bytes
+        self.rotate_seconds = rotate_seconds
+        self.fsync = fsync
+        self.flush_interval = flush_interval
+        self.max_queue_chars = max_queue_chars
+        self.encoding = encoding
+
+        # shared with the writer thread, under self._cond
+        self._cond = threading.Condition()
+        self._chunks = []
+        self._queued_chars = 0
+        self._first_queued = 0.0   # when the oldest queued chunk arrived
+        self._queued = 0           # chunks queued since opening
+        self._flush_target = 0     # flush once this many chunks are written
+        self._flushed = 0          # chunks written and flushed
+        self._blocked = 0          # writers waiting for room, the batch is written without lingering
+        self._closing = False
+        self._error = None         # exception of the writer thread, raised to the caller
+
+        # writer thread only
+        self._file = None
+        self._part = 0
+        self._part_bytes = 0
+        self._part_opened = 0.0
+        self._dirty = False
+        self._next_flush = 0.0
+
+        self._stats = {'bytes written': 0, 'batches': 0, 'max queue depth': 0, 'blocked writes': 0,
+                       'time blocked (s)': 0.0, 'rotations': 0}
+
+        self._open_part()
+        self._thread = threading.Thread(target=self._run, name=f"LogWriter({os.path.basename(log_file_path)})",
+                                        daemon=True)
+        self._thread.start()
+
+    def __repr__(self) -> str:
+        return f"LogWriter(log_file_path={self.log_file_path}, part={self._part}, closed={self.closed})"
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    @property
+    def closed(self) -> bool:
+        return self._closing
+
+    @property
+    def name(self) -> str:
+        """ path of the part being written """
+        return self._part_path(self._part)
+
+    def write(self, text: str) -> int:
+        """ queue text, blocks only while max_queue_chars are waiting for the disk """
+        n = len(text)
+        if not n:
+            return 0
+        with self._cond:
+            if self._closing:
+                raise ValueError('I/O operation on closed log writer.')
+            self._raise_error()
+            if self._queued_chars and self._queued_chars + n > self.max_queue_chars:
+                start = time.perf_counter()
+                self._blocked += 1
+                self._cond.notify_all()
+                while self._queued_chars and self._queued_chars + n > self.max_queue_chars and self._error is None:
+                    self._cond.wait()
+                self._blocked -= 1
+                self._stats['blocked writes'] += 1
+                self._stats['time blocked (s)'] += time.perf_counter() - start
+                self._raise_error()
+
+            if not self._chunks:
+                self._first_queued = time.monotonic()
+            self._chunks.append(text)
+            self._queued_chars += n
+            self._queued += 1
+            self._stats['max queue depth'] = max(self._stats['max queue depth'], len(self._chunks))
+            # the writer waits for a batch, wake it for the first chunk and once the batch is full
+            if len(self._chunks) == 1 or self._queued_chars >= BATCH_CHARS:
+                self._cond.notify_all()
+        return n
+
+    def flush(self):
+        """ return once everything written so far reached the OS (and the disk with fsync='flush') """
+        with self._cond:
+            self._raise_error()
+            target = self._queued
+            self._flush_target = max(self._flush_target, target)
+            self._cond.notify_all()
+            while self._flushed < target and self._error is None:
+                self._cond.wait()
+            self._raise_error()
+
+    def close(self):
+        """ write what is queued, close the last part and end the thread """
+        with self._cond:
+            if self._closing:
+                return
+            self._closing = True
+            self._cond.notify_all()
+        self._thread.join()
+        self._raise_error()
+
+    def metrics(self) -> dict:
+        with self._cond:
+            return {
+                **self._stats,
+                'time blocked (s)': round(self._stats['time blocked (s)'], 6),
+                'queue depth': len(self._chunks),
+                'queued chars': self._queued_chars,
+                'file': self.name,
+            }
+
+    def _raise_error(self):
+        if self._error is not None:
+            raise OSError(f"Writing {self.name} failed: {self._error}") from self._error
+
+    def _run(self):
+        try:
+            while True:
+                with self._cond:
+                    self._wait_for_work()
+                    batch, self._chunks = self._chunks, []
+                    self._queued_chars = 0
+                    taken = self._queued
+                    flush = self._flush_target > self._flushed or self._closing
+                    closing = self._closing
+                    self._cond.notify_all()  # room for blocked writers
+
+                if batch:
+                    self._write(''.join(batch))
+                if self._dirty and (flush or not self.flush_interval or time.monotonic() >= self._next_flush):
+                    self._flush_part(self.fsync == 'flush')
+                if not self._dirty:
+                    with self._cond:
+                        self._flushed = taken
+                        self._cond.notify_all()
+                if closing:
+                    break
+            self._close_part()
+        except Exception as e:  # disk full, share gone, ... raised by the next call of the capture thread
+            with self._cond:
+                self._error = e
+                self._cond.notify_all()
+            if self._file is not None:
+                try:
+                    self._file.close()
+                except OSError:
+                    pass
+
+    def _wait_for_work(self):
+        # until a batch is full or old enough, a writer waits for room, a flush or close is asked for,
+        # or a flush is due
+        while True:
+            if self._closing or self._flush_target > self._flushed:
+                return
+            now = time.monotonic()
+            if self._chunks:
+                timeout = self._first_queued + BATCH_LINGER - now
+                if self._queued_chars >= BATCH_CHARS or self._blocked or timeout <= 0:
+                    return
+            elif self._dirty:
+                timeout = self._next_flush - now
+                if timeout <= 0:
+                    return
+            else:
+                timeout = None
+            self._cond.wait(timeout)
+
+    def _write(self, text: str):
+        if os.linesep != '\n':  # same line ends as a file opened with open(path, 'w')
+            text = text.replace('\n', os.linesep)
+        data = text.encode(self.encoding, errors='replace')
+        if self._part_bytes and (
+                (self.rotate_bytes and self._part_bytes + len(data) > self.rotate_bytes)
+                or (self.rotate_seconds and time.monotonic() - self._part_opened >= self.rotate_seconds)):
+            self._close_part()
+            self._part += 1
+            self._open_part()
+            self._stats['rotations'] += 1
+        self._file.write(data)
+        self._part_bytes += len(data)
+        self._stats['bytes written'] += len(data)
+        self._stats['batches'] += 1
+        if not self._dirty:
+            self._dirty = True
+            self._next_flush = time.monotonic() + self.flush_interval
+
+    def _flush_part(self, sync: bool):
+        self._file.flush()
+        if sync:
+            os.fsync(self._file.fileno())
+        self._dirty = False
+
+    def _part_path(self, part: int) -> str:
+        if not part:
+            return self.log_file_path
+        base, ext = os.path.splitext(self.log_file_path)
+        return f"{base}_{part:03d}{ext}"
+
+    def _open_part(self):
+        self._file = open(self._part_path(self._part), 'wb')
+        self._part_bytes = 0
+        self._part_opened = time.monotonic()
+
+    def _close_part(self):
+        self._flush_part(self.fsync != 'never')
+        self._file.close()
+        self._file = None
+
+# END OF CLASS DEFINITION
+#---------------------------------------------------------------------------------
+
+# END OF FILE
+#---------------------------------------------------------------------------------
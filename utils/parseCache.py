@@ -0,0 +1,129 @@
+# -*- coding:utf-8 -*-
+# !/usr/bin/env python
+#---------------------------------------------------------------------------------
+# Author: Zhang
+#
+# Create Date: 2026/10/18
+# Last Update on: 2026/10/18
+#
+# FILE: parseCache.py
+# Description: Classe ParseCache is defined here
+#---------------------------------------------------------------------------------
+
+#---------------------------------------------------------------------------------
+# IMPORT REQUIRED PACKAGES HERE
+
+import os
+import hashlib
+
+import numpy as np
+
+# END OF PACKAGE IMPORT
+#---------------------------------------------------------------------------------
+
+#---------------------------------------------------------------------------------
+# DEFINE CLASS HERE
+
+# bump whenever extraction changes what ends up in the sample columns,
+# every existing cache entry is invalidated by that
+PARSER_VERSION = 2
+
+
+class ParseCache(object):
+    """
+    On-disk cache of the parsed (not yet sliced) per-device distance and
+    time stamp columns.
+
+    One .npz sidecar per log file, named after the hash of its absolute path.
+    An entry records path, size, mtime, detected format and parser version and
+    is dropped as soon as the log file or the parser changes. Least recently
+    used entries are evicted once the cache grows beyond max_bytes.
+    """
+    def __init__(self, cache_dir: str, max_bytes=256 * 1024 * 1024) -> None:
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+
+    def __repr__(self) -> str:
+        return f"ParseCache(cache_dir={self.cache_dir}, max_bytes={self.max_bytes})"
+
+    def load(self, log_file_path: str):
+        """ return (log_file_type, distance columns, time stamp columns) or None on a miss """
+        entry_path = self._entry_path(log_file_path)
+        try:
+            with np.load(entry_path, allow_pickle=False) as entry:
+                if self._identity(log_file_path) != entry['identity'].tolist():
+                    raise KeyError('stale entry')  # log file or parser changed
+                log_file_type = str(entry['format'])
+                devices = [str(device_id) for device_id in entry['devices']]
+                distances = {device_id: entry[f"distance_{idx}"] for idx, device_id in enumerate(devices)}
+                timestamps = {device_id: entry[f"timestamp_{idx}"] for idx, device_id in enumerate(devices)}
+        except FileNotFoundError:
+            return None
+        except (KeyError, ValueError, OSError):
+            self._remove(entry_path)  # invalid or corrupted entry
+            return None
+
+        os.utime(entry_path)  # mark as recently used
+        return log_file_type, distances, timestamps
+
+    def store(self, log_file_path: str, log_file_type: str, distances: dict, timestamps: dict):
+        """ write the whole-file columns of a log file and evict old entries """
+        os.makedirs(self.cache_dir, exist_ok=True)
+        entry_path = self._entry_path(log_file_path)
+        arrays = {}
+        for idx, device_id in enumerate(distances.keys()):
+            arrays[f"distance_{idx}"] = np.asarray(distances[device_id], dtype=np.float32)
+            arrays[f"timestamp_{idx}"] = np.asarray(timestamps[device_id], dtype=np.int64)
+
+        # write to a temporary file first, workers may read the entry meanwhile
+        tmp_path = f"{entry_path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'wb') as f:
+            np.savez(
+                f,
+                identity=np.array(self._identity(log_file_path)),
+                format=np.array(log_file_type),
+                devices=np.array(list(distances.keys()), dtype=str),
+                **arrays,
+            )
+        os.replace(tmp_path, entry_path)
+        self._evict()
+
+    def _identity(self, log_file_path: str) -> list:
+        stat = os.stat(log_file_path)
+        return [os.path.abspath(log_file_path), str(stat.st_size), str(stat.st_mtime_ns), str(PARSER_VERSION)]
+
+    def _entry_path(self, log_file_path: str) -> str:
+        name = hashlib.sha1(os.path.abspath(log_file_path).encode('utf-8')).hexdigest()
+        return os.path.join(self.cache_dir, f"{name}.npz")
+
+    def _evict(self):
+        # remove least recently used entries until the cache fits in max_bytes
+        entries = []
+        for name in os.listdir(self.cache_dir):
+            if not name.endswith('.npz'):
+                continue
+            try:
+                stat = os.stat(os.path.join(self.cache_dir, name))
+            except FileNotFoundError:  # removed by another process
+                continue
+            entries.append((stat.st_mtime, stat.st_size, name))
+
+        total = sum(size for _, size, _ in entries)
+        for _, size, name in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            self._remove(os.path.join(self.cache_dir, name))
+            total -= size
+
+    @staticmethod
+    def _remove(path: str):
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+
+# END OF CLASS DEFINITION
+#---------------------------------------------------------------------------------
+
+# END OF FILE
+#---------------------------------------------------------------------------------
@@ -0,0 +1,186 @@
+# -*- coding:utf-8 -*-
+# !/usr/bin/env python
+#---------------------------------------------------------------------------------
+# Author: Zhang
+#
+# Create Date: 2026/10/18
+# Last Update on: 2026/10/18
+#
+# FILE: resultWriter.py
+# Description: result writers (xlsx/csv/parquet/jsonl) used by LogAnalyst
+#---------------------------------------------------------------------------------
+
+#---------------------------------------------------------------------------------
+# IMPORT REQUIRED PACKAGES HERE
+
+import csv
+import json
+import math
+
+from itertools import zip_longest
+
+# END OF PACKAGE IMPORT
+#---------------------------------------------------------------------------------
+
+#---------------------------------------------------------------------------------
+# DEFINE FUNCTIONS HERE
+
+# Every writer takes (save_file_path, analysis_results, distances, windowed_results)
+# with the attributes of the same name of LogAnalyst. Samples are streamed to the
+# file row by row (batch by batch for parquet), no padded table is built.
+#
+# Layout per device is the one of the former Excel sheets: ranging results next
+# to the metric/value pairs, plus a leading 'Device' column for flat formats.
+#   xlsx   : sheet device@port<N> and windows@port<N> for per-second statistics
+#   csv    : one file, per-second statistics in <name>_windows.csv
+#   jsonl  : one JSON object per sample, a 'metrics' and 'window' object per device,
+#            failed ranging written as null
+#   parquet: one file, per-second statistics in <name>_windows.parquet, needs pyarrow
+
+SAMPLE_HEADER = ['Ranging result', 'Metric', 'Value']
+PARQUET_BATCH_ROWS = 65536
+
+
+def iter_rows(results: dict, dists):
+    """ yield (ranging result, metric, value) rows of one device """
+    dists = map(float, dists)  # numpy float32 to float, one at a time
+    return zip_longest(dists, results.keys(), results.values())
+
+
+def write_xlsx(save_file_path: str, analysis_results: dict, distances: dict, windowed_results: dict):
+    """ constant-memory Excel writer, rows go straight to the file """
+    from openpyxl import Workbook
+
+    workbook = Workbook(write_only=True)
+    for device_id, results in analysis_results.items():
+        sheet = workbook.create_sheet(f"device@port{device_id}")
+        sheet.append(SAMPLE_HEADER)
+        for row in iter_rows(results, distances[device_id]):
+            sheet.append([_excel_cell(cell) for cell in row])
+
+        if device_id in windowed_results:
+            windows = windowed_results[device_id]
+            sheet = workbook.create_sheet(f"windows@port{device_id}")
+            sheet.append(list(windows.keys()))
+            for row in zip(*(w.tolist() for w in windows.values())):
+                sheet.append([_excel_cell(cell) for cell in row])
+    workbook.save(save_file_path)
+
+
+def write_csv(save_file_path: str, analysis_results: dict, distances: dict, windowed_results: dict):
+    with open(save_file_path, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f)
+        writer.writerow(['Device'] + SAMPLE_HEADER)
+        for device_id, results in analysis_results.items():
+            writer.writerows((device_id,) + row for row in iter_rows(results, distances[device_id]))
+
+    if not windowed_results:
+        return
+    windows_file_path = f"{save_file_path.rsplit('.csv', 1)[0]}_windows.csv"
+    with open(windows_file_path, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f)
+        header_written = False
+        for device_id, windows in windowed_results.items():
+            if not header_written:
+                writer.writerow(['Device'] + list(windows.keys()))
+                header_written = True
+            writer.writerows((device_id,) + tuple(row) for row in zip(*(w.tolist() for w in windows.values())))
+
+
+def write_jsonl(save_file_path: str, analysis_results: dict, distances: dict, windowed_results: dict):
+    with open(save_file_path, 'w', encoding='utf-8') as f:
+        for device_id, results in analysis_results.items():
+            f.write(json.dumps({'device': device_id, 'metrics': _json_metrics(results)}) + '\n')
+            for dist in map(float, distances[device_id]):
+                f.write(f'{{"device": "{device_id}", "ranging result": {_json_number(dist)}}}\n')
+
+            windows = windowed_results.get(device_id, {})
+            for row in zip(*(w.tolist() for w in windows.values())):
+                window = {key: _json_value(value) for key, value in zip(windows.keys(), row)}
+                f.write(json.dumps({'device': device_id, 'window': window}) + '\n')
+
+
+def write_parquet(save_file_path: str, analysis_results: dict, distances: dict, windowed_results: dict):
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError:
+        raise ImportError("Output format 'parquet' requires pyarrow (pip install pyarrow).")
+
+    schema = pa.schema([
+        ('Device', pa.string()),
+        ('Ranging result', pa.float32()),
+        ('Metric', pa.string()),
+        ('Value', pa.string()),
+    ])
+    with pq.ParquetWriter(save_file_path, schema) as writer:
+        for device_id, results in analysis_results.items():
+            dists = distances[device_id]
+            metrics = [str(key) for key in results.keys()]
+            values = [str(value) for value in results.values()]
+
+            # write the float32 column in slices, without converting it to a list
+            for start in range(0, max(len(dists), len(metrics)), PARQUET_BATCH_ROWS):
+                stop = start + PARQUET_BATCH_ROWS
+                column = pa.array(dists[start:stop], pa.float32())
+                batch_metrics, batch_values = metrics[start:stop], values[start:stop]
+
+                rows = max(len(column), len(batch_metrics))
+                if len(column) < rows:
+                    column = pa.concat_arrays([column, pa.nulls(rows - len(column), pa.float32())])
+                padding = [None] * (rows - len(batch_metrics))
+                writer.write_batch(pa.record_batch([
+                    pa.array([device_id] * rows, pa.string()),
+                    column,
+                    pa.array(batch_metrics + padding, pa.string()),
+                    pa.array(batch_values + padding, pa.string()),
+                ], schema=schema))
+
+    if not windowed_results:
+        return
+    windows_file_path = f"{save_file_path.rsplit('.parquet', 1)[0]}_windows.parquet"
+    writer = None
+    try:
+        for device_id, windows in windowed_results.items():
+            # numpy columns go in as they are, one batch per device, same dtypes for every device
+            columns = [pa.array(w) for w in windows.values()]
+            batch = pa.record_batch([pa.array([device_id] * len(columns[0]), pa.string())] + columns,
+                                    names=['Device'] + list(windows.keys()))
+            if writer is None:
+                writer = pq.ParquetWriter(windows_file_path, batch.schema)
+            writer.write_batch(batch)
+    finally:
+        if writer is not None:
+            writer.close()
+
+
+def _excel_cell(value):
+    # keep what the former pandas writer put into cells: 'inf' and empty for nan
+    if isinstance(value, float) and not math.isfinite(value):
+        return None if math.isnan(value) else str(value)
+    return value
+
+
+def _json_number(value: float) -> str:
+    return 'null' if not math.isfinite(value) else repr(value)
+
+
+def _json_value(value):
+    if isinstance(value, float) and not math.isfinite(value):
+        return None
+    return value
+
+
+def _json_metrics(results: dict) -> dict:
+    return {key: _json_value(value) for key, value in results.items()}
+
+
+WRITERS = {
+    'xlsx': write_xlsx,
+    'csv': write_csv,
+    'parquet': write_parquet,
+    'jsonl': write_jsonl,
+}
+
+# END OF FILE
+#---------------------------------------------------------------------------------
@@ -0,0 +1,157 @@
+# -*- coding:utf-8 -*-
+# !/usr/bin/env python
+#---------------------------------------------------------------------------------
+# Author: Zhang
+#
+# Create Date: 2026/10/18
+# Last Update on: 2026/10/18
+#
+# FILE: runningStats.py
+# Description: Classes for O(1) incremental statistics are defined here
+#---------------------------------------------------------------------------------
+
+#---------------------------------------------------------------------------------
+# IMPORT REQUIRED PACKAGES HERE
+
+import os
+import sys
+import math
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from utils.distanceHistogram import DistanceHistogram
+
+# END OF PACKAGE IMPORT
+#---------------------------------------------------------------------------------
+
+#---------------------------------------------------------------------------------
+# DEFINE CLASS HERE
+
+class P2Quantile(object):
+    """
+    Streaming quantile estimate with the P-square algorithm (Jain & Chlamtac),
+    five markers and O(1) work per sample whatever the number of samples.
+    Exact while fewer than five samples have been seen.
+    """
+    def __init__(self, p=0.5) -> None:
+        self.p = p
+        self._heights = []   # marker heights, the first five samples until initialized
+        self._positions = None
+        self._desired = None
+        self._increments = (0, p / 2, p, (1 + p) / 2, 1)
+
+    def add(self, x: float):
+        heights = self._heights
+        if self._positions is None:
+            heights.append(x)
+            if len(heights) == 5:
+                heights.sort()
+                p = self.p
+                self._positions = [0, 1, 2, 3, 4]
+                self._desired = [0, 2 * p, 4 * p, 2 + 2 * p, 4]
+            return
+
+        # find the cell of x and stretch the extreme markers if needed
+        if x < heights[0]:
+            heights[0] = x
+            cell = 0
+        elif x >= heights[4]:
+            heights[4] = x
+            cell = 3
+        else:
+            cell = 0
+            while x >= heights[cell + 1]:
+                cell += 1
+
+        positions, desired = self._positions, self._desired
+        for i in range(cell + 1, 5):
+            positions[i] += 1
+        for i in range(5):
+            desired[i] += self._increments[i]
+
+        # move the three middle markers towards their desired positions
+        for i in (1, 2, 3):
+            d = desired[i] - positions[i]
+            if (d >= 1 and positions[i + 1] - positions[i] > 1) or (d <= -1 and positions[i - 1] - positions[i] < -1):
+                d = 1 if d > 0 else -1
+                height = self._parabolic(i, d)
+                if not heights[i - 1] < height < heights[i + 1]:
+                    height = heights[i] + d * (heights[i + d] - heights[i]) / (positions[i + d] - positions[i])
+                heights[i] = height
+                positions[i] += d
+
+    def _parabolic(self, i: int, d: int) -> float:
+        q, n = self._heights, self._positions
+        return q[i] + d / (n[i + 1] - n[i - 1]) * (
+            (n[i] - n[i - 1] + d) * (q[i + 1] - q[i]) / (n[i + 1] - n[i])
+            + (n[i + 1] - n[i] - d) * (q[i] - q[i - 1]) / (n[i] - n[i - 1])
+        )
+
+    @property
+    def value(self) -> float:
+        if self._positions is not None:
+            return self._heights[2]
+        if not self._heights:
+            return float('nan')
+        # exact quantile of the few samples seen so far
+        heights = sorted(self._heights)
+        rank = self.p * (len(heights) - 1)
+        lower = math.floor(rank)
+        upper = min(lower + 1, len(heights) - 1)
+        return heights[lower] + (heights[upper] - heights[lower]) * (rank - lower)
+
+
+class RunningStats(object):
+    """
+    Incremental ranging statistics of one device: Welford mean/stdev, running
+    min/max, success/fail counts, a P-square median estimate and a histogram
+    for percentiles.
+    float('inf') counts as a failed ranging, like in LogAnalyst.
+    """
+    def __init__(self) -> None:
+        self.success_count = 0
+        self.fail_count = 0
+        self.min = float('inf')
+        self.max = float('-inf')
+        self.mean = 0.0
+        self._m2 = 0.0
+        self._median = P2Quantile(0.5)
+        self.histogram = DistanceHistogram()
+
+    def __repr__(self) -> str:
+        return f"RunningStats(success={self.success_count}, fail={self.fail_count}, mean={self.mean:.2f})"
+
+    def add(self, distance: float):
+        self.histogram.add(distance)
+        if math.isinf(distance):
+            self.fail_count += 1
+            return
+
+        self.success_count += 1
+        delta = distance - self.mean
+        self.mean += delta / self.success_count
+        self._m2 += delta * (distance - self.mean)
+
+        self.min = min(self.min, distance)
+        self.max = max(self.max, distance)
+        self._median.add(distance)
+
+    @property
+    def count(self) -> int:
+        return self.success_count + self.fail_count
+
+    @property
+    def median(self) -> float:
+        return self._median.value
+
+    @property
+    def stdev(self) -> float:
+        # sample standard deviation, same as statistics.stdev
+        if self.success_count < 2:
+            return float('nan')
+        return math.sqrt(self._m2 / (self.success_count - 1))
+
+# END OF CLASS DEFINITION
+#---------------------------------------------------------------------------------
+
+# END OF FILE
+#---------------------------------------------------------------------------------
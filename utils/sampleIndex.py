@@ -0,0 +1,236 @@
+# -*- coding:utf-8 -*-
+# !/usr/bin/env python
+#---------------------------------------------------------------------------------
+# Author: Zhang
+#
+# Create Date: 2026/10/18
+# Last Update on: 2026/10/18
+#
+# FILE: sampleIndex.py
+# Description: Classe SampleIndex, SQLite index of every parsed sample of the logs
+#---------------------------------------------------------------------------------
+
+#---------------------------------------------------------------------------------
+# IMPORT REQUIRED PACKAGES HERE
+
+import os
+import math
+import mmap
+import sqlite3
+
+from itertools import chain
+from collections import defaultdict
+
+import utils.logFormat as logFormat
+import utils.binaryCapture as binaryCapture
+import utils.compressedLog as compressedLog
+
+# END OF PACKAGE IMPORT
+#---------------------------------------------------------------------------------
+
+#---------------------------------------------------------------------------------
+# DEFINE CLASS HERE
+
+# bump whenever extraction changes what ends up in the samples table,
+# every indexed file is re-parsed by the next update then
+INDEX_VERSION = 1
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS files (
+    id INTEGER PRIMARY KEY,
+    path TEXT NOT NULL UNIQUE,
+    size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    version INTEGER NOT NULL,
+    format TEXT,
+    physical_distance REAL
+);
+CREATE TABLE IF NOT EXISTS streams (
+    file_id INTEGER NOT NULL REFERENCES files(id) ON DELETE CASCADE,
+    device TEXT NOT NULL,
+    samples INTEGER NOT NULL,
+    PRIMARY KEY (file_id, device)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS samples (
+    file_id INTEGER NOT NULL REFERENCES files(id) ON DELETE CASCADE,
+    device TEXT NOT NULL,
+    seq INTEGER NOT NULL,
+    timestamp INTEGER,
+    distance REAL,
+    status INTEGER NOT NULL,
+    PRIMARY KEY (file_id, device, seq)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS files_physical_distance ON files (physical_distance);
+CREATE INDEX IF NOT EXISTS streams_device ON streams (device, file_id);
+"""
+
+
+class SampleIndex(object):
+    """
+    SQLite database of every sample of every log file, whole files, no window:
+    file, device, sequence (per device), time stamp, distance, security status
+    and the physical distance of the file.
+
+    A failed ranging is stored with a NULL distance, NULL time stamps stand for
+    logs without them. Files are re-indexed only when their size, mtime or the
+    index version changed, so an update over an unchanged archive only stats
+    the files. Queries apply the warmup/analysis window in SQL, their results
+    match what the analysis of each file reports.
+    """
+    def __init__(self, db_path: str) -> None:
+        self.db_path = db_path
+        os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+        self._conn = sqlite3.connect(db_path)
+        self._conn.execute('PRAGMA foreign_keys = ON')
+        self._conn.execute('PRAGMA journal_mode = WAL')
+        self._conn.execute('PRAGMA synchronous = NORMAL')
+        self._conn.executescript(_SCHEMA)
+
+    def __repr__(self) -> str:
+        return f"SampleIndex(db_path={self.db_path})"
+
+    def close(self):
+        self._conn.close()
+
+    def add_file(self, log_file_path: str, physical_distance: float) -> bool:
+        """ index one log file or binary capture, return False if it is indexed and unchanged """
+        path = os.path.abspath(log_file_path)
+        stat = os.stat(path)
+        phy = None if math.isinf(physical_distance) else physical_distance
+        row = self._conn.execute(
+            'SELECT id, size, mtime_ns, version, physical_distance FROM files WHERE path = ?', (path,)
+        ).fetchone()
+        if row is not None and row[1:4] == (stat.st_size, stat.st_mtime_ns, INDEX_VERSION):
+            if row[4] != phy:  # physical distance given differently, nothing to re-parse
+                with self._conn:
+                    self._conn.execute('UPDATE files SET physical_distance = ? WHERE id = ?', (phy, row[0]))
+            return False
+
+        # one transaction per file, an interrupted update never leaves half a file behind
+        with self._conn:
+            self._conn.execute('DELETE FROM files WHERE path = ?', (path,))
+            file_id = self._conn.execute(
+                'INSERT INTO files (path, size, mtime_ns, version, physical_distance) VALUES (?, ?, ?, ?, ?)',
+                (path, stat.st_size, stat.st_mtime_ns, INDEX_VERSION, phy),
+            ).lastrowid
+
+            counts = defaultdict(int)  # samples per device, the next sequence number
+
+            def rows(samples):
+                for device_id, status, distance, timestamp in samples:
+                    seq = counts[device_id]
+                    counts[device_id] = seq + 1
+                    yield (file_id, device_id, seq, None if timestamp == logFormat.NO_TIMESTAMP else timestamp,
+                           None if math.isinf(distance) else distance, status)
+
+            log_file_type = self._scan(path, lambda samples: self._conn.executemany(
+                'INSERT INTO samples VALUES (?, ?, ?, ?, ?, ?)', rows(samples)))
+
+            self._conn.execute('UPDATE files SET format = ? WHERE id = ?', (log_file_type, file_id))
+            self._conn.executemany('INSERT INTO streams VALUES (?, ?, ?)',
+                                   [(file_id, device_id, n) for device_id, n in counts.items()])
+        return True
+
+    def prune(self, log_file_paths: list) -> int:
+        """ forget indexed files which are not in log_file_paths any more, return how many """
+        keep = {os.path.abspath(path) for path in log_file_paths}
+        gone = [(file_id,) for file_id, path in self._conn.execute('SELECT id, path FROM files') if path not in keep]
+        with self._conn:
+            self._conn.executemany('DELETE FROM files WHERE id = ?', gone)
+        return len(gone)
+
+    @staticmethod
+    def _scan(path: str, insert) -> str:
+        # feed (device_id, status, distance, timestamp) of the whole file to insert, return the format
+        if binaryCapture.is_capture_file(path):
+            header, records = binaryCapture.read_capture(path)
+            insert(zip(records['device'].astype(str).tolist(), records['status'].tolist(),
+                       records['distance'].astype(float).tolist(), records['timestamp'].tolist()))
+            return header['log_format']
+
+        if compressedLog.is_compressed(path):
+            chunks = compressedLog.iter_chunks(path)
+            head = next(chunks, b'')
+            log_file_type = logFormat.detect_format_bytes(head)
+            if log_file_type is not None:
+                scan = logFormat.SCANNERS[log_file_type]
+                insert(chain(scan(head), chain.from_iterable(map(scan, chunks))))
+            chunks.close()
+            return log_file_type
+
+        with open(path, 'rb') as f:
+            if os.fstat(f.fileno()).st_size == 0:  # empty log file
+                return None
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+                log_file_type = logFormat.detect_format_bytes(buffer)
+                if log_file_type is None:  # unsupported, indexed without samples
+                    return None
+                samples = logFormat.SCANNERS[log_file_type](buffer)
+                insert(samples)
+                samples.close()  # release the buffer before unmapping
+        return log_file_type
+
+    def query(self, warmup_samples: int, analysis_samples: int, device_id=None, physical_distance=float('inf'),
+              by_file=False) -> list:
+        """
+        Statistics per physical distance and device over all indexed files, or
+        per file with by_file, of the samples within the warmup/analysis window.
+        Optionally only of one device and/or one physical distance.
+        Return a list of dicts, stdev of less than two valid samples is None.
+        """
+        conditions, params = [], {'w': warmup_samples, 'n': analysis_samples}
+        if device_id is not None:
+            conditions.append('st.device = :device')
+            params['device'] = str(device_id)
+        if not math.isinf(physical_distance):
+            conditions.append('f.physical_distance = :phy')
+            params['phy'] = physical_distance
+        where = ''.join(f" AND {condition}" for condition in conditions)
+        keys = 'f.physical_distance, st.device' + (', f.path' if by_file else '')
+
+        # same window as LogAnalyst: short runs are kept whole, else warmup samples are skipped,
+        # and results with a non-zero security status count as failed
+        sql = f"""
+            SELECT f.physical_distance, st.device, {'f.path' if by_file else 'NULL'},
+                   COUNT(DISTINCT f.id), COUNT(*), COUNT(s.valid),
+                   SUM(s.valid), SUM(s.valid * s.valid), MIN(s.valid), MAX(s.valid)
+            FROM files f
+            JOIN streams st ON st.file_id = f.id
+            JOIN (SELECT *, CASE WHEN status = 0 THEN distance END AS valid FROM samples) s
+                ON s.file_id = st.file_id AND s.device = st.device
+            WHERE (st.samples <= :w OR (s.seq >= :w AND s.seq < :w + :n)){where}
+            GROUP BY {keys}
+            ORDER BY {keys}
+        """
+        results = []
+        for phy, device, path, files, total, valid, total_dist, total_sq, min_dist, max_dist in \
+                self._conn.execute(sql, params):
+            mean = total_dist / valid if valid else None
+            stdev = None
+            if valid > 1:
+                stdev = math.sqrt(max(total_sq - total_dist * total_dist / valid, 0.0) / (valid - 1))
+            results.append({
+                'physical distance (cm)': phy,
+                'device': device,
+                'file': None if path is None else os.path.basename(path),
+                'files': files,
+                'samples': total,
+                'success count': valid,
+                'success rate': valid / total,
+                'average distance (cm)': mean,
+                'std. deviation': stdev,
+                'min distance (cm)': min_dist,
+                'max distance (cm)': max_dist,
+            })
+        return results
+
+    def summary(self) -> dict:
+        files, formats = self._conn.execute('SELECT COUNT(*), COUNT(format) FROM files').fetchone()
+        samples, = self._conn.execute('SELECT COALESCE(SUM(samples), 0) FROM streams').fetchone()
+        return {'files': files, 'parsed files': formats, 'samples': samples}
+
+# END OF CLASS DEFINITION
+#---------------------------------------------------------------------------------
+
+# END OF FILE
+#---------------------------------------------------------------------------------
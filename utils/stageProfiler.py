@@ -0,0 +1,112 @@
+# -*- coding:utf-8 -*-
+# !/usr/bin/env python
+#---------------------------------------------------------------------------------
+# Author: Zhang
+#
+# Create Date: 2026/10/18
+# Last Update on: 2026/10/18
+#
+# FILE: stageProfiler.py
+# Description: Classe StageProfiler, wall time/peak memory per stage and counters
+#---------------------------------------------------------------------------------
+
+#---------------------------------------------------------------------------------
+# IMPORT REQUIRED PACKAGES HERE
+
+import time
+import tracemalloc
+
+from contextlib import contextmanager
+from collections import defaultdict
+
+# END OF PACKAGE IMPORT
+#---------------------------------------------------------------------------------
+
+#---------------------------------------------------------------------------------
+# DEFINE CLASS HERE
+
+# Stages recorded by LogAnalyst, in pipeline order:
+#   read     : reading lines into memory (read_log_file)
+#   detect   : guessing the log format
+#   extract  : extracting samples, includes reading for the stream/mmap readers
+#   load     : loading columns from the parse cache or a binary capture
+#   cache    : storing parsed columns into the parse cache
+#   window   : warmup/analysis window slicing
+#   analysis : statistics of all devices
+#   save     : writing the results
+STAGES = ('read', 'detect', 'extract', 'load', 'cache', 'window', 'analysis', 'save')
+
+
+class StageProfiler(object):
+    """
+    Wall time and peak memory per stage plus named counters.
+
+    Peak memory is only recorded while tracemalloc is tracing, start it before
+    the profiled run (it slows Python code down noticeably). Stages must not
+    be nested, a stage entered several times adds up.
+    """
+    def __init__(self) -> None:
+        self.seconds = defaultdict(float)
+        self.peak_bytes = {}
+        self.calls = defaultdict(int)
+        self.counters = defaultdict(int)
+
+    def __repr__(self) -> str:
+        return f"StageProfiler(stages={list(self.seconds.keys())})"
+
+    @contextmanager
+    def stage(self, name: str):
+        tracing = tracemalloc.is_tracing()
+        if tracing:
+            tracemalloc.reset_peak()
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.seconds[name] += time.perf_counter() - start
+            self.calls[name] += 1
+            if tracing:
+                self.peak_bytes[name] = max(self.peak_bytes.get(name, 0), tracemalloc.get_traced_memory()[1])
+
+    def count(self, name: str, n=1):
+        self.counters[name] += n
+
+    def report(self) -> dict:
+        """ JSON-ready dict of stages (in pipeline order) and counters """
+        order = [s for s in STAGES if s in self.seconds] + [s for s in self.seconds if s not in STAGES]
+        return {
+            'stages': {
+                name: {
+                    'seconds': round(self.seconds[name], 6),
+                    'calls': self.calls[name],
+                    'peak bytes': self.peak_bytes.get(name),
+                }
+                for name in order
+            },
+            'counters': dict(self.counters),
+        }
+
+# END OF CLASS DEFINITION
+#---------------------------------------------------------------------------------
+
+#---------------------------------------------------------------------------------
+# DEFINE FUNCTIONS HERE
+
+def merge_reports(reports: list) -> dict:
+    """ aggregate StageProfiler reports: times, calls and counters add up, peaks take the maximum """
+    stages, counters = {}, defaultdict(int)
+    for report in reports:
+        for name, stage in report['stages'].items():
+            total = stages.setdefault(name, {'seconds': 0.0, 'calls': 0, 'peak bytes': None})
+            total['seconds'] = round(total['seconds'] + stage['seconds'], 6)
+            total['calls'] += stage['calls']
+            if stage['peak bytes'] is not None:
+                total['peak bytes'] = max(total['peak bytes'] or 0, stage['peak bytes'])
+        for name, value in report['counters'].items():
+            counters[name] += value
+
+    order = [s for s in STAGES if s in stages] + [s for s in stages if s not in STAGES]
+    return {'stages': {name: stages[name] for name in order}, 'counters': dict(counters)}
+
+# END OF FILE
+#---------------------------------------------------------------------------------
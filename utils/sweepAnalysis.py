@@ -0,0 +1,164 @@
+# -*- coding:utf-8 -*-
+# !/usr/bin/env python
+#---------------------------------------------------------------------------------
+# Author: Zhang
+#
+# Create Date: 2026/10/18
+# Last Update on: 2026/10/18
+#
+# FILE: sweepAnalysis.py
+# Description: Classe SweepDataset, cross-file calibration over a distance sweep
+#---------------------------------------------------------------------------------
+
+#---------------------------------------------------------------------------------
+# IMPORT REQUIRED PACKAGES HERE
+
+import numpy as np
+import pandas as pd
+
+# END OF PACKAGE IMPORT
+#---------------------------------------------------------------------------------
+
+#---------------------------------------------------------------------------------
+# DEFINE CLASS HERE
+
+class SweepDataset(object):
+    """
+    Samples of every log file of a distance sweep in one columnar table:
+    file, physical distance (cm), device, distance (cm, inf if failed), valid.
+
+    Statistics per device and physical distance are pandas group-bys over the
+    whole table, and the measured-vs-physical line of every device is fitted
+    in closed form from grouped sums, no per-file loop after loading.
+    """
+    def __init__(self) -> None:
+        self._parts = []  # (file, physical distance, device, float32 distances) until frozen
+        self.samples = None
+
+    def __repr__(self) -> str:
+        return f"SweepDataset(files={len(self.files())}, samples={0 if self.samples is None else len(self.samples)})"
+
+    def add(self, filename: str, physical_distance: float, distances: dict):
+        """ add the windowed distances {device_id: column} of one log file """
+        for device_id, dists in distances.items():
+            self._parts.append((filename, physical_distance, device_id, np.asarray(dists, dtype=np.float32)))
+        self.samples = None
+
+    def freeze(self) -> pd.DataFrame:
+        """ concatenate all added columns into the sample table, once """
+        if self.samples is None:
+            sizes = [dists.size for _, _, _, dists in self._parts]
+            distance = np.concatenate([dists for _, _, _, dists in self._parts]) if self._parts else np.empty(0, np.float32)
+            self.samples = pd.DataFrame({
+                'file': pd.Categorical(np.repeat([part[0] for part in self._parts], sizes)),
+                'physical distance (cm)': np.repeat([part[1] for part in self._parts], sizes).astype(np.float64),
+                'device': pd.Categorical(np.repeat([part[2] for part in self._parts], sizes)),
+                'distance (cm)': distance,
+                'valid': np.isfinite(distance),
+            })
+        return self.samples
+
+    def files(self) -> list:
+        return sorted({part[0] for part in self._parts})
+
+    def distance_statistics(self) -> pd.DataFrame:
+        """ one row per device and physical distance, all files of that distance together """
+        samples = self.freeze()
+        valid = samples[samples['valid']].astype({'distance (cm)': np.float64})
+        keys = ['device', 'physical distance (cm)']
+
+        counts = samples.groupby(keys, observed=True).agg(
+            files=('file', 'nunique'), samples=('valid', 'size'), successes=('valid', 'sum'),
+        )
+        stats = valid.groupby(keys, observed=True)['distance (cm)'].agg(['mean', 'median', 'std', 'min', 'max'])
+        table = counts.join(stats).reset_index()
+
+        table['success rate'] = (table['successes'] / table['samples']).round(4)
+        table['bias (cm)'] = table['mean'] - table['physical distance (cm)']
+        table = table.rename(columns={
+            'mean': 'average distance (cm)', 'median': 'median distance (cm)', 'std': 'std. deviation',
+            'min': 'min distance (cm)', 'max': 'max distance (cm)',
+        })
+        # success rate keeps its 4 places, everything else is in cm
+        decimals = {column: 2 for column in table.columns if column != 'success rate'}
+        return table.sort_values(keys).round(decimals).reset_index(drop=True)
+
+    def calibration(self) -> pd.DataFrame:
+        """
+        Least squares fit of measured = scale * physical + offset per device over
+        all successful samples, with r^2 and residual RMS. A measurement is
+        corrected with physical = (measured - offset) / scale.
+        """
+        samples = self.freeze()
+        valid = samples[samples['valid']]
+        x = valid['physical distance (cm)'].to_numpy(np.float64)
+        y = valid['distance (cm)'].to_numpy(np.float64)
+
+        sums = pd.DataFrame({
+            'device': valid['device'], 'n': 1.0, 'x': x, 'y': y, 'xx': x * x, 'xy': x * y, 'yy': y * y,
+        }).groupby('device', observed=True).sum()
+        distances = valid.groupby('device', observed=True)['physical distance (cm)'].nunique()
+
+        n = sums['n']
+        sxx = sums['xx'] - sums['x'] ** 2 / n
+        sxy = sums['xy'] - sums['x'] * sums['y'] / n
+        syy = sums['yy'] - sums['y'] ** 2 / n
+        with np.errstate(invalid='ignore', divide='ignore'):
+            # a fit needs at least two different physical distances
+            scale = (sxy / sxx).where(distances > 1)
+            offset = (sums['y'] - scale * sums['x']) / n
+            residual = (syy - scale * sxy).clip(lower=0)
+            r2 = 1 - residual / syy
+            rms = np.sqrt(residual / n)
+
+        return pd.DataFrame({
+            'device': sums.index.astype(str),
+            'distances': distances.to_numpy(),
+            'samples': n.astype(int).to_numpy(),
+            'scale': scale.round(5).to_numpy(),
+            'offset (cm)': offset.round(2).to_numpy(),
+            'r^2': r2.round(5).to_numpy(),
+            'residual rms (cm)': rms.round(2).to_numpy(),
+        })
+
+    def show_report(self):
+        table = self.distance_statistics()
+        print(f"{' Device':<8}{' Phy. (cm)':<11}{' Files':<7}{' Ave. (cm)':<12}{' Bias':<9}{' Std.':<8}{' Success':<9}")
+        print('-' * 64)
+        for _, row in table.iterrows():
+            print(f" {row['device']:<8}{row['physical distance (cm)']:<11.1f}{row['files']:<7}"
+                  f"{row['average distance (cm)']:<12.2f}{row['bias (cm)']:<9.2f}{row['std. deviation']:<8.2f}"
+                  f"{row['success rate']:<9.4f}")
+        print('-' * 64)
+
+        print('Calibration, measured = scale x physical + offset:')
+        for _, row in self.calibration().iterrows():
+            print(f" device {row['device']}: scale {row['scale']}, offset {row['offset (cm)']} cm, "
+                  f"r^2 {row['r^2']}, residual rms {row['residual rms (cm)']} cm "
+                  f"({row['distances']} distances, {row['samples']} samples)")
+        print()
+
+    def save_report(self, save_file_path: str):
+        """ per-distance statistics and calibration in one report, format from the extension """
+        table, calibration = self.distance_statistics(), self.calibration()
+        if save_file_path.endswith('.xlsx'):
+            with pd.ExcelWriter(save_file_path) as writer:
+                table.to_excel(writer, sheet_name='distances', index=False)
+                calibration.to_excel(writer, sheet_name='calibration', index=False)
+            return
+
+        # flat formats: both tables stacked, 'table' tells the rows apart
+        report = pd.concat([table.assign(table='distances'), calibration.assign(table='calibration')],
+                           ignore_index=True)
+        if save_file_path.endswith('.csv'):
+            report.to_csv(save_file_path, index=False)
+        elif save_file_path.endswith('.parquet'):
+            report.astype(str).to_parquet(save_file_path, index=False)
+        else:
+            report.to_json(save_file_path, orient='records', lines=True)
+
+# END OF CLASS DEFINITION
+#---------------------------------------------------------------------------------
+
+# END OF FILE
+#---------------------------------------------------------------------------------
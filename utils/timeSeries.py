@@ -0,0 +1,120 @@
+# -*- coding:utf-8 -*-
+# !/usr/bin/env python
+#---------------------------------------------------------------------------------
+# Author: Zhang
+#
+# Create Date: 2026/10/18
+# Last Update on: 2026/10/18
+#
+# FILE: timeSeries.py
+# Description: vectorized time-series metrics over the gui TimeStamp column
+#---------------------------------------------------------------------------------
+
+#---------------------------------------------------------------------------------
+# IMPORT REQUIRED PACKAGES HERE
+
+import numpy as np
+
+# END OF PACKAGE IMPORT
+#---------------------------------------------------------------------------------
+
+#---------------------------------------------------------------------------------
+# DEFINE FUNCTIONS HERE
+
+# gui time stamps are device milliseconds held in an unsigned 32 bit counter.
+# The counter also restarts from 0 when the device is reset in a capture.
+TIMESTAMP_WRAP = 2 ** 32
+
+GAP_FACTOR = 2.0     # an interval longer than GAP_FACTOR x median interval is a gap
+STALL_MS = 1000      # an interval of at least STALL_MS without any sample is a stall
+WINDOW_MS = 1000     # length of a window for windowed statistics
+
+
+def unwrap_timestamps(timestamps: np.ndarray):
+    """
+    Turn raw time stamps into a monotonic ms time line.
+
+    A backward step is a counter wrap if adding TIMESTAMP_WRAP gives a plausible
+    interval, otherwise the counter restarted and the step is replaced by the
+    median interval. Return (time line as float64, number of wraps, number of restarts).
+    """
+    timestamps = np.asarray(timestamps, dtype=np.int64)
+    if timestamps.size < 2:
+        return timestamps.astype(np.float64), 0, 0
+
+    intervals = np.diff(timestamps)
+    backward = intervals < 0
+    forward = intervals[~backward]
+    nominal = float(np.median(forward)) if forward.size else 0.0
+
+    wrapped = intervals + TIMESTAMP_WRAP
+    is_wrap = backward & (wrapped <= max(nominal * GAP_FACTOR, STALL_MS))
+    is_restart = backward & ~is_wrap
+
+    intervals = np.where(is_wrap, wrapped, intervals)
+    intervals = np.where(is_restart, nominal, intervals).astype(np.float64)
+
+    time_line = np.empty(timestamps.size, dtype=np.float64)
+    time_line[0] = 0.0
+    np.cumsum(intervals, out=time_line[1:])
+    return time_line + timestamps[0], int(is_wrap.sum()), int(is_restart.sum())
+
+
+def timeseries_metrics(timestamps: np.ndarray) -> dict:
+    """ ranging rate, interval distribution, gaps and stalls of one device """
+    time_line, wraps, restarts = unwrap_timestamps(timestamps)
+    if time_line.size < 2:
+        return {}
+
+    intervals = np.diff(time_line)
+    median_interval = float(np.median(intervals))
+    duration = time_line[-1] - time_line[0]
+    gaps = intervals > median_interval * GAP_FACTOR
+
+    return {
+        'ranging rate (Hz)': round(float((time_line.size - 1) * 1000 / duration), 2) if duration > 0 else float('nan'),
+        'median interval (ms)': round(median_interval, 2),
+        'p95 interval (ms)': round(float(np.percentile(intervals, 95)), 2),
+        'max interval (ms)': round(float(intervals.max()), 2),
+        'gap count': int(gaps.sum()),
+        'time lost in gaps (ms)': round(float((intervals[gaps] - median_interval).sum()), 2),
+        'stall count': int((intervals >= STALL_MS).sum()),
+        'timestamp wraps/restarts': f"{wraps}/{restarts}",
+    }
+
+
+def windowed_stats(timestamps: np.ndarray, distances: np.ndarray, valid: np.ndarray, window_ms=WINDOW_MS) -> dict:
+    """
+    Per-window sample count, success rate and mean/stdev of successful
+    distances, computed with one bincount per metric. Windows without any
+    sample are kept so throughput dips show up as zero counts.
+    """
+    time_line, _, _ = unwrap_timestamps(timestamps)
+    if not time_line.size:
+        return {}
+
+    windows = ((time_line - time_line[0]) // window_ms).astype(np.int64)
+    n_windows = int(windows[-1]) + 1
+    values = np.where(valid, distances, 0).astype(np.float64)
+
+    counts = np.bincount(windows, minlength=n_windows)
+    success = np.bincount(windows, weights=valid, minlength=n_windows)
+    sums = np.bincount(windows, weights=values, minlength=n_windows)
+    squares = np.bincount(windows, weights=values * values, minlength=n_windows)
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        mean = sums / success
+        variance = (squares - success * mean * mean) / (success - 1)
+        stdev = np.where(success > 1, np.sqrt(np.clip(variance, 0, None)), np.nan)
+        success_rate = success / counts
+
+    return {
+        'window start (s)': np.arange(n_windows) * window_ms / 1000,
+        'samples': counts,
+        'success rate': np.round(success_rate, 4),
+        'mean distance (cm)': np.round(mean, 2),
+        'std. deviation': np.round(stdev, 2),
+    }
+
+# END OF FILE
+#---------------------------------------------------------------------------------